@@ -0,0 +1,21 @@
+import asyncio
+import importlib
+import os
+import pkgutil
+import sys
+
+from dotenv import load_dotenv
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "src")))
+    load_dotenv(os.path.abspath(os.path.join(os.path.dirname(__file__), "deploy/.env")))
+
+    import benchmarks
+
+    names = sys.argv[1:] or [
+        module.name for module in pkgutil.iter_modules(benchmarks.__path__)
+    ]
+    for name in names:
+        print(f"== {name}")
+        asyncio.run(importlib.import_module(f"benchmarks.{name}").main())
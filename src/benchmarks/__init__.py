@@ -0,0 +1,23 @@
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+
+async def measure(call: Callable[[], Awaitable[object]], rounds: int) -> List[float]:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def report(name: str, samples: List[float]) -> None:
+    ordered = sorted(samples)
+    p95 = ordered[int(len(ordered) * 0.95) - 1] if len(ordered) > 1 else ordered[0]
+    print(
+        f"{name:<40} n={len(samples):<7} "
+        f"mean={statistics.fmean(samples) * 1e6:10.1f}us "
+        f"p50={statistics.median(samples) * 1e6:10.1f}us "
+        f"p95={p95 * 1e6:10.1f}us"
+    )
@@ -0,0 +1,82 @@
+"""Dispatch cost per callback query with many routers registered.
+
+"flat" is how callbacks used to be routed: every router tried in turn, each
+with a startswith lambda filter. "indexed" routes through CallbackRouter.
+The callback always targets the last router, the worst case for "flat".
+"""
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.types import CallbackQuery, Update
+
+from benchmarks import measure, report
+from telegram.routing import CallbackRouter
+
+ROUNDS = 500
+HANDLERS_PER_ROUTER = 3
+
+
+async def handle(callback: CallbackQuery) -> None:
+    pass
+
+
+def routers(count: int, indexed: bool) -> list[Router]:
+    result = []
+    for i in range(count):
+        router = Router(name=f"r{i}")
+        for j in range(HANDLERS_PER_ROUTER):
+            if indexed:
+                # Within a router handlers still filter as usual.
+                router.callback_query.register(
+                    handle, lambda c, p=f"r{i}:{j}:": c.data.startswith(p)
+                )
+            else:
+                router.callback_query.register(
+                    handle, lambda c, p=f"r{i}_{j}_": c.data.startswith(p)
+                )
+        result.append(router)
+    return result
+
+
+def update(data: str) -> Update:
+    return Update.model_validate(
+        {
+            "update_id": 1,
+            "callback_query": {
+                "id": "1",
+                "from": {"id": 1, "is_bot": False, "first_name": "Bench"},
+                "chat_instance": "1",
+                "data": data,
+            },
+        }
+    )
+
+
+async def run(bot: Bot, count: int) -> None:
+    last, handler = count - 1, HANDLERS_PER_ROUTER - 1
+
+    flat = Dispatcher()
+    flat.include_routers(*routers(count, indexed=False))
+    flat_update = update(f"r{last}_{handler}_1")
+    report(
+        f"flat, {count} routers",
+        await measure(lambda: flat.feed_update(bot, flat_update), ROUNDS),
+    )
+
+    indexed = Dispatcher()
+    callbacks = CallbackRouter()
+    for i, router in enumerate(routers(count, indexed=True)):
+        callbacks.include_router(router)
+        callbacks.include_callbacks(router, f"r{i}")
+    indexed.include_router(callbacks)
+    indexed_update = update(f"r{last}:{handler}:1")
+    report(
+        f"indexed, {count} routers",
+        await measure(lambda: indexed.feed_update(bot, indexed_update), ROUNDS),
+    )
+
+
+async def main() -> None:
+    bot = Bot("123:abc")
+    for count in (2, 20, 100):
+        await run(bot, count)
+    await bot.session.close()
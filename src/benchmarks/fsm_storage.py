@@ -0,0 +1,77 @@
+"""FSM get/set_state latency of our storages against aiogram's MemoryStorage."""
+
+import itertools
+import os
+import tempfile
+import time
+
+from aiogram.fsm.storage.base import BaseStorage, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from benchmarks import measure, report
+from telegram.storage import MemoryStorageTTL, SQLiteStorage
+
+ROUNDS = 10_000
+CHATS = 10_000
+STATE = "AuthState:birth_date"
+
+
+def keys() -> "itertools.cycle[StorageKey]":
+    return itertools.cycle(
+        StorageKey(bot_id=1, chat_id=chat_id, user_id=chat_id)
+        for chat_id in range(CHATS)
+    )
+
+
+async def run(name: str, storage: BaseStorage) -> None:
+    set_keys, get_keys = keys(), keys()
+    report(
+        f"{name}: first set_state",
+        await measure(lambda: storage.set_state(next(set_keys), STATE), CHATS),
+    )
+    report(
+        f"{name}: set_state",
+        await measure(lambda: storage.set_state(next(set_keys), STATE), ROUNDS),
+    )
+    report(
+        f"{name}: get_state",
+        await measure(lambda: storage.get_state(next(get_keys)), ROUNDS),
+    )
+
+
+async def main() -> None:
+    await run("MemoryStorage", MemoryStorage())
+    await run("MemoryStorageTTL", MemoryStorageTTL())
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_name = os.path.join(directory, "fsm.db")
+        storage = SQLiteStorage(db_name, flush_interval=3600)
+        await run("SQLiteStorage", storage)
+
+        started = time.perf_counter()
+        await storage.flush()
+        print(f"flush of {CHATS} dirty keys took {time.perf_counter() - started:.3f}s")
+        await storage.close()
+
+        # After a restart every first read of a chat goes to the database.
+        restarted = SQLiteStorage(db_name)
+        cold_keys = keys()
+        report(
+            "SQLiteStorage: cold get_state",
+            await measure(lambda: restarted.get_state(next(cold_keys)), CHATS),
+        )
+        await restarted.close()
+
+        # Write-through for comparison: every set_state commits on its own.
+        write_through = SQLiteStorage(db_name, flush_interval=3600)
+        through_keys = keys()
+
+        async def set_and_commit() -> None:
+            await write_through.set_state(next(through_keys), None)
+            await write_through.flush()
+
+        report(
+            "write-through: set_state",
+            await measure(set_and_commit, CHATS // 10),
+        )
+        await write_through.close()
@@ -0,0 +1,108 @@
+"""Full schema + pydantic DTO decoding vs. projection decoding into slotted DTOs."""
+
+import json
+import time
+from typing import Any, Callable, List
+
+from pydantic.dataclasses import dataclass
+from pydantic_core import to_json
+
+from lombardis.dto import Loan, LoanDetails
+from lombardis.projections import CLIENT_LOANS, LOAN_DETAILS
+from lombardis.schemas import ClientLoansResponse, LoanDetailsResponse
+from tests.fakes.lombardis_payloads import (
+    ClientLoansResponseFactory,
+    LoanDetailsResponseFactory,
+    LoanResponseFactory,
+    StuffItemResponseFactory,
+    build_payload,
+)
+
+ROUNDS = 50
+
+
+@dataclass
+class ValidatedLoan:
+    loan_id: Any
+    pawn_bill_number: str
+
+
+@dataclass
+class ValidatedLoanDetails:
+    loan_number: str
+    loan_sum: float
+    interests_sum: float
+    stuff: List[str]
+
+
+def full_client_loans(body: bytes) -> Any:
+    response = ClientLoansResponse(**json.loads(body))
+    return [ValidatedLoan(loan.LoanID, loan.pawnBillNumber) for loan in response.Loans]
+
+
+def lean_client_loans(body: bytes) -> Any:
+    response = CLIENT_LOANS.validate_json(body)
+    return [
+        Loan(
+            loan_id=loan["LoanID"],
+            pawn_bill_number=loan["pawnBillNumber"],
+            payment_date=loan["PaymentDate"],
+            full_debt=loan["fullDebt"],
+            prolongation_sum=loan["prolongationSum"],
+            closed=loan["Closed"],
+        )
+        for loan in response["Loans"]
+    ]
+
+
+def full_loan_details(body: bytes) -> Any:
+    response = LoanDetailsResponse(**json.loads(body))
+    return ValidatedLoanDetails(
+        loan_number=response.LoanNumber,
+        loan_sum=response.LoanSum,
+        interests_sum=response.InterestsSum,
+        stuff=[item.Presentation for item in response.Stuff],
+    )
+
+
+def lean_loan_details(body: bytes) -> Any:
+    response = LOAN_DETAILS.validate_json(body)
+    return LoanDetails(
+        loan_number=response["LoanNumber"],
+        loan_sum=response["LoanSum"],
+        interests_sum=response["InterestsSum"],
+        stuff=[item["Presentation"] for item in response["Stuff"]],
+    )
+
+
+def run(name: str, decode: Callable[[bytes], Any], body: bytes) -> float:
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        decode(body)
+    per_call = (time.perf_counter() - started) / ROUNDS
+    print(f"{name:<40} {per_call * 1e3:8.2f}ms/call")
+    return per_call
+
+
+async def main() -> None:
+    for loans in (10, 500, 2000):
+        body = to_json(
+            build_payload(
+                ClientLoansResponseFactory, Loans=LoanResponseFactory.batch(loans)
+            )
+        )
+        print(f"-- getClientLoans, {loans} loans, {len(body)} bytes")
+        full = run("full schema + pydantic DTOs", full_client_loans, body)
+        lean = run("projection + slotted DTOs", lean_client_loans, body)
+        print(f"speedup x{full / lean:.1f}")
+
+    for items in (10, 300, 1000):
+        body = to_json(
+            build_payload(
+                LoanDetailsResponseFactory, Stuff=StuffItemResponseFactory.batch(items)
+            )
+        )
+        print(f"-- getLoanDetails, {items} stuff items, {len(body)} bytes")
+        full = run("full schema + pydantic DTOs", full_loan_details, body)
+        lean = run("projection + slotted DTOs", lean_loan_details, body)
+        print(f"speedup x{full / lean:.1f}")
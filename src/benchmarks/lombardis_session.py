@@ -0,0 +1,37 @@
+"""Per-call latency of a pooled session vs. a fresh session per request."""
+
+from aiohttp import BasicAuth
+
+from benchmarks import measure, report
+from lombardis.api import LombardisAsyncHTTP
+from tests.fakes.lombardis_payloads import LoanDetailsResponseFactory, build_payload
+from tests.fakes.lombardis_server import LombardisServerFake
+
+ROUNDS = 500
+
+
+async def main() -> None:
+    async with LombardisServerFake() as server:
+        server.configure("getLoanDetails", build_payload(LoanDetailsResponseFactory))
+        auth = BasicAuth("user", "password")
+
+        async def fresh_session_call() -> None:
+            client = LombardisAsyncHTTP(base_url=server.base_url, auth=auth)
+            await client.get_loan_details("1")
+            await client.close()
+
+        report("fresh session per call", await measure(fresh_session_call, ROUNDS))
+        fresh_connections = server.connections
+
+        pooled = LombardisAsyncHTTP(base_url=server.base_url, auth=auth)
+        await pooled.connect()
+        server.peers.clear()
+        report(
+            "pooled session",
+            await measure(lambda: pooled.get_loan_details("1"), ROUNDS),
+        )
+        await pooled.close()
+
+        print(
+            f"connections opened: fresh={fresh_connections} pooled={server.connections}"
+        )
@@ -0,0 +1,66 @@
+"""Peak memory per request: buffered vs. streaming decode of large responses."""
+
+import time
+import tracemalloc
+from typing import Awaitable, Callable
+
+from aiohttp import BasicAuth
+
+from lombardis.api import LombardisAsyncHTTP
+from tests.fakes.lombardis_payloads import (
+    ClientLoansResponseFactory,
+    LoanDetailsResponseFactory,
+    LoanResponseFactory,
+    StuffItemResponseFactory,
+    build_payload,
+)
+from tests.fakes.lombardis_server import LombardisServerFake
+
+
+async def peak(name: str, call: Callable[[], Awaitable[object]]) -> None:
+    await call()  # warm up connections and adapters
+    started = time.perf_counter()
+    await call()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    await call()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<40} peak={peak_bytes / 1024:9.0f}KiB time={elapsed * 1e3:7.1f}ms")
+
+
+async def main() -> None:
+    async with LombardisServerFake() as server:
+        auth = BasicAuth("user", "password")
+        buffered = LombardisAsyncHTTP(base_url=server.base_url, auth=auth)
+        streaming = LombardisAsyncHTTP(
+            base_url=server.base_url, auth=auth, streaming=True
+        )
+
+        for loans in (500, 5000):
+            server.configure(
+                "getClientLoans",
+                build_payload(
+                    ClientLoansResponseFactory, Loans=LoanResponseFactory.batch(loans)
+                ),
+            )
+            size = len(server.responses["getClientLoans"])
+            print(f"-- getClientLoans, {loans} loans, {size // 1024}KiB body")
+            await peak("buffered", lambda: buffered.get_client_loans("1"))
+            await peak("streaming", lambda: streaming.get_client_loans("1"))
+
+        for items in (300, 3000):
+            server.configure(
+                "getLoanDetails",
+                build_payload(
+                    LoanDetailsResponseFactory,
+                    Stuff=StuffItemResponseFactory.batch(items),
+                ),
+            )
+            size = len(server.responses["getLoanDetails"])
+            print(f"-- getLoanDetails, {items} stuff items, {size // 1024}KiB body")
+            await peak("buffered", lambda: buffered.get_loan_details("1"))
+            await peak("streaming", lambda: streaming.get_loan_details("1"))
+
+        await buffered.close()
+        await streaming.close()
@@ -0,0 +1,51 @@
+"""Cost of recording metrics on the hot path, and of a scrape."""
+
+import time
+from typing import Callable
+
+from benchmarks import measure, report
+from metrics.registry import Registry, timed
+
+OPS = 1_000_000
+ROUNDS = 10_000
+
+
+def per_op(name: str, call: Callable[[], object], ops: int = OPS) -> None:
+    started = time.perf_counter()
+    for _ in range(ops):
+        call()
+    elapsed = time.perf_counter() - started
+    print(f"{name:<40} {elapsed / ops * 1e9:8.1f}ns/op")
+
+
+async def main() -> None:
+    registry = Registry()
+    counter = registry.counter("calls_total", "Calls.", ("api_method",))
+    histogram = registry.histogram("latency_seconds", "Latency.", ("api_method",))
+    child = histogram.labels("getLoanDetails")
+
+    per_op("counter.labels(...).inc()", lambda: counter.labels("getLoanDetails").inc())
+    per_op("bound histogram child .observe()", lambda: child.observe(0.0123))
+    per_op(
+        "histogram.labels(...).observe()",
+        lambda: histogram.labels("getLoanDetails").observe(0.0123),
+    )
+    per_op("time.perf_counter() (for scale)", time.perf_counter)
+
+    async def bare() -> None:
+        pass
+
+    wrapped = timed(histogram, "bare")(bare)
+    report("bare coroutine", await measure(bare, ROUNDS))
+    report("@timed coroutine", await measure(wrapped, ROUNDS))
+
+    # A realistic scrape: every method of every instrumented component.
+    for i in range(50):
+        for value in (0.001, 0.01, 0.1):
+            histogram.labels(f"method{i}").observe(value)
+        counter.labels(f"method{i}").inc()
+
+    async def scrape() -> None:
+        registry.render()
+
+    report("render, 100 series", await measure(scrape, 1_000))
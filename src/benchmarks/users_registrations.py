@@ -0,0 +1,68 @@
+"""Throughput of a burst of concurrent registrations with and without group commit."""
+
+import asyncio
+import os
+import tempfile
+import time
+from typing import Optional
+
+from repository.dto import User
+from repository.users import SQLitePerformance, UsersRepoSQLite
+from repository.writer import GroupCommit
+
+REGISTRATIONS = 2_000
+
+
+async def run(
+    name: str,
+    db_name: str,
+    performance: Optional[SQLitePerformance] = None,
+    group_commit: Optional[GroupCommit] = None,
+    duplicates: bool = False,
+) -> None:
+    users = UsersRepoSQLite(
+        db_name=db_name, performance=performance, group_commit=group_commit
+    )
+    await users.bootstrap()
+
+    def phone_number(i: int) -> str:
+        # With duplicates every tenth registration reuses a phone and must fail.
+        return "+70000000001" if duplicates and i % 10 == 0 else f"+7{i:010d}"
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            users.add_user(User(i, f"User {i}", f"client-{i}", phone_number(i)))
+            for i in range(1, REGISTRATIONS + 1)
+        ),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - started
+    failed = sum(isinstance(result, Exception) for result in results)
+    batches = users.writer.stats.batches if users.writer else REGISTRATIONS
+    await users.close()
+    os.remove(db_name)
+
+    print(
+        f"{name:<40} {REGISTRATIONS / elapsed:10.0f} registrations/s "
+        f"failed={failed} commits={batches}"
+    )
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        db_name = os.path.join(directory, "users.db")
+        for duplicates in (False, True):
+            suffix = ", 10% duplicates" if duplicates else ""
+            wal = SQLitePerformance(readers=0)
+            await run(f"commit per insert{suffix}", db_name, duplicates=duplicates)
+            await run(
+                f"group commit{suffix}",
+                db_name,
+                group_commit=GroupCommit(),
+                duplicates=duplicates,
+            )
+            await run(f"WAL, commit per insert{suffix}", db_name, wal, None, duplicates)
+            await run(
+                f"WAL, group commit{suffix}", db_name, wal, GroupCommit(), duplicates
+            )
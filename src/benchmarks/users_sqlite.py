@@ -0,0 +1,105 @@
+"""Default vs. performance profile of UsersRepoSQLite on a large users table.
+
+The table size defaults to 1M rows and can be scaled with BENCH_USERS.
+"""
+
+import asyncio
+import itertools
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from benchmarks import measure, report
+from repository.dto import User
+from repository.users import SQLitePerformance, UsersRepoSQLite
+
+USERS = int(os.environ.get("BENCH_USERS", 1_000_000))
+ROUNDS = 5_000
+CONCURRENCY = 64
+BATCH = 100
+
+
+def seed(db_name: str) -> None:
+    with sqlite3.connect(db_name) as connection:
+        connection.execute(
+            """
+            CREATE TABLE users (
+                chat_id INTEGER PRIMARY KEY,
+                full_name TEXT NOT NULL,
+                client_id TEXT NOT NULL UNIQUE,
+                phone_number TEXT NOT NULL UNIQUE
+            )
+            """
+        )
+        connection.executemany(
+            "INSERT INTO users VALUES (?, ?, ?, ?)",
+            ((i, f"User {i}", f"client-{i}", f"+7{i:010d}") for i in range(USERS)),
+        )
+
+
+async def run(name: str, users: UsersRepoSQLite) -> None:
+    await users.connect()
+    ids = [random.randrange(USERS) for _ in range(ROUNDS)]
+    chat_ids = itertools.cycle(ids)
+
+    report(
+        f"{name}: get_user(chat_id)",
+        await measure(lambda: users.get_user({"chat_id": next(chat_ids)}), ROUNDS),
+    )
+    report(
+        f"{name}: get_user(phone_number)",
+        await measure(
+            lambda: users.get_user({"phone_number": f"+7{next(chat_ids):010d}"}),
+            ROUNDS,
+        ),
+    )
+
+    started = time.perf_counter()
+    for offset in range(0, ROUNDS, CONCURRENCY):
+        await asyncio.gather(
+            *(users.user_exists(i) for i in ids[offset : offset + CONCURRENCY])
+        )
+    elapsed = time.perf_counter() - started
+    print(f"{name + ': concurrent user_exists':<40} {ROUNDS / elapsed:10.0f} lookups/s")
+
+    batches = iter(range(0, ROUNDS, BATCH))
+
+    async def batch_read() -> None:
+        offset = next(batches, 0)
+        await users.get_users(ids[offset : offset + BATCH])
+
+    report(f"{name}: get_users({BATCH})", await measure(batch_read, ROUNDS // BATCH))
+
+    # Registrations keep committing in the background while users tap buttons.
+    async def register() -> None:
+        chat_id = USERS
+        while True:
+            await users.add_user(
+                User(chat_id, f"User {chat_id}", f"client-{chat_id}", f"+8{chat_id}")
+            )
+            chat_id += 1
+
+    writer = asyncio.create_task(register())
+    report(
+        f"{name}: get_user under writes",
+        await measure(lambda: users.get_user({"chat_id": next(chat_ids)}), ROUNDS),
+    )
+    writer.cancel()
+    await asyncio.gather(writer, return_exceptions=True)
+    await users.close()
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        db_name = os.path.join(directory, "users.db")
+        started = time.perf_counter()
+        seed(db_name)
+        print(f"seeded {USERS} users in {time.perf_counter() - started:.1f}s")
+
+        await run("default", UsersRepoSQLite(db_name=db_name))
+        await run(
+            "performance",
+            UsersRepoSQLite(db_name=db_name, performance=SQLitePerformance()),
+        )
@@ -0,0 +1,110 @@
+"""Local load test of the multi-worker webhook front.
+
+Every update costs ~1ms of handler CPU. Throughput can only scale with the
+worker count if the machine has the cores for it (see the printed count).
+"""
+
+import asyncio
+import functools
+import os
+import random
+import socket
+import time
+from typing import Any, Dict, List
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Message
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+from aiohttp import ClientSession, web
+
+from telegram.webhook import SECRET_HEADER, WEBHOOK_PATH, WEBHOOK_SECRET
+from telegram.workers import get_front_app, start_workers, stop_workers, worker_urls
+
+UPDATES = 2_000
+CONCURRENCY = 64
+HANDLER_CPU = 20_000
+BASE_PORT = 18_400
+
+
+def _worker(port: int) -> None:
+    dp = Dispatcher()
+
+    @dp.message()
+    async def handle(message: Message) -> None:
+        sum(i * i for i in range(HANDLER_CPU))
+
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=Bot("123:abc"),
+        secret_token=WEBHOOK_SECRET,
+        handle_in_background=False,
+    ).register(app, path=WEBHOOK_PATH)
+    web.run_app(app, host="127.0.0.1", port=port, print=None)
+
+
+def _front(port: int, urls: List[str]) -> None:
+    app = get_front_app(Bot("123:abc"), urls, register_webhook=False)
+    web.run_app(app, host="127.0.0.1", port=port, print=None)
+
+
+async def wait_for_port(port: int) -> None:
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+
+
+def update(update_id: int) -> Dict[str, Any]:
+    chat_id = random.randrange(1, 100_000)
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Load"},
+            "text": "Мои займы",
+        },
+    }
+
+
+async def run(workers: int, front: bool = True) -> None:
+    front_port = BASE_PORT + workers * 10 + (0 if front else 100)
+    urls = worker_urls("127.0.0.1", front_port + 1, workers)
+    processes = start_workers(_worker, [front_port + 1 + i for i in range(workers)])
+    if front:
+        processes += start_workers(functools.partial(_front, urls=urls), [front_port])
+    try:
+        for port in range(front_port + (0 if front else 1), front_port + workers + 1):
+            await wait_for_port(port)
+
+        url = urls[0] if not front else f"http://127.0.0.1:{front_port}{WEBHOOK_PATH}"
+        updates = iter(range(UPDATES))
+        async with ClientSession() as session:
+
+            async def client() -> None:
+                for update_id in updates:
+                    async with session.post(
+                        url,
+                        json=update(update_id),
+                        headers={SECRET_HEADER: WEBHOOK_SECRET},
+                    ) as response:
+                        assert response.status == 200, response.status
+
+            started = time.perf_counter()
+            await asyncio.gather(*(client() for _ in range(CONCURRENCY)))
+            elapsed = time.perf_counter() - started
+        name = f"{workers} worker(s)" + ("" if front else ", no front")
+        print(f"{name:<40} {UPDATES / elapsed:10.0f} updates/s")
+    finally:
+        stop_workers(processes)
+
+
+async def main() -> None:
+    print(f"cpu cores: {os.cpu_count()}")
+    await run(1, front=False)
+    for workers in (1, 2, 4):
+        await run(workers)
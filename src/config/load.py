@@ -1,5 +1,5 @@
 import os
-from typing import TypedDict, cast
+from typing import NotRequired, TypedDict, cast
 
 
 class Config(TypedDict):
@@ -16,12 +16,30 @@ class Config(TypedDict):
     LOMBARDIS_DB: str
     LOMBARDIS_URL: str
     DEMO_MODE: str
+    LOMBARDIS_PREFETCH: NotRequired[str]
+    LOMBARDIS_STREAMING: NotRequired[str]
+    USERS_DB_PERFORMANCE: NotRequired[str]
+    USERS_DB_GROUP_COMMIT: NotRequired[str]
+    FSM_DB: NotRequired[str]
+    FSM_IDLE_TTL: NotRequired[str]
+    FSM_MAX_STATES: NotRequired[str]
+    WEB_WORKERS: NotRequired[str]
+    WEBHOOK_SCHEDULER: NotRequired[str]
+    WEBHOOK_CONCURRENCY: NotRequired[str]
+    METRICS: NotRequired[str]
+    TRACE_SLOW_MS: NotRequired[str]
+    TRACE_SAMPLE_RATE: NotRequired[str]
+    TRACE_FILE: NotRequired[str]
 
 
 def get_from_env() -> Config:
     try:
-        return cast(
-            Config, {var: os.environ[var] for var in Config.__annotations__}
-        )  # Ensures values are non-None
+        required = {var: os.environ[var] for var in Config.__required_keys__}
+        optional = {
+            var: os.environ[var]
+            for var in Config.__optional_keys__
+            if var in os.environ
+        }
+        return cast(Config, required | optional)  # Ensures values are non-None
     except KeyError:
         exit(1)
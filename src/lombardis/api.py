@@ -1,101 +1,320 @@
+import asyncio
+import time
+from dataclasses import dataclass
 from enum import Enum
-from typing import Optional, Type, TypeVar
+from typing import Mapping, Optional, TypeVar
 
-from aiohttp import BasicAuth, ClientSession
-from pydantic import ValidationError
+from aiohttp import BasicAuth, ClientSession, TCPConnector
+from pydantic import TypeAdapter, ValidationError
 
 from config import conf
 
-from lombardis.dto import ClientDetails, ClientID, ClientLoans, Loan, LoanDetails
-from lombardis.schemas import (
-    ClientDetailsResponse,
-    ClientIDResponse,
-    ClientLoansResponse,
-    LoanDetailsResponse,
+from lombardis.batch import BatchLimits, LombardisBatchMixin
+from lombardis.dto import (
+    ClientDetails,
+    ClientID,
+    ClientLoans,
+    Loan,
+    LoanDetails,
 )
+from lombardis.resilience import (
+    DEFAULT_POLICIES,
+    CallPolicy,
+    CircuitBreaker,
+    CircuitState,
+    LatencyTracker,
+    LombardisUnavailable,
+    is_retryable,
+)
+from lombardis.projections import (
+    CLIENT_DETAILS,
+    CLIENT_ID,
+    CLIENT_LOANS,
+    CLIENT_LOANS_STREAM,
+    LOAN_DETAILS,
+    LOAN_DETAILS_STREAM,
+)
+from lombardis.singleflight import SingleFlight
+from lombardis.streaming import StreamingProjection
+from metrics.registry import REGISTRY, SIZE_BUCKETS
+from metrics.tracing import span
 
 T = TypeVar("T")
 
+Decoder = TypeAdapter[T] | StreamingProjection[T]
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "lombardis_request_seconds",
+    "Lombardis HTTP round trips, per attempt.",
+    ("api_method",),
+)
+RESPONSE_BYTES = REGISTRY.histogram(
+    "lombardis_response_bytes",
+    "Lombardis response body sizes.",
+    ("api_method",),
+    buckets=SIZE_BUCKETS,
+)
+ERRORS = REGISTRY.counter(
+    "lombardis_errors_total",
+    "Lombardis calls that failed after retries.",
+    ("api_method",),
+)
+
 
 class HTTP_METHOD(Enum):
     GET = "get"
     PUT = "put"
 
 
-class LombardisAsyncHTTP:
+@dataclass(frozen=True)
+class ConnectionPool:
+    """Tuning for the TCP connector shared by all Lombardis requests."""
+
+    limit: int = 100
+    limit_per_host: int = 20
+    keepalive_timeout: float = 60.0
+    ttl_dns_cache: int = 300
+
+    def make_connector(self) -> TCPConnector:
+        return TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.ttl_dns_cache,
+        )
+
+
+class LombardisAsyncHTTP(LombardisBatchMixin):
     def __init__(
         self,
         session: Optional[ClientSession] = None,
         base_url: str = conf["LOMBARDIS_URL"],
         auth: BasicAuth = BasicAuth(conf["LOMBARDIS_USER"], conf["LOMBARDIS_PASSWORD"]),
+        pool: ConnectionPool = ConnectionPool(),
+        batch_limits: BatchLimits = BatchLimits(),
+        policies: Mapping[str, CallPolicy] = DEFAULT_POLICIES,
+        breaker: Optional[CircuitBreaker] = None,
+        streaming: bool = False,
     ):
         self.BASE_URL = base_url
         self.AUTH = auth
-        self.session = session or ClientSession(auth=self.AUTH)
+        self.pool = pool
+        self.batch_limits = batch_limits
+        self.policies = policies
+        self.breaker = breaker or CircuitBreaker()
+        self.latencies = LatencyTracker()
+        self.streaming = streaming
+        self.session = session
+        self.flights = SingleFlight()
+
+    async def connect(self) -> None:
+        if self.session is None or self.session.closed:
+            self.session = ClientSession(
+                auth=self.AUTH, connector=self.pool.make_connector()
+            )
+
+    async def close(self) -> None:
+        if self.session is not None:
+            try:
+                await self.session.close()
+                self.session = None
+            except Exception as e:
+                raise RuntimeError(f"Failed to close Lombardis HTTP session: {e}")
 
     async def make_request(
         self,
         api_method: str,
         request_data: dict[str, str],
-        response_schema: Type[T],
+        response_schema: Decoder[T],
         http_method: HTTP_METHOD,
     ) -> T:
-        url = f"{self.BASE_URL}/{api_method}"
-        async with self.session as session:
+        # Lombardis calls are read-only, so identical in-flight requests share one
+        # upstream round trip.
+        key = (
+            api_method,
+            http_method,
+            tuple(sorted(request_data.items())),
+            response_schema,
+        )
+
+        async def call() -> T:
+            # Counted once per upstream call, however many callers share it.
             try:
-                get_response = getattr(session, http_method.value)
-                if get_response is None:
-                    raise ValueError(f"Unsupported HTTP method: {http_method}")
-                else:
-                    async with get_response(url, json=request_data) as response:
-                        response.raise_for_status()
-                        data = await response.json()
-                        return response_schema(**data)
-
-            except ValidationError as e:
-                raise ValueError(f"Response validation failed: {e}")
+                return await self._make_request(
+                    api_method, request_data, response_schema, http_method
+                )
+            except Exception:
+                ERRORS.labels(api_method).inc()
+                raise
+
+        with span("lombardis", api_method):
+            return await self.flights.do(key, call)
+
+    async def _make_request(
+        self,
+        api_method: str,
+        request_data: dict[str, str],
+        response_schema: Decoder[T],
+        http_method: HTTP_METHOD,
+    ) -> T:
+        policy = self.policies.get(api_method, CallPolicy())
+        attempts = policy.retry.attempts if policy.idempotent else 1
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                raise LombardisUnavailable(
+                    f"Request to {api_method} skipped: Lombardis circuit is open"
+                )
+            probe = self.breaker.state is CircuitState.HALF_OPEN
+            try:
+                result = await self._attempt(
+                    api_method, request_data, response_schema, http_method, policy
+                )
+            except asyncio.CancelledError:
+                if probe:
+                    self.breaker.release_probe()
+                raise
             except Exception as e:
-                raise RuntimeError(f"Request to {api_method} failed: {e}")
+                if not is_retryable(e):
+                    self.breaker.record_success()
+                    if isinstance(e, ValidationError):
+                        raise ValueError(f"Response validation failed: {e}")
+                    raise RuntimeError(f"Request to {api_method} failed: {e}")
+                self.breaker.record_failure()
+                if attempt + 1 == attempts:
+                    raise RuntimeError(
+                        f"Request to {api_method} failed after {attempts} attempts: "
+                        f"{e!r}"
+                    )
+                await asyncio.sleep(policy.retry.backoff(attempt))
+            else:
+                self.breaker.record_success()
+                return result
+        raise AssertionError("unreachable")
+
+    async def _attempt(
+        self,
+        api_method: str,
+        request_data: dict[str, str],
+        response_schema: Decoder[T],
+        http_method: HTTP_METHOD,
+        policy: CallPolicy,
+    ) -> T:
+        hedge_after = None
+        if policy.idempotent and policy.hedge_quantile is not None:
+            hedge_after = self.latencies.quantile(api_method, policy.hedge_quantile)
+
+        def send() -> asyncio.Task[T]:
+            return asyncio.create_task(
+                asyncio.wait_for(
+                    self._send(api_method, request_data, response_schema, http_method),
+                    policy.deadline,
+                )
+            )
+
+        tasks = [send()]
+        try:
+            if hedge_after is not None:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+                if not done:
+                    tasks.append(send())
+            while True:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                finished = done.pop()
+                if finished.exception() is None or len(tasks) == 1:
+                    return finished.result()
+                # The other hedge is still running and may yet succeed.
+                tasks.remove(finished)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _send(
+        self,
+        api_method: str,
+        request_data: dict[str, str],
+        response_schema: Decoder[T],
+        http_method: HTTP_METHOD,
+    ) -> T:
+        url = f"{self.BASE_URL}/{api_method}"
+        await self.connect()
+        assert self.session is not None
+        get_response = getattr(self.session, http_method.value)
+        if get_response is None:
+            raise ValueError(f"Unsupported HTTP method: {http_method}")
+        started = time.monotonic()
+        async with get_response(url, json=request_data) as response:
+            response.raise_for_status()
+            if isinstance(response_schema, StreamingProjection):
+                # Leaving early drops the connection instead of reading the rest.
+                result: T = await response_schema.decode(
+                    response.content.iter_chunked(STREAM_CHUNK_SIZE)
+                )
+                self._record(api_method, started, response.content.total_bytes)
+                return result
+            body = await response.read()
+        self._record(api_method, started, len(body))
+        return response_schema.validate_json(body)
+
+    def _record(self, api_method: str, started: float, size: int) -> None:
+        latency = time.monotonic() - started
+        self.latencies.record(api_method, latency)
+        REQUEST_SECONDS.labels(api_method).observe(latency)
+        RESPONSE_BYTES.labels(api_method).observe(size)
 
     async def get_client_id(self, query_string: str) -> ClientID:
         response = await self.make_request(
             "getClientID",
             {"queryString": query_string},
-            ClientIDResponse,
+            CLIENT_ID,
             HTTP_METHOD.PUT,
         )
-        return ClientID(client_id=response.ClientID)
+        return ClientID(client_id=response["ClientID"])
 
     async def get_client_details(self, client_id: str) -> ClientDetails:
         response = await self.make_request(
             "getClientDetails",
             {"clientID": client_id},
-            ClientDetailsResponse,
+            CLIENT_DETAILS,
             HTTP_METHOD.PUT,
         )
         return ClientDetails(
-            full_name=f"{response.surname} {response.name} {response.patronymic or ''}".strip(),
-            phone=response.phone,
+            full_name=f"{response['surname']} {response['name']} {response['patronymic'] or ''}".strip(),
+            phone=response["phone"],
         )
 
     async def get_client_loans(self, client_id: str) -> ClientLoans:
         response = await self.make_request(
             "getClientLoans",
             {"clientID": client_id},
-            ClientLoansResponse,
+            CLIENT_LOANS_STREAM if self.streaming else CLIENT_LOANS,
             HTTP_METHOD.PUT,
         )
         return ClientLoans(
-            loans=[Loan(loan.LoanID, loan.pawnBillNumber) for loan in response.Loans]
+            loans=[
+                Loan(
+                    loan_id=loan["LoanID"],
+                    pawn_bill_number=loan["pawnBillNumber"],
+                    payment_date=loan["PaymentDate"],
+                    full_debt=loan["fullDebt"],
+                    prolongation_sum=loan["prolongationSum"],
+                    closed=loan["Closed"],
+                )
+                for loan in response["Loans"]
+            ]
         )
 
     async def get_loan_details(self, loan_id: str) -> LoanDetails:
         response = await self.make_request(
-            "getLoanDetails", {"loanID": loan_id}, LoanDetailsResponse, HTTP_METHOD.PUT
+            "getLoanDetails",
+            {"loanID": loan_id},
+            LOAN_DETAILS_STREAM if self.streaming else LOAN_DETAILS,
+            HTTP_METHOD.PUT,
         )
         return LoanDetails(
-            loan_number=response.LoanNumber,
-            loan_sum=response.LoanSum,
-            interests_sum=response.InterestsSum,
-            stuff=[item.Presentation for item in response.Stuff],
+            loan_number=response["LoanNumber"],
+            loan_sum=response["LoanSum"],
+            interests_sum=response["InterestsSum"],
+            stuff=[item["Presentation"] for item in response["Stuff"]],
         )
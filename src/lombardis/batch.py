@@ -0,0 +1,90 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple, TypeVar
+
+from lombardis.dto import ClientLoansBatch, LoanDetailsBatch
+from lombardis.protocols import LombardisAPI
+
+T = TypeVar("T")
+
+DEADLINE_EXCEEDED = "Batch deadline exceeded"
+
+
+@dataclass(frozen=True)
+class BatchLimits:
+    """Defaults for *_many calls: parallel upstream calls and seconds per batch."""
+
+    concurrency: int = 8
+    deadline: float = 10.0
+
+
+async def fan_out(
+    ids: Iterable[str],
+    fetch: Callable[[str], Awaitable[T]],
+    limits: BatchLimits,
+    concurrency: Optional[int] = None,
+    deadline: Optional[float] = None,
+) -> Tuple[Dict[str, T], Dict[str, str]]:
+    """Fetch every id with bounded concurrency, collecting per-id errors.
+
+    Ids still pending when the deadline passes are cancelled and reported as
+    errors; results that arrived in time are kept.
+    """
+    semaphore = asyncio.Semaphore(concurrency or limits.concurrency)
+    results: Dict[str, T] = {}
+    errors: Dict[str, str] = {}
+
+    async def fetch_one(item_id: str) -> None:
+        async with semaphore:
+            try:
+                results[item_id] = await fetch(item_id)
+            except Exception as e:
+                errors[item_id] = str(e) or type(e).__name__
+
+    unique_ids = list(dict.fromkeys(ids))
+    if not unique_ids:
+        return results, errors
+
+    tasks = [asyncio.create_task(fetch_one(item_id)) for item_id in unique_ids]
+    try:
+        await asyncio.wait(
+            tasks, timeout=deadline if deadline is not None else limits.deadline
+        )
+    finally:
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    for item_id in unique_ids:
+        if item_id not in results and item_id not in errors:
+            errors[item_id] = DEADLINE_EXCEEDED
+    return results, errors
+
+
+class LombardisBatchMixin(LombardisAPI):
+    """The *_many calls, fanned out to the class's own per-item calls."""
+
+    batch_limits: BatchLimits = BatchLimits()
+
+    async def get_client_loans_many(
+        self,
+        client_ids: Iterable[str],
+        concurrency: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ) -> ClientLoansBatch:
+        results, errors = await fan_out(
+            client_ids, self.get_client_loans, self.batch_limits, concurrency, deadline
+        )
+        return ClientLoansBatch(results=results, errors=errors)
+
+    async def get_loan_details_many(
+        self,
+        loan_ids: Iterable[str],
+        concurrency: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ) -> LoanDetailsBatch:
+        results, errors = await fan_out(
+            loan_ids, self.get_loan_details, self.batch_limits, concurrency, deadline
+        )
+        return LoanDetailsBatch(results=results, errors=errors)
@@ -0,0 +1,140 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable, Tuple
+
+from lombardis.batch import BatchLimits, LombardisBatchMixin
+from lombardis.dto import (
+    ClientDetails,
+    ClientID,
+    ClientLoans,
+    LoanDetails,
+)
+from lombardis.protocols import LombardisAPI
+
+
+@dataclass(frozen=True)
+class CacheTTL:
+    """Seconds each Lombardis method result stays fresh."""
+
+    client_details: float = 3600.0
+    client_loans: float = 60.0
+    loan_details: float = 60.0
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    size: int
+
+
+def approximate_size(value: Any) -> int:
+    return len(repr(value).encode())
+
+
+class LombardisCached(LombardisBatchMixin):
+    """LRU + TTL response cache in front of any LombardisAPI backend."""
+
+    def __init__(
+        self,
+        backend: LombardisAPI,
+        ttl: CacheTTL = CacheTTL(),
+        max_entries: int = 10_000,
+        max_bytes: int = 32 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+        batch_limits: BatchLimits = BatchLimits(),
+    ):
+        self.backend = backend
+        self.batch_limits = batch_limits
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.stats = CacheStats()
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+
+    async def connect(self) -> None:
+        await self.backend.connect()
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.stats.entries = 0
+        self.stats.bytes = 0
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self.stats.entries -= 1
+        self.stats.bytes -= entry.size
+
+    def _put(self, key: Hashable, value: Any, ttl: float) -> None:
+        if key in self._entries:
+            self._drop(key)
+        size = approximate_size(value)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = _Entry(value, self.clock() + ttl, size)
+        self.stats.entries += 1
+        self.stats.bytes += size
+        while (
+            self.stats.entries > self.max_entries or self.stats.bytes > self.max_bytes
+        ):
+            self._drop(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    async def _cached(
+        self, key: Tuple[str, str], ttl: float, fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > self.clock():
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return entry.value
+            self._drop(key)
+
+        self.stats.misses += 1
+        value = await fetch()
+        # A stale fallback (e.g. from LombardisMirror) is not worth keeping.
+        if not getattr(value, "stale", False):
+            self._put(key, value, ttl)
+        return value
+
+    async def get_client_id(self, query_string: str) -> ClientID:
+        return await self.backend.get_client_id(query_string)
+
+    async def get_client_details(self, client_id: str) -> ClientDetails:
+        result: ClientDetails = await self._cached(
+            ("getClientDetails", client_id),
+            self.ttl.client_details,
+            lambda: self.backend.get_client_details(client_id),
+        )
+        return result
+
+    async def get_client_loans(self, client_id: str) -> ClientLoans:
+        result: ClientLoans = await self._cached(
+            ("getClientLoans", client_id),
+            self.ttl.client_loans,
+            lambda: self.backend.get_client_loans(client_id),
+        )
+        return result
+
+    async def get_loan_details(self, loan_id: str) -> LoanDetails:
+        result: LoanDetails = await self._cached(
+            ("getLoanDetails", loan_id),
+            self.ttl.loan_details,
+            lambda: self.backend.get_loan_details(loan_id),
+        )
+        return result
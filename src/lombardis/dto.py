@@ -1,34 +1,52 @@
-from typing import List
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
 from uuid import UUID
 
-from pydantic.dataclasses import dataclass
 
-
-@dataclass
+@dataclass(slots=True)
 class ClientID:
     client_id: UUID
 
 
-@dataclass
+@dataclass(slots=True)
 class ClientDetails:
     full_name: str
     phone: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Loan:
     loan_id: UUID
     pawn_bill_number: str
+    payment_date: Optional[datetime] = None
+    full_debt: Optional[float] = None
+    prolongation_sum: Optional[float] = None
+    closed: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class ClientLoans:
     loans: List[Loan]
+    stale: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class LoanDetails:
     loan_number: str
     loan_sum: float
     interests_sum: float
     stuff: List[str]
+    stale: bool = False
+
+
+@dataclass(slots=True)
+class ClientLoansBatch:
+    results: Dict[str, ClientLoans]
+    errors: Dict[str, str]
+
+
+@dataclass(slots=True)
+class LoanDetailsBatch:
+    results: Dict[str, LoanDetails]
+    errors: Dict[str, str]
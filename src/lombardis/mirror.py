@@ -0,0 +1,151 @@
+import asyncio
+import dataclasses
+import logging
+import time
+from typing import (
+    Awaitable,
+    Callable,
+    Hashable,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from lombardis.batch import BatchLimits, LombardisBatchMixin
+from lombardis.dto import (
+    ClientDetails,
+    ClientID,
+    ClientLoans,
+    LoanDetails,
+)
+from lombardis.protocols import LombardisAPI
+from lombardis.singleflight import SingleFlight
+from lombardis.snapshots import LombardisSnapshotsSQLite, Snapshot
+
+T = TypeVar("T", ClientLoans, LoanDetails)
+
+logger = logging.getLogger(__name__)
+
+
+class LombardisMirror(LombardisBatchMixin):
+    """Serves loans from local snapshots and revalidates them in the background.
+
+    Snapshots older than ``refresh_after`` seconds are returned as-is while a
+    refresh runs in the background. They are marked ``stale`` once older than
+    ``stale_after`` or when the last refresh for them failed.
+    """
+
+    def __init__(
+        self,
+        backend: LombardisAPI,
+        snapshots: LombardisSnapshotsSQLite,
+        refresh_after: float = 60.0,
+        stale_after: float = 600.0,
+        clock: Callable[[], float] = time.time,
+        batch_limits: BatchLimits = BatchLimits(),
+    ):
+        self.backend = backend
+        self.batch_limits = batch_limits
+        self.snapshots = snapshots
+        self.refresh_after = refresh_after
+        self.stale_after = stale_after
+        self.clock = clock
+        self.refreshes = SingleFlight()
+        self._failed: Set[Hashable] = set()
+        self._background: Set[asyncio.Task[None]] = set()
+
+    async def connect(self) -> None:
+        await asyncio.gather(self.snapshots.bootstrap(), self.backend.connect())
+
+    async def close(self) -> None:
+        for task in self._background:
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+        await asyncio.gather(self.snapshots.close(), self.backend.close())
+
+    async def _fetch(
+        self,
+        key: Tuple[str, str],
+        fetch: Callable[[], Awaitable[T]],
+        store: Callable[[T, float], Awaitable[None]],
+    ) -> T:
+        value = await fetch()
+        try:
+            await store(value, self.clock())
+        except Exception as e:
+            logger.warning(f"Failed to store snapshot {key}: {e}")
+        self._failed.discard(key)
+        return value
+
+    async def _refresh(
+        self,
+        key: Tuple[str, str],
+        fetch: Callable[[], Awaitable[T]],
+        store: Callable[[T, float], Awaitable[None]],
+    ) -> None:
+        try:
+            await self.refreshes.do(key, lambda: self._fetch(key, fetch, store))
+        except Exception as e:
+            self._failed.add(key)
+            logger.warning(f"Background refresh of {key} failed: {e}")
+
+    def _refresh_in_background(
+        self,
+        key: Tuple[str, str],
+        fetch: Callable[[], Awaitable[T]],
+        store: Callable[[T, float], Awaitable[None]],
+    ) -> None:
+        task = asyncio.create_task(self._refresh(key, fetch, store))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _read(
+        self,
+        key: Tuple[str, str],
+        load: Callable[[], Awaitable[Optional[Snapshot[T]]]],
+        fetch: Callable[[], Awaitable[T]],
+        store: Callable[[T, float], Awaitable[None]],
+    ) -> T:
+        snapshot: Optional[Snapshot[T]] = None
+        try:
+            snapshot = await load()
+        except Exception as e:
+            logger.warning(f"Failed to load snapshot {key}: {e}")
+
+        if snapshot is None:
+            return await self.refreshes.do(key, lambda: self._fetch(key, fetch, store))
+
+        value, fetched_at = snapshot
+        age = self.clock() - fetched_at
+        if age >= self.refresh_after:
+            self._refresh_in_background(key, fetch, store)
+        if age >= self.stale_after or key in self._failed:
+            value = dataclasses.replace(value, stale=True)
+        return value
+
+    async def get_client_id(self, query_string: str) -> ClientID:
+        return await self.backend.get_client_id(query_string)
+
+    async def get_client_details(self, client_id: str) -> ClientDetails:
+        return await self.backend.get_client_details(client_id)
+
+    async def get_client_loans(self, client_id: str) -> ClientLoans:
+        return await self._read(
+            ("getClientLoans", client_id),
+            lambda: self.snapshots.get_client_loans(client_id),
+            lambda: self.backend.get_client_loans(client_id),
+            lambda value, fetched_at: self.snapshots.put_client_loans(
+                client_id, value, fetched_at
+            ),
+        )
+
+    async def get_loan_details(self, loan_id: str) -> LoanDetails:
+        return await self._read(
+            ("getLoanDetails", loan_id),
+            lambda: self.snapshots.get_loan_details(loan_id),
+            lambda: self.backend.get_loan_details(loan_id),
+            lambda value, fetched_at: self.snapshots.put_loan_details(
+                loan_id, value, fetched_at
+            ),
+        )
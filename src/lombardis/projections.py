@@ -0,0 +1,75 @@
+"""Lean decoding schemas: only the response fields the bot actually reads.
+
+The full response shapes live in ``lombardis.schemas``. Validating them builds
+objects for task metadata nobody uses, so responses are decoded straight from
+JSON bytes with these projections instead. Unknown fields are ignored.
+"""
+
+from datetime import datetime
+from typing import List, Optional, TypedDict
+from uuid import UUID
+
+from pydantic import TypeAdapter
+
+from lombardis.streaming import StreamingProjection
+
+
+class ClientIDProjection(TypedDict):
+    ClientID: UUID
+
+
+class ClientDetailsProjection(TypedDict):
+    surname: str
+    name: str
+    patronymic: Optional[str]
+    phone: str
+
+
+class LoanProjection(TypedDict):
+    LoanID: UUID
+    pawnBillNumber: str
+    PaymentDate: datetime
+    Closed: bool
+    fullDebt: float
+    prolongationSum: float
+
+
+class ClientLoansHeader(TypedDict):
+    pass
+
+
+class ClientLoansProjection(ClientLoansHeader):
+    Loans: List[LoanProjection]
+
+
+class StuffItemProjection(TypedDict):
+    Presentation: str
+
+
+class LoanDetailsHeader(TypedDict):
+    LoanNumber: str
+    LoanSum: float
+    InterestsSum: float
+
+
+class LoanDetailsProjection(LoanDetailsHeader):
+    Stuff: List[StuffItemProjection]
+
+
+CLIENT_ID = TypeAdapter(ClientIDProjection)
+CLIENT_DETAILS = TypeAdapter(ClientDetailsProjection)
+CLIENT_LOANS = TypeAdapter(ClientLoansProjection)
+LOAN_DETAILS = TypeAdapter(LoanDetailsProjection)
+
+CLIENT_LOANS_STREAM: StreamingProjection[ClientLoansProjection] = StreamingProjection(
+    TypeAdapter(ClientLoansHeader),
+    tuple(ClientLoansHeader.__annotations__),
+    "Loans",
+    TypeAdapter(LoanProjection),
+)
+LOAN_DETAILS_STREAM: StreamingProjection[LoanDetailsProjection] = StreamingProjection(
+    TypeAdapter(LoanDetailsHeader),
+    tuple(LoanDetailsHeader.__annotations__),
+    "Stuff",
+    TypeAdapter(StuffItemProjection),
+)
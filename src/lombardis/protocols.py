@@ -1,9 +1,20 @@
-from typing import Protocol
+from typing import Iterable, Optional, Protocol
 
-from lombardis.dto import ClientDetails, ClientID, ClientLoans, LoanDetails
+from lombardis.dto import (
+    ClientDetails,
+    ClientID,
+    ClientLoans,
+    ClientLoansBatch,
+    LoanDetails,
+    LoanDetailsBatch,
+)
 
 
 class LombardisAPI(Protocol):
+    async def connect(self) -> None: ...
+
+    async def close(self) -> None: ...
+
     async def get_client_loans(self, client_id: str) -> ClientLoans: ...
 
     async def get_client_details(self, client_id: str) -> ClientDetails: ...
@@ -11,3 +22,17 @@ class LombardisAPI(Protocol):
     async def get_loan_details(self, loan_id: str) -> LoanDetails: ...
 
     async def get_client_id(self, query_string: str) -> ClientID: ...
+
+    async def get_client_loans_many(
+        self,
+        client_ids: Iterable[str],
+        concurrency: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ) -> ClientLoansBatch: ...
+
+    async def get_loan_details_many(
+        self,
+        loan_ids: Iterable[str],
+        concurrency: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ) -> LoanDetailsBatch: ...
@@ -0,0 +1,149 @@
+import asyncio
+import enum
+import random
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Mapping, Optional
+
+from aiohttp import ClientConnectionError, ClientResponseError
+
+
+class LombardisUnavailable(RuntimeError):
+    """Raised without calling the upstream while the circuit breaker is open."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter between attempts."""
+
+    attempts: int = 3
+    base_delay: float = 0.1
+    max_delay: float = 2.0
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+@dataclass(frozen=True)
+class CallPolicy:
+    """How one Lombardis api_method is called.
+
+    ``deadline`` bounds a single attempt. Only idempotent calls are retried or
+    hedged; a hedge is a second attempt started once the first one is slower
+    than ``hedge_quantile`` of the method's recent latencies.
+    """
+
+    deadline: float = 5.0
+    idempotent: bool = True
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+    hedge_quantile: Optional[float] = None
+
+
+DEFAULT_POLICIES: Mapping[str, CallPolicy] = {
+    "getClientID": CallPolicy(deadline=10.0),
+    "getClientDetails": CallPolicy(deadline=5.0),
+    "getClientLoans": CallPolicy(deadline=5.0, hedge_quantile=0.95),
+    "getLoanDetails": CallPolicy(deadline=5.0, hedge_quantile=0.95),
+}
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, ClientResponseError):
+        return error.status >= 500 or error.status == 429
+    return isinstance(error, (asyncio.TimeoutError, ClientConnectionError))
+
+
+class CircuitState(enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Opens when the failure rate over the last ``window`` calls spikes.
+
+    While open, calls fail fast for ``open_for`` seconds. After that a single
+    probe call is let through: success closes the circuit, failure reopens it.
+    """
+
+    def __init__(
+        self,
+        window: int = 20,
+        min_calls: int = 10,
+        failure_rate: float = 0.5,
+        open_for: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_for = open_for
+        self.clock = clock
+        self.state = CircuitState.CLOSED
+        self.opened_at = 0.0
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state is CircuitState.CLOSED:
+            return True
+        if self.state is CircuitState.OPEN:
+            if self.clock() - self.opened_at < self.open_for:
+                return False
+            self.state = CircuitState.HALF_OPEN
+        if self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def release_probe(self) -> None:
+        """The probe ended without an outcome (e.g. cancelled); let another try."""
+        if self.state is CircuitState.HALF_OPEN:
+            self._probing = False
+
+    def record_success(self) -> None:
+        if self.state is CircuitState.HALF_OPEN:
+            self.state = CircuitState.CLOSED
+            self._outcomes.clear()
+            self._probing = False
+        self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        if self.state is CircuitState.HALF_OPEN:
+            self._open()
+            return
+        self._outcomes.append(False)
+        failures = self._outcomes.count(False)
+        if (
+            len(self._outcomes) >= self.min_calls
+            and failures / len(self._outcomes) >= self.failure_rate
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        self.state = CircuitState.OPEN
+        self.opened_at = self.clock()
+        self._outcomes.clear()
+        self._probing = False
+
+
+class LatencyTracker:
+    """Recent latencies per api_method, used to pick hedging delays."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, api_method: str, latency: float) -> None:
+        samples = self._samples.get(api_method)
+        if samples is None:
+            samples = self._samples[api_method] = deque(maxlen=self.window)
+        samples.append(latency)
+
+    def quantile(self, api_method: str, q: float) -> Optional[float]:
+        samples = self._samples.get(api_method)
+        if samples is None or len(samples) < self.min_samples:
+            return None
+        return statistics.quantiles(samples, n=100)[min(98, int(q * 100) - 1)]
@@ -0,0 +1,62 @@
+import asyncio
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class SingleFlightStats:
+    calls: int = 0
+    executions: int = 0
+    coalesced: int = 0
+
+
+@dataclass
+class _Flight:
+    task: "asyncio.Future[Any]"
+    waiters: int = field(default=0)
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time and shares its outcome.
+
+    Every caller waits on the shared task through ``asyncio.shield``, so a
+    cancelled waiter never cancels the call for the others. The call itself
+    is cancelled only when its last waiter goes away.
+    """
+
+    def __init__(self) -> None:
+        self.stats = SingleFlightStats()
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def _forget(self, key: Hashable, flight: _Flight, *_: Any) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        self.stats.calls += 1
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(call()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(partial(self._forget, key, flight))
+            self.stats.executions += 1
+        else:
+            self.stats.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            result: T = await asyncio.shield(flight.task)
+            return result
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+                # The call may take a while to unwind; don't let new
+                # callers join it in the meantime.
+                self._forget(key, flight)
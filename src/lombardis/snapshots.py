@@ -0,0 +1,109 @@
+from typing import Any, Dict, Optional, Tuple, TypeVar
+
+import aiosqlite
+from pydantic import TypeAdapter
+
+from config import conf
+
+from lombardis.dto import ClientLoans, LoanDetails
+from repository import sqlite
+
+T = TypeVar("T")
+
+Snapshot = Tuple[T, float]
+
+_TABLES: Dict[str, Tuple[str, TypeAdapter[Any]]] = {
+    "client_loans": ("client_id", TypeAdapter(ClientLoans)),
+    "loan_details": ("loan_id", TypeAdapter(LoanDetails)),
+}
+
+
+class LombardisSnapshotsSQLite:
+    """Last known Lombardis responses with the time they were fetched."""
+
+    def __init__(self, db_name: str = conf["LOMBARDIS_DB"]):
+        self.db_name = db_name
+        self.connection: aiosqlite.Connection | None = None
+
+    async def connect(self) -> None:
+        if self.connection is None:
+            try:
+                self.connection = await sqlite.connect(self.db_name)
+            except Exception as e:
+                raise RuntimeError(f"Failed to connect to sqlite database: {e}")
+
+    async def close(self) -> None:
+        if self.connection:
+            try:
+                await self.connection.close()
+                self.connection = None
+            except Exception as e:
+                raise RuntimeError(f"Failed to close sqlite database connection: {e}")
+
+    async def bootstrap(self) -> None:
+        try:
+            await self.connect()
+            assert self.connection is not None
+            for table, (key, _) in _TABLES.items():
+                await self.connection.execute(
+                    f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        {key} TEXT PRIMARY KEY,
+                        payload TEXT NOT NULL,
+                        fetched_at REAL NOT NULL
+                    )
+                    """
+                )
+            await self.connection.commit()
+        except Exception as e:
+            raise RuntimeError(f"Failed to bootstrap sqlite database tables: {e}")
+
+    async def _get(self, table: str, key_value: str) -> Optional[Snapshot[Any]]:
+        key, adapter = _TABLES[table]
+        try:
+            await self.connect()
+            assert self.connection is not None
+            async with self.connection.execute(
+                f"SELECT payload, fetched_at FROM {table} WHERE {key} = ?",
+                (key_value,),
+            ) as cursor:
+                row = await cursor.fetchone()
+        except Exception as e:
+            raise RuntimeError(f"Failed to read {table} snapshot: {e}")
+        if row is None:
+            return None
+        return adapter.validate_json(row[0]), row[1]
+
+    async def _put(
+        self, table: str, key_value: str, value: Any, fetched_at: float
+    ) -> None:
+        key, adapter = _TABLES[table]
+        try:
+            await self.connect()
+            assert self.connection is not None
+            await self.connection.execute(
+                f"""
+                INSERT OR REPLACE INTO {table} ({key}, payload, fetched_at)
+                VALUES (?, ?, ?)
+                """,
+                (key_value, adapter.dump_json(value, exclude={"stale"}), fetched_at),
+            )
+            await self.connection.commit()
+        except Exception as e:
+            raise RuntimeError(f"Failed to write {table} snapshot: {e}")
+
+    async def get_client_loans(self, client_id: str) -> Optional[Snapshot[ClientLoans]]:
+        return await self._get("client_loans", client_id)
+
+    async def put_client_loans(
+        self, client_id: str, client_loans: ClientLoans, fetched_at: float
+    ) -> None:
+        await self._put("client_loans", client_id, client_loans, fetched_at)
+
+    async def get_loan_details(self, loan_id: str) -> Optional[Snapshot[LoanDetails]]:
+        return await self._get("loan_details", loan_id)
+
+    async def put_loan_details(
+        self, loan_id: str, loan_details: LoanDetails, fetched_at: float
+    ) -> None:
+        await self._put("loan_details", loan_id, loan_details, fetched_at)
@@ -0,0 +1,195 @@
+"""Incremental decoding of large Lombardis responses.
+
+Lombardis wraps every list (``Loans``, ``Stuff``) in one top-level JSON object.
+``ObjectStreamParser`` splits that object into top-level fields while decoding
+the chosen array item by item as soon as each one is complete, so only the
+current item is buffered, never the whole body.
+"""
+
+import codecs
+import json
+import re
+from dataclasses import dataclass, replace
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    cast,
+)
+
+from pydantic import TypeAdapter
+
+T = TypeVar("T")
+
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+_DECODER = json.JSONDecoder()
+_DELIMITERS = frozenset(" \t\r\n,:]}")
+
+ITEM = object()
+
+
+class _State:
+    BEFORE_OBJECT = 0
+    KEY = 1
+    COLON = 2
+    VALUE = 3
+    ARRAY_OPEN = 4
+    ITEM = 5
+    DONE = 6
+
+
+class ObjectStreamParser:
+    """Yields top-level fields and the items of ``array_key`` from chunks.
+
+    Values are decoded with the C JSON scanner as soon as they are complete;
+    an incomplete value at the end of the buffer is retried when the next
+    chunk arrives.
+    """
+
+    def __init__(self, array_key: str):
+        self.array_key = array_key
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _State.BEFORE_OBJECT
+        self._key = ""
+
+    @property
+    def done(self) -> bool:
+        return self._state == _State.DONE
+
+    def feed(self, chunk: bytes) -> Iterator[Tuple[Any, Any]]:
+        """Yield ``(key, value)`` for fields and ``(ITEM, value)`` for items."""
+        # Keep only the unfinished token so memory stays bounded by one item.
+        self._buffer = self._buffer[self._pos :] + self._text.decode(chunk)
+        self._pos = 0
+        yield from self._parse()
+
+    def _next_char(self) -> Optional[str]:
+        self._pos = _WHITESPACE.match(self._buffer, self._pos).end()  # type: ignore[union-attr]
+        if self._pos < len(self._buffer):
+            return self._buffer[self._pos]
+        return None
+
+    def _decode_value(self) -> Tuple[bool, Any]:
+        """Decode the value at the cursor if it is complete and delimited."""
+        try:
+            value, end = _DECODER.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            return False, None
+        # A number cut by the chunk boundary ("12" of "12.5") only ends at a
+        # delimiter, so wait for one before accepting it.
+        if end >= len(self._buffer) or self._buffer[end] not in _DELIMITERS:
+            return False, None
+        self._pos = end
+        return True, value
+
+    def _parse(self) -> Iterator[Tuple[Any, Any]]:
+        while self._state != _State.DONE:
+            char = self._next_char()
+            if char is None:
+                return
+
+            if self._state == _State.BEFORE_OBJECT:
+                if char != "{":
+                    raise ValueError("Expected a JSON object")
+                self._pos += 1
+                self._state = _State.KEY
+
+            elif self._state == _State.KEY:
+                if char == ",":
+                    self._pos += 1
+                elif char == "}":
+                    self._pos += 1
+                    self._state = _State.DONE
+                elif char != '"':
+                    raise ValueError("Expected an object key")
+                else:
+                    complete, self._key = self._decode_value()
+                    if not complete:
+                        return
+                    self._state = _State.COLON
+
+            elif self._state == _State.COLON:
+                if char != ":":
+                    raise ValueError("Expected ':' after an object key")
+                self._pos += 1
+                self._state = (
+                    _State.ARRAY_OPEN if self._key == self.array_key else _State.VALUE
+                )
+
+            elif self._state == _State.ARRAY_OPEN:
+                if char == "[":
+                    self._pos += 1
+                    self._state = _State.ITEM
+                else:
+                    self._state = _State.VALUE
+
+            elif self._state == _State.ITEM:
+                if char == ",":
+                    self._pos += 1
+                elif char == "]":
+                    self._pos += 1
+                    self._state = _State.KEY
+                else:
+                    complete, value = self._decode_value()
+                    if not complete:
+                        return
+                    yield ITEM, value
+
+            elif self._state == _State.VALUE:
+                complete, value = self._decode_value()
+                if not complete:
+                    return
+                yield self._key, value
+                self._state = _State.KEY
+
+
+@dataclass(frozen=True)
+class StreamingProjection(Generic[T]):
+    """Builds a projection TypedDict from a chunk stream, one array item at a time.
+
+    ``header`` is the projection without the array; its fields are decoded
+    from the top-level object, every array item is validated with ``item`` as
+    soon as it is complete. With ``limit`` decoding stops once that many
+    items and all header fields have been collected.
+    """
+
+    header: TypeAdapter[Any]
+    header_fields: Tuple[str, ...]
+    array_key: str
+    item: TypeAdapter[Any]
+    limit: Optional[int] = None
+
+    def with_limit(self, limit: Optional[int]) -> "StreamingProjection[T]":
+        return replace(self, limit=limit)
+
+    async def decode(self, chunks: AsyncIterator[bytes]) -> T:
+        parser = ObjectStreamParser(self.array_key)
+        fields: Dict[str, Any] = {}
+        items: List[Any] = []
+        async for chunk in chunks:
+            for key, raw in parser.feed(chunk):
+                if key is ITEM:
+                    if self.limit is None or len(items) < self.limit:
+                        items.append(self.item.validate_python(raw))
+                elif key in self.header_fields:
+                    fields[key] = raw
+            if (
+                self.limit is not None
+                and len(items) >= self.limit
+                and len(fields) == len(self.header_fields)
+            ):
+                break
+        else:
+            if not parser.done:
+                raise ValueError("Truncated or malformed JSON response")
+        header = self.header.validate_python(fields)
+        header[self.array_key] = items
+        return cast(T, header)
@@ -5,47 +5,145 @@ from aiohttp import web
 
 from config import conf
 from lombardis.api import LombardisAsyncHTTP
+from lombardis.cache import CacheTTL, LombardisCached
+from lombardis.mirror import LombardisMirror
 from lombardis.protocols import LombardisAPI
+from lombardis.snapshots import LombardisSnapshotsSQLite
+from metrics.loop import LoopLagMonitor
+from repository.cached import UsersRepoCached
 from repository.protocols import UsersRepo
-from repository.users import UsersRepoSQLite
-from telegram.bot import get_dispatcher
+from repository.users import SQLitePerformance, UsersRepoSQLite
+from repository.writer import GroupCommit
+from telegram.bot import get_bot, get_dispatcher
+from telegram.dedup import SeenUpdates
 from telegram.handlers.commands_menu import set_bot_commands
+from telegram.metrics import (
+    instrument_dispatcher,
+    watch_fsm,
+    watch_scheduler,
+    watch_sender,
+    watch_updates,
+)
+from telegram.prefetch import LoanPrefetcher
+from telegram.render import RenderCache
+from telegram.scheduler import ChatScheduler
+from telegram.storage import MemoryStorageTTL, SQLiteStorage
 from telegram.webhook import get_webhook_app
+from telegram.workers import WorkerPool, get_front_app, worker_urls
 from tests.fakes.lombardis import LombardisFake
 
 
-async def init(bot: Bot, users: UsersRepo) -> None:
-    tasks = [
-        users.bootstrap(),
-        set_bot_commands(bot),
-    ]
+async def init(bot: Bot, users: UsersRepo, register_commands: bool = True) -> None:
+    tasks = [users.bootstrap()]
+    if register_commands:
+        tasks.append(set_bot_commands(bot))
     await asyncio.gather(*tasks)
 
 
-if __name__ == "__main__":
+def serve(host: str, port: int, register_webhook: bool = True) -> None:
     loop = asyncio.new_event_loop()
-    dp, bot = get_dispatcher()
+    storage: MemoryStorageTTL
+    max_states = int(conf.get("FSM_MAX_STATES", "100000"))
+    if "FSM_DB" in conf:
+        storage = SQLiteStorage(conf["FSM_DB"], max_states=max_states)
+    else:
+        idle_ttl = float(conf.get("FSM_IDLE_TTL", "86400"))
+        storage = MemoryStorageTTL(idle_ttl=idle_ttl, max_states=max_states)
+    polling = conf["POLLING"].lower() == "true"
+    scheduled = not polling and (
+        conf.get("WEBHOOK_SCHEDULER", "false").lower() == "true"
+    )
+    seen = SeenUpdates()
+    # ScheduledRequestHandler drops duplicates itself, before dispatching.
+    dp, bot = get_dispatcher(storage, seen=None if scheduled else seen)
+    dp.shutdown.register(storage.close)
 
     lombardis: LombardisAPI
     users: UsersRepo
+    cache_ttl = CacheTTL()
 
     if conf["DEMO_MODE"].lower() == "true":
-        lombardis = LombardisFake()
+        lombardis = LombardisCached(LombardisFake(), cache_ttl)
         users = UsersRepoSQLite(db_name=":memory:")
     else:
-        lombardis = LombardisAsyncHTTP()
-        users = UsersRepoSQLite()
+        streaming = conf.get("LOMBARDIS_STREAMING", "false").lower() == "true"
+        # No response cache in front of the mirror: it would keep stale
+        # snapshots past recovery and hide reads from its revalidation.
+        lombardis = LombardisMirror(
+            LombardisAsyncHTTP(streaming=streaming), LombardisSnapshotsSQLite()
+        )
+        performance = None
+        if conf.get("USERS_DB_PERFORMANCE", "false").lower() == "true":
+            performance = SQLitePerformance()
+        group_commit = None
+        if conf.get("USERS_DB_GROUP_COMMIT", "false").lower() == "true":
+            group_commit = GroupCommit()
+        users = UsersRepoSQLite(performance=performance, group_commit=group_commit)
+
+    users = UsersRepoCached(users)
 
-    loop.run_until_complete(init(bot, users))
+    if conf.get("LOMBARDIS_PREFETCH", "false").lower() == "true":
+        prefetcher = LoanPrefetcher(lombardis, ttl=cache_ttl.loan_details)
+        dp["prefetcher"] = prefetcher
+        dp.shutdown.register(prefetcher.close)
+    dp["renders"] = RenderCache()
+
+    loop.run_until_complete(init(bot, users, register_commands=register_webhook))
+    dp.startup.register(lombardis.connect)
     dp.shutdown.register(users.close)
+    dp.shutdown.register(lombardis.close)
+
+    metrics = conf.get("METRICS", "false").lower() == "true"
+    if metrics:
+        instrument_dispatcher(dp)
+        watch_fsm(storage)
+        watch_sender(bot)
+        watch_updates(seen)
+        monitor = LoopLagMonitor()
+        dp.startup.register(monitor.start)
+        dp.shutdown.register(monitor.close)
 
-    if conf["POLLING"].lower() == "true":
+    if polling:
         # polling mode
         loop.run_until_complete(dp.start_polling(bot, users=users, lombardis=lombardis))
     else:
         # webhook mode
+        scheduler = None
+        if scheduled:
+            concurrency = int(conf.get("WEBHOOK_CONCURRENCY", "64"))
+            scheduler = ChatScheduler(concurrency=concurrency)
+            if metrics:
+                watch_scheduler(scheduler)
         web.run_app(
-            get_webhook_app(dp, bot, users, lombardis),
-            host=conf["WEB_SERVER_HOST"],
-            port=int(conf["WEB_SERVER_PORT"]),
+            get_webhook_app(
+                dp, bot, users, lombardis, register_webhook, scheduler, seen, metrics
+            ),
+            host=host,
+            port=port,
         )
+
+
+def serve_worker(port: int) -> None:
+    serve("127.0.0.1", port, register_webhook=False)
+
+
+def serve_front(workers: int) -> None:
+    port = int(conf["WEB_SERVER_PORT"])
+    pool = WorkerPool(serve_worker, [port + 1 + i for i in range(workers)])
+    pool.start()
+    try:
+        bot = get_bot()
+        asyncio.run(set_bot_commands(bot))
+        app = get_front_app(bot, worker_urls("127.0.0.1", port + 1, workers))
+        app.cleanup_ctx.append(pool.supervise)
+        web.run_app(app, host=conf["WEB_SERVER_HOST"], port=port)
+    finally:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    workers = int(conf.get("WEB_WORKERS", "1"))
+    if conf["POLLING"].lower() != "true" and workers > 1:
+        serve_front(workers)
+    else:
+        serve(conf["WEB_SERVER_HOST"], int(conf["WEB_SERVER_PORT"]))
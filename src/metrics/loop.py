@@ -0,0 +1,44 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from .registry import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG = REGISTRY.histogram(
+    "event_loop_lag_seconds", "How late the event loop woke up a timer."
+)
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a sleeper up.
+
+    Anything blocking the loop (CPU-heavy handlers, sync I/O) shows up as lag
+    for every update being processed at the same time.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.last_lag = 0.0
+        self._task: Optional[asyncio.Task[None]] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, time.perf_counter() - expected)
+            LOOP_LAG.observe(self.last_lag)
+            if self.last_lag > 1.0:
+                logger.warning(f"Event loop lagged {self.last_lag:.2f}s")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
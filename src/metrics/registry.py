@@ -0,0 +1,276 @@
+import functools
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    ParamSpec,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from .tracing import span
+
+T = TypeVar("T")
+P = ParamSpec("P")
+
+Labels = Tuple[str, ...]
+
+# Seconds; from a cached read (~100us) to a Lombardis call hitting its deadline.
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# Bytes.
+SIZE_BUCKETS = (256, 1024, 4096, 16_384, 65_536, 262_144, 1_048_576, 4_194_304)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric(ABC):
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    @abstractmethod
+    def samples(self) -> Iterator[Tuple[str, Labels, Labels, float]]:
+        """(suffix, extra label names, label values, value) per sample."""
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for suffix, extra_names, values, value in self.samples():
+            labels = _format_labels(self.labelnames + extra_names, values)
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class _CounterValue:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._children: Dict[Labels, _CounterValue] = {}
+
+    def labels(self, *values: str) -> _CounterValue:
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = _CounterValue()
+        return child
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def samples(self) -> Iterator[Tuple[str, Labels, Labels, float]]:
+        for values, child in self._children.items():
+            yield "", (), values, child.value
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.bounds = tuple(sorted(buckets))
+        self._children: Dict[Labels, _HistogramValue] = {}
+
+    def labels(self, *values: str) -> _HistogramValue:
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = _HistogramValue(self.bounds)
+        return child
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def samples(self) -> Iterator[Tuple[str, Labels, Labels, float]]:
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float("inf"),), child.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                yield "_bucket", ("le",), values + (le,), cumulative
+            yield "_sum", (), values, child.sum
+            yield "_count", (), values, cumulative
+
+
+class Gauge(Metric):
+    """Read at scrape time from ``collect``, which maps label values to values.
+
+    Totals kept elsewhere (e.g. SenderStats) are exposed with type="counter".
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        collect: Callable[[], Dict[Labels, float]],
+        labelnames: Sequence[str] = (),
+        type: str = "gauge",
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+        self.type = type
+
+    def samples(self) -> Iterator[Tuple[str, Labels, Labels, float]]:
+        for values, value in self.collect().items():
+            yield "", (), values, value
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self._metrics:
+            raise RuntimeError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def unregister(self, name: str) -> None:
+        self._metrics.pop(name, None)
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        counter = Counter(name, documentation, labelnames)
+        self.register(counter)
+        return counter
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        histogram = Histogram(name, documentation, labelnames, buckets)
+        self.register(histogram)
+        return histogram
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        collect: Callable[[], Dict[Labels, float]],
+        labelnames: Sequence[str] = (),
+        type: str = "gauge",
+    ) -> Gauge:
+        """(Re)register a gauge; the newest ``collect`` wins."""
+        self.unregister(name)
+        gauge = Gauge(name, documentation, collect, labelnames, type)
+        self.register(gauge)
+        return gauge
+
+    def render(self, metrics: Optional[Iterable[Metric]] = None) -> str:
+        lines: List[str] = []
+        for metric in metrics if metrics is not None else self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def timed(
+    histogram: Histogram, *labels: str, kind: Optional[str] = None
+) -> Callable[
+    [Callable[P, Coroutine[Any, Any, T]]], Callable[P, Coroutine[Any, Any, T]]
+]:
+    """Observe how long each call of the decorated coroutine function takes.
+
+    With ``kind`` the call is also recorded as a span of the current trace.
+    """
+    child = histogram.labels(*labels)
+    name = ".".join(labels) or histogram.name
+
+    def decorator(
+        function: Callable[P, Coroutine[Any, Any, T]],
+    ) -> Callable[P, Coroutine[Any, Any, T]]:
+        @functools.wraps(function)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            started = time.perf_counter()
+            try:
+                if kind is None:
+                    return await function(*args, **kwargs)
+                with span(kind, name):
+                    return await function(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - started)
+
+        return wrapper
+
+    return decorator
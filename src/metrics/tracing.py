@@ -0,0 +1,73 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+
+@dataclass(slots=True)
+class Span:
+    kind: str
+    name: str
+    start: float
+    duration: float
+
+
+@dataclass
+class Trace:
+    update_id: int
+    update_type: str
+    chat_id: Optional[int] = None
+    started: float = field(default_factory=time.perf_counter)
+    duration: float = 0.0
+    error: Optional[str] = None
+    spans: List[Span] = field(default_factory=list)
+    finished: bool = False
+
+    def totals(self) -> Dict[str, float]:
+        """Time spent per span kind; overlapping spans are counted twice."""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span.kind] = totals.get(span.kind, 0.0) + span.duration
+        return totals
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "update_id": self.update_id,
+            "update_type": self.update_type,
+            "chat_id": self.chat_id,
+            "duration": round(self.duration, 6),
+            "error": self.error,
+            "totals": {k: round(v, 6) for k, v in self.totals().items()},
+            "spans": [
+                {
+                    "kind": span.kind,
+                    "name": span.name,
+                    "start": round(span.start, 6),
+                    "duration": round(span.duration, 6),
+                }
+                for span in self.spans
+            ],
+        }
+
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+@contextmanager
+def span(kind: str, name: str) -> Iterator[None]:
+    """Time a block as part of the update being handled, if any."""
+    trace = current_trace.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        # Tasks spawned by a handler may outlive its trace.
+        if not trace.finished:
+            finished = time.perf_counter()
+            trace.spans.append(
+                Span(kind, name, started - trace.started, finished - started)
+            )
@@ -0,0 +1,119 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from .dto import User
+from .protocols import UsersRepo
+
+
+@dataclass
+class UsersCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class UsersRepoCached:
+    """Write-through LRU of users by chat_id in front of another UsersRepo.
+
+    Unknown chat_ids are cached as negative entries for ``negative_ttl``
+    seconds, so repeated /start taps from unauthorized users stay off the
+    database as well.
+    """
+
+    def __init__(
+        self,
+        backend: UsersRepo,
+        max_entries: int = 10_000,
+        negative_ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.backend = backend
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+        self.stats = UsersCacheStats()
+        self._users: OrderedDict[int, Tuple[Optional[User], float]] = OrderedDict()
+
+    async def connect(self) -> None:
+        await self.backend.connect()
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+    async def bootstrap(self) -> None:
+        await self.backend.bootstrap()
+
+    def _store(self, chat_id: int, user: Optional[User]) -> None:
+        expires_at = (
+            float("inf") if user is not None else self.clock() + self.negative_ttl
+        )
+        self._users[chat_id] = (user, expires_at)
+        self._users.move_to_end(chat_id)
+        while len(self._users) > self.max_entries:
+            self._users.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _lookup(self, chat_id: int) -> Tuple[bool, Optional[User]]:
+        entry = self._users.get(chat_id)
+        if entry is not None and entry[1] > self.clock():
+            self._users.move_to_end(chat_id)
+            self.stats.hits += 1
+            return True, entry[0]
+        self.stats.misses += 1
+        return False, None
+
+    async def get_user_by_chat_id(self, chat_id: int) -> Optional[User]:
+        found, user = self._lookup(chat_id)
+        if found:
+            return user
+
+        user = await self.backend.get_user_by_chat_id(chat_id)
+        self._store(chat_id, user)
+        return user
+
+    async def _remember(self, user: Optional[User]) -> Optional[User]:
+        if user is not None:
+            self._store(user.chat_id, user)
+        return user
+
+    async def get_user_by_client_id(self, client_id: str) -> Optional[User]:
+        return await self._remember(await self.backend.get_user_by_client_id(client_id))
+
+    async def get_user_by_phone(self, phone_number: str) -> Optional[User]:
+        return await self._remember(await self.backend.get_user_by_phone(phone_number))
+
+    async def get_users(self, chat_ids: Iterable[int]) -> Dict[int, User]:
+        users: Dict[int, User] = {}
+        missing = []
+        for chat_id in dict.fromkeys(chat_ids):
+            found, user = self._lookup(chat_id)
+            if not found:
+                missing.append(chat_id)
+            elif user is not None:
+                users[chat_id] = user
+
+        if missing:
+            fetched = await self.backend.get_users(missing)
+            for chat_id in missing:
+                self._store(chat_id, fetched.get(chat_id))
+            users.update(fetched)
+        return users
+
+    async def user_exists(self, chat_id: int) -> bool:
+        return await self.get_user_by_chat_id(chat_id) is not None
+
+    async def add_user(self, user: User) -> None:
+        try:
+            await self.backend.add_user(user)
+        except Exception:
+            self._users.pop(user.chat_id, None)
+            raise
+        self._store(user.chat_id, user)
+
+    async def get_user(self, params: Dict[str, Any]) -> Optional[User]:
+        if params.keys() == {"chat_id"}:
+            return await self.get_user_by_chat_id(params["chat_id"])
+
+        return await self._remember(await self.backend.get_user(params))
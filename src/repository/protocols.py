@@ -1,4 +1,4 @@
-from typing import Any, Dict, Optional, Protocol
+from typing import Any, Dict, Iterable, Optional, Protocol
 
 from .dto import User
 
@@ -17,3 +17,11 @@ class UsersRepo(Protocol):
     async def add_user(self, user: User) -> None: ...
 
     async def get_user(self, params: Dict[str, Any]) -> Optional[User]: ...
+
+    async def get_user_by_chat_id(self, chat_id: int) -> Optional[User]: ...
+
+    async def get_user_by_client_id(self, client_id: str) -> Optional[User]: ...
+
+    async def get_user_by_phone(self, phone_number: str) -> Optional[User]: ...
+
+    async def get_users(self, chat_ids: Iterable[int]) -> Dict[int, User]: ...
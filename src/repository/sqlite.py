@@ -0,0 +1,19 @@
+from typing import Any
+
+import aiosqlite
+
+# With WEB_WORKERS>1 every worker process opens the same database files.
+BUSY_TIMEOUT_MS = 5000
+
+
+async def connect(db_name: str, **kwargs: Any) -> aiosqlite.Connection:
+    """Open a connection that can share its file with other processes.
+
+    WAL lets readers in one process run alongside a writer in another, and
+    the busy timeout makes a locked database wait instead of failing.
+    """
+    connection = await aiosqlite.connect(db_name, **kwargs)
+    await connection.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    if db_name != ":memory:":
+        await connection.execute("PRAGMA journal_mode=WAL")
+    return connection
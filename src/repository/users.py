@@ -1,31 +1,146 @@
-from typing import Any, Dict, Optional
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
 
 import aiosqlite
 
 from config import conf
+from metrics.registry import REGISTRY, timed
 
+from . import sqlite
 from .dto import User
+from .writer import GroupCommit, GroupCommitWriter
+
+QUERY_SECONDS = REGISTRY.histogram(
+    "users_db_query_seconds", "UsersRepoSQLite calls, per method.", ("method",)
+)
+
+INSERT_USER = """
+    INSERT INTO users (chat_id, full_name, client_id, phone_number)
+    VALUES (?, ?, ?, ?)
+"""
+SELECT_USER = "SELECT chat_id, full_name, client_id, phone_number FROM users"
+SELECT_BY_CHAT_ID = f"{SELECT_USER} WHERE chat_id = ?"
+SELECT_BY_CLIENT_ID = f"{SELECT_USER} WHERE client_id = ?"
+SELECT_BY_PHONE = f"{SELECT_USER} WHERE phone_number = ?"
+# One fixed statement for any batch size: ids travel as a single JSON array.
+SELECT_BY_CHAT_IDS = f"{SELECT_USER} WHERE chat_id IN (SELECT value FROM json_each(?))"
+
+LOOKUPS = {
+    "chat_id": SELECT_BY_CHAT_ID,
+    "client_id": SELECT_BY_CLIENT_ID,
+    "phone_number": SELECT_BY_PHONE,
+}
+
+
+@dataclass(frozen=True)
+class SQLitePerformance:
+    """Opt-in tuning: WAL journaling, relaxed fsync and a pool of readers."""
+
+    readers: int = 4
+    synchronous: str = "NORMAL"
+    mmap_size: int = 256 * 1024 * 1024
+    cache_size: int = -64 * 1024  # negative means KiB
+    cached_statements: int = 256
+
+    @property
+    def pragmas(self) -> List[str]:
+        return [
+            "PRAGMA journal_mode=WAL",
+            f"PRAGMA synchronous={self.synchronous}",
+            f"PRAGMA mmap_size={self.mmap_size}",
+            f"PRAGMA cache_size={self.cache_size}",
+        ]
+
+
+def _to_user(row: Optional[aiosqlite.Row]) -> Optional[User]:
+    if row is None:
+        return None
+    return User(chat_id=row[0], full_name=row[1], client_id=row[2], phone_number=row[3])
 
 
 class UsersRepoSQLite:
-    def __init__(self, db_name: str = conf["USERS_DB"]):
+    def __init__(
+        self,
+        db_name: str = conf["USERS_DB"],
+        performance: Optional[SQLitePerformance] = None,
+        group_commit: Optional[GroupCommit] = None,
+    ):
         self.db_name = db_name
+        self.performance = performance
+        self.group_commit = group_commit
         self.connection: aiosqlite.Connection | None = None
+        self.writer: GroupCommitWriter | None = None
+        self.readers: List[aiosqlite.Connection] = []
+        self._idle_readers: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+
+    async def _open(self) -> aiosqlite.Connection:
+        if self.performance is None:
+            return await sqlite.connect(self.db_name)
+
+        connection = await sqlite.connect(
+            self.db_name, cached_statements=self.performance.cached_statements
+        )
+        for pragma in self.performance.pragmas:
+            await connection.execute(pragma)
+        return connection
 
     async def connect(self) -> None:
         if self.connection is None:
             try:
-                self.connection = await aiosqlite.connect(self.db_name)
+                self.connection = await self._open()
+                await self._connect_readers()
+                if self.group_commit is not None:
+                    self.writer = GroupCommitWriter(
+                        self.connection, INSERT_USER, self.group_commit
+                    )
             except Exception as e:
                 raise RuntimeError(f"Failed to connect to sqlite database: {e}")
 
+    async def _connect_readers(self) -> None:
+        # An in-memory database is private to its connection, so readers
+        # only make sense for a file.
+        if self.performance is None or self.db_name == ":memory:":
+            return
+        while len(self.readers) < self.performance.readers:
+            reader = await self._open()
+            await reader.execute("PRAGMA query_only=ON")
+            self.readers.append(reader)
+            self._idle_readers.put_nowait(reader)
+
+    @asynccontextmanager
+    async def _reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        await self.connect()
+        if not self.readers:
+            assert self.connection is not None
+            yield self.connection
+            return
+
+        reader = await self._idle_readers.get()
+        try:
+            yield reader
+        finally:
+            self._idle_readers.put_nowait(reader)
+
     async def close(self) -> None:
+        readers, self.readers = self.readers, []
+        self._idle_readers = asyncio.Queue()
+        writer, self.writer = self.writer, None
+        if writer is not None:
+            await writer.close()
         if self.connection:
             try:
                 await self.connection.close()
                 self.connection = None
             except Exception as e:
                 raise RuntimeError(f"Failed to close sqlite database connection: {e}")
+        for reader in readers:
+            try:
+                await reader.close()
+            except Exception as e:
+                raise RuntimeError(f"Failed to close sqlite database connection: {e}")
 
     async def bootstrap(self) -> None:
         try:
@@ -45,52 +160,88 @@ class UsersRepoSQLite:
         except Exception as e:
             raise RuntimeError(f"Failed to bootstrap sqlite database tables: {e}")
 
+    @timed(QUERY_SECONDS, "user_exists", kind="repository")
     async def user_exists(self, chat_id: int) -> bool:
         try:
-            await self.connect()
-            assert self.connection is not None
-            async with self.connection.execute(
-                "SELECT 1 FROM users WHERE chat_id = ?", (chat_id,)
-            ) as cursor:
+            async with (
+                self._reader() as connection,
+                connection.execute(
+                    "SELECT 1 FROM users WHERE chat_id = ?", (chat_id,)
+                ) as cursor,
+            ):
                 return await cursor.fetchone() is not None
         except Exception as e:
             raise RuntimeError(f"Failed to check user existence: {e}")
 
+    @timed(QUERY_SECONDS, "add_user", kind="repository")
     async def add_user(self, user: User) -> None:
         try:
             await self.connect()
             assert self.connection is not None
-            await self.connection.execute(
-                """
-                INSERT INTO users (chat_id, full_name, client_id, phone_number)
-                VALUES (?, ?, ?, ?)
-                """,
-                (user.chat_id, user.full_name, user.client_id, user.phone_number),
-            )
+            row = (user.chat_id, user.full_name, user.client_id, user.phone_number)
+            if self.writer is not None:
+                await self.writer.submit(row)
+                return
+            await self.connection.execute(INSERT_USER, row)
             await self.connection.commit()
         except Exception as e:
             raise RuntimeError(f"Failed to add user to sqlite database: {e}")
 
+    async def _fetch_one(self, query: str, value: Any) -> Optional[User]:
+        try:
+            async with (
+                self._reader() as connection,
+                connection.execute(query, (value,)) as cursor,
+            ):
+                return _to_user(await cursor.fetchone())
+        except Exception as e:
+            raise RuntimeError(f"Failed to fetch user from sqlite database: {e}")
+
+    @timed(QUERY_SECONDS, "get_user_by_chat_id", kind="repository")
+    async def get_user_by_chat_id(self, chat_id: int) -> Optional[User]:
+        return await self._fetch_one(SELECT_BY_CHAT_ID, chat_id)
+
+    @timed(QUERY_SECONDS, "get_user_by_client_id", kind="repository")
+    async def get_user_by_client_id(self, client_id: str) -> Optional[User]:
+        return await self._fetch_one(SELECT_BY_CLIENT_ID, client_id)
+
+    @timed(QUERY_SECONDS, "get_user_by_phone", kind="repository")
+    async def get_user_by_phone(self, phone_number: str) -> Optional[User]:
+        return await self._fetch_one(SELECT_BY_PHONE, phone_number)
+
+    @timed(QUERY_SECONDS, "get_users", kind="repository")
+    async def get_users(self, chat_ids: Iterable[int]) -> Dict[int, User]:
+        ids = list(dict.fromkeys(chat_ids))
+        if not ids:
+            return {}
+        try:
+            async with (
+                self._reader() as connection,
+                connection.execute(SELECT_BY_CHAT_IDS, (json.dumps(ids),)) as cursor,
+            ):
+                rows = await cursor.fetchall()
+            users = (_to_user(row) for row in rows)
+            return {user.chat_id: user for user in users if user is not None}
+        except Exception as e:
+            raise RuntimeError(f"Failed to fetch users from sqlite database: {e}")
+
+    @timed(QUERY_SECONDS, "get_user", kind="repository")
     async def get_user(self, params: Dict[str, Any]) -> Optional[User]:
         if not params:
             raise ValueError("At least one parameter must be provided.")
 
+        if len(params) == 1:
+            [(key, value)] = params.items()
+            if key in LOOKUPS:
+                return await self._fetch_one(LOOKUPS[key], value)
+
         try:
-            await self.connect()
-            assert self.connection is not None
-            conditions = " AND ".join([f"{key} = ?" for key in params.keys()])
-            values = tuple(params.values())
-            query = f"SELECT chat_id, full_name, client_id, phone_number FROM users WHERE {conditions}"
-
-            async with self.connection.execute(query, values) as cursor:
-                row = await cursor.fetchone()
-                if row:
-                    return User(
-                        chat_id=row[0],
-                        full_name=row[1],
-                        client_id=row[2],
-                        phone_number=row[3],
-                    )
-            return None
+            async with self._reader() as connection:
+                conditions = " AND ".join([f"{key} = ?" for key in params.keys()])
+                values = tuple(params.values())
+                query = f"{SELECT_USER} WHERE {conditions}"
+
+                async with connection.execute(query, values) as cursor:
+                    return _to_user(await cursor.fetchone())
         except Exception as e:
             raise RuntimeError(f"Failed to fetch user from sqlite database: {e}")
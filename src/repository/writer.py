@@ -0,0 +1,135 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+Row = Tuple[Any, ...]
+Pending = Tuple[Row, "asyncio.Future[None]"]
+
+
+@dataclass(frozen=True)
+class GroupCommit:
+    """How long to hold a write open for company, and how many rows at most."""
+
+    max_delay: float = 0.005
+    max_rows: int = 256
+
+
+@dataclass
+class GroupCommitStats:
+    rows: int = 0
+    batches: int = 0
+    fallbacks: int = 0
+
+
+class GroupCommitWriter:
+    """Runs one INSERT statement for many callers in shared transactions.
+
+    Callers wait on their own future. A batch goes through ``executemany``
+    and a single commit; if any row breaks a constraint the batch is replayed
+    row by row in one transaction, so only the offending callers get the
+    IntegrityError.
+    """
+
+    def __init__(
+        self,
+        connection: aiosqlite.Connection,
+        statement: str,
+        policy: GroupCommit = GroupCommit(),
+    ):
+        self.connection = connection
+        self.statement = statement
+        self.policy = policy
+        self.stats = GroupCommitStats()
+        self._queue: asyncio.Queue[Optional[Pending]] = asyncio.Queue()
+        self._task: Optional[asyncio.Task[None]] = None
+        self._closing = asyncio.Event()
+
+    async def submit(self, row: Row) -> None:
+        if self._closing.is_set():
+            raise RuntimeError("Group commit writer is closed")
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((row, future))
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        await future
+
+    async def close(self) -> None:
+        """Flush everything submitted so far and stop the writer."""
+        if self._closing.is_set():
+            return
+        self._closing.set()
+        if self._task is not None:
+            self._queue.put_nowait(None)
+            await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                return
+            if self._queue.qsize() < self.policy.max_rows - 1:
+                # Give concurrent callers a moment to join, unless shutting down.
+                try:
+                    await asyncio.wait_for(self._closing.wait(), self.policy.max_delay)
+                except TimeoutError:
+                    pass
+
+            batch = [first]
+            while len(batch) < self.policy.max_rows and not self._queue.empty():
+                pending = self._queue.get_nowait()
+                if pending is None:
+                    stopping = True
+                    break
+                batch.append(pending)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Pending]) -> None:
+        batch = [(row, future) for row, future in batch if not future.done()]
+        if not batch:
+            return
+        results: Sequence[Optional[BaseException]]
+        try:
+            try:
+                await self.connection.executemany(
+                    self.statement, [row for row, _ in batch]
+                )
+                await self.connection.commit()
+                results = [None] * len(batch)
+            except aiosqlite.IntegrityError:
+                await self.connection.rollback()
+                self.stats.fallbacks += 1
+                results = [await self._insert(row) for row, _ in batch]
+                await self.connection.commit()
+        except Exception as e:
+            logger.exception(f"Group commit of {len(batch)} rows failed: {e}")
+            try:
+                await self.connection.rollback()
+            except Exception as rollback_error:
+                logger.exception(
+                    f"Rollback after failed group commit: {rollback_error}"
+                )
+            results = [e] * len(batch)
+
+        self.stats.batches += 1
+        self.stats.rows += len(batch)
+        for (_, future), error in zip(batch, results):
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+    async def _insert(self, row: Row) -> Optional[BaseException]:
+        try:
+            await self.connection.execute(self.statement, row)
+            return None
+        except aiosqlite.IntegrityError as e:
+            return e
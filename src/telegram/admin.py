@@ -0,0 +1,120 @@
+import asyncio
+import hmac
+import logging
+import tracemalloc
+from collections import Counter
+from typing import Awaitable, Callable, Optional
+
+from aiohttp import web
+
+from metrics.profiler import SamplingProfiler
+
+logger = logging.getLogger(__name__)
+
+ADMIN_PATH = "/admin"
+ADMIN_HEADER = "X-Admin-Secret"
+MAX_PROFILE_SECONDS = 120.0
+TOP_STATS = 30
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+
+class AdminRoutes:
+    """Diagnostics for a running bot, for requests carrying ADMIN_SECRET.
+
+    GET  /admin/profile?seconds=N  collapsed CPU stacks of the event loop
+    POST /admin/memory/snapshot    start tracemalloc and keep a baseline
+    GET  /admin/memory/diff        top allocation growth since the baseline
+    POST /admin/memory/stop        drop the baseline; stop tracemalloc if the
+                                   snapshot started it
+    GET  /admin/tasks              live asyncio tasks per coroutine
+    """
+
+    def __init__(self, secret: str):
+        self.secret = secret
+        self.profiler: Optional[SamplingProfiler] = None
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        # Tracing started elsewhere (PYTHONTRACEMALLOC, -X tracemalloc) is
+        # left running.
+        self.started_tracing = False
+
+    def register(self, app: web.Application) -> None:
+        routes = [
+            ("GET", "/profile", self.profile),
+            ("POST", "/memory/snapshot", self.memory_snapshot),
+            ("GET", "/memory/diff", self.memory_diff),
+            ("POST", "/memory/stop", self.memory_stop),
+            ("GET", "/tasks", self.tasks),
+        ]
+        for method, path, handler in routes:
+            app.router.add_route(method, f"{ADMIN_PATH}{path}", self._guarded(handler))
+
+    def _guarded(self, handler: Handler) -> Handler:
+        async def guarded(request: web.Request) -> web.StreamResponse:
+            secret = request.headers.get(ADMIN_HEADER, "")
+            if not hmac.compare_digest(secret.encode(), self.secret.encode()):
+                return web.Response(status=401, text="Unauthorized")
+            logger.info(f"Admin request {request.method} {request.path}")
+            return await handler(request)
+
+        return guarded
+
+    async def profile(self, request: web.Request) -> web.StreamResponse:
+        try:
+            seconds = float(request.query.get("seconds", "10"))
+        except ValueError:
+            return web.Response(status=400, text="seconds must be a number")
+        if not 0 < seconds <= MAX_PROFILE_SECONDS:
+            return web.Response(
+                status=400, text=f"seconds must be in (0, {MAX_PROFILE_SECONDS}]"
+            )
+        if self.profiler is not None:
+            return web.Response(status=409, text="A profile is already running")
+
+        # The handler runs on the event loop thread, which is what we sample.
+        self.profiler = SamplingProfiler()
+        self.profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            collapsed = await asyncio.to_thread(self.profiler.stop)
+            self.profiler = None
+        return web.Response(
+            text=collapsed,
+            headers={"Content-Disposition": 'attachment; filename="profile.folded"'},
+        )
+
+    async def memory_snapshot(self, request: web.Request) -> web.StreamResponse:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        self.baseline = tracemalloc.take_snapshot()
+        stats = self.baseline.statistics("lineno")[:TOP_STATS]
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"traced: {current} bytes, peak: {peak} bytes"]
+        lines += [str(stat) for stat in stats]
+        return web.Response(text="\n".join(lines) + "\n")
+
+    async def memory_diff(self, request: web.Request) -> web.StreamResponse:
+        if self.baseline is None or not tracemalloc.is_tracing():
+            return web.Response(status=409, text="Take a snapshot first")
+        snapshot = tracemalloc.take_snapshot()
+        stats = snapshot.compare_to(self.baseline, "lineno")[:TOP_STATS]
+        return web.Response(text="".join(f"{stat}\n" for stat in stats))
+
+    async def memory_stop(self, request: web.Request) -> web.StreamResponse:
+        self.baseline = None
+        if not self.started_tracing:
+            return web.Response(text="baseline dropped, tracemalloc left running\n")
+        self.started_tracing = False
+        tracemalloc.stop()
+        return web.Response(text="tracemalloc stopped\n")
+
+    async def tasks(self, request: web.Request) -> web.StreamResponse:
+        counts: Counter[str] = Counter()
+        for task in asyncio.all_tasks():
+            coro = task.get_coro()
+            counts[getattr(coro, "__qualname__", repr(coro))] += 1
+        return web.json_response(
+            {"total": sum(counts.values()), "by_coroutine": dict(counts.most_common())}
+        )
@@ -1,17 +1,49 @@
+from typing import Optional
+
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
+from aiogram.fsm.storage.base import BaseStorage
 
 from config import conf
 
-from .handlers import loans_router, start_router
+from .dedup import DeduplicateUpdatesMiddleware, SeenUpdates
+from .handlers import loans_callbacks, loans_router, start_callbacks, start_router
+from .routing import CallbackRouter
+from .sender import SendScheduler
+from .tokens import CallbackTokens
+from .tracing import Tracer, TracingMiddleware, TracingRequestMiddleware
+
+
+def get_dispatcher(
+    storage: Optional[BaseStorage] = None,
+    seen: Optional[SeenUpdates] = None,
+) -> tuple[Dispatcher, Bot]:
+    """With ``seen``, drops redelivered updates before they are traced."""
+    dp = Dispatcher(storage=storage)
+    if seen is not None:
+        dp.update.outer_middleware(DeduplicateUpdatesMiddleware(seen))
+    tracer = Tracer(
+        slow_threshold=float(conf.get("TRACE_SLOW_MS", "1000")) / 1000,
+        sample_rate=float(conf.get("TRACE_SAMPLE_RATE", "0")),
+        sink=conf.get("TRACE_FILE"),
+    )
+    dp.update.outer_middleware(TracingMiddleware(tracer))
+    dp.shutdown.register(tracer.close)
+    callbacks = CallbackRouter(name="callbacks")
+    callbacks.include_routers(start_router, loans_router)
+    callbacks.include_callbacks(start_router, *start_callbacks)
+    callbacks.include_callbacks(loans_router, *loans_callbacks)
+    dp.include_router(callbacks)
+    dp["tokens"] = CallbackTokens()
 
+    return dp, get_bot()
 
-def get_dispatcher() -> tuple[Dispatcher, Bot]:
-    dp = Dispatcher()
-    dp.include_router(start_router)
-    dp.include_router(loans_router)
 
-    return dp, Bot(
+def get_bot() -> Bot:
+    bot = Bot(
         token=conf["BOT_TOKEN"], default=DefaultBotProperties(parse_mode=ParseMode.HTML)
     )
+    bot.session.middleware(TracingRequestMiddleware())
+    bot.session.middleware(SendScheduler())
+    return bot
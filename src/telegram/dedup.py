@@ -0,0 +1,68 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+logger = logging.getLogger(__name__)
+
+
+class SeenUpdates:
+    """Remembers update_ids for ``window`` seconds, at most ``max_entries`` of them.
+
+    Telegram redelivers an update until it gets a 2xx, so a slow answer can
+    make the same update arrive again minutes later.
+    """
+
+    def __init__(
+        self,
+        window: float = 600.0,
+        max_entries: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.window = window
+        self.max_entries = max_entries
+        self.clock = clock
+        self.duplicates = 0
+        self._seen: OrderedDict[int, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def first_time(self, update_id: int) -> bool:
+        """Record ``update_id``; False if it was already seen within the window."""
+        now = self.clock()
+        expired_before = now - self.window
+        while self._seen:
+            oldest, seen_at = next(iter(self._seen.items()))
+            if seen_at >= expired_before and len(self._seen) < self.max_entries:
+                break
+            del self._seen[oldest]
+
+        if update_id in self._seen:
+            self.duplicates += 1
+            logger.debug(f"Dropping redelivered update {update_id}")
+            return False
+        self._seen[update_id] = now
+        return True
+
+    def forget(self, update_id: int) -> None:
+        """Let a redelivery of ``update_id`` through, e.g. after it was refused."""
+        self._seen.pop(update_id, None)
+
+
+class DeduplicateUpdatesMiddleware(BaseMiddleware):
+    def __init__(self, seen: SeenUpdates):
+        self.seen = seen
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if isinstance(event, Update) and not self.seen.first_time(event.update_id):
+            return None
+        return await handler(event, data)
@@ -1,4 +1,6 @@
+from .loans import CALLBACK_PREFIXES as loans_callbacks
 from .loans import router as loans_router
+from .start import CALLBACK_PREFIXES as start_callbacks
 from .start import router as start_router
 
-__all__ = ["start_router", "loans_router"]
+__all__ = ["start_router", "loans_router", "start_callbacks", "loans_callbacks"]
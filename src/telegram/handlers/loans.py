@@ -1,31 +1,83 @@
 import logging
-from uuid import UUID
+from typing import Optional
 
 from aiogram import F, Router
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters.callback_data import CallbackData
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.types import CallbackQuery, Message
+from aiogram.types import (
+    CallbackQuery,
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    Message,
+)
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.utils.markdown import hbold, hitalic
 
+from lombardis.dto import ClientLoans, LoanDetails
 from lombardis.protocols import LombardisAPI
 from repository.protocols import UsersRepo
+from telegram.prefetch import LoanPrefetcher
+from telegram.render import RenderCache, RenderedMessage, content_hash
+from telegram.sender import background_sends
+from telegram.tokens import CallbackTokens, LoanToken
 
 from .text_constants import (
+    BUTTON_EXPIRED,
     LOANS_MENU_TEXT,
+    LOANS_SUMMARY_BUTTON,
+    LOANS_SUMMARY_CAPPED,
+    LOANS_SUMMARY_HEADER,
+    LOANS_SUMMARY_PARTIAL_TOTAL,
+    LOANS_SUMMARY_TOTAL,
+    NEXT_PAGE_BUTTON,
     NO_ACTIVE_LOANS,
     PAWN_TICKET_HEADER,
     PAY_LOAN_BUTTON,
     PAYLOAN_SELECTION_MESSAGE,
+    PREV_PAGE_BUTTON,
     RUB,
+    STALE_DATA_NOTICE,
 )
 
 logger = logging.getLogger(__name__)
 
 
+# Loan buttons carry the chat's token epoch as well as the loan's index, so a
+# button from an expired listing is refused rather than mapped to a new loan.
 class LoansCallback(CallbackData, prefix="loans"):
-    loan_id: UUID
+    epoch: int
+    loan: int
+
+
+class LoansSummaryCallback(CallbackData, prefix="summary"):
+    epoch: int
+
+
+class PayCallback(CallbackData, prefix="pay"):
+    epoch: int
+    loan: int
+
+
+class LoansPageCallback(CallbackData, prefix="page"):
+    epoch: int
+    page: int
+
+
+CALLBACK_PREFIXES = (
+    LoansCallback.__prefix__,
+    LoansSummaryCallback.__prefix__,
+    PayCallback.__prefix__,
+    LoansPageCallback.__prefix__,
+)
+
+# Telegram renders keyboards with hundreds of buttons slowly, if at all.
+LOANS_PER_PAGE = 20
+# Telegram rejects longer messages; the summary is split to fit.
+MESSAGE_LIMIT = 4096
+# Loans whose details the summary may fetch; the rest show only warm details.
+SUMMARY_MAX_FETCH = 40
 
 
 class LoanDetailsMode(StatesGroup):
@@ -36,12 +88,75 @@ class LoanDetailsMode(StatesGroup):
 router = Router()
 
 
+def _loans_keyboard(
+    chat_id: int, client_loans: ClientLoans, page: int, tokens: CallbackTokens
+) -> InlineKeyboardMarkup:
+    pages = max(1, -(-len(client_loans.loans) // LOANS_PER_PAGE))
+    page = min(max(page, 0), pages - 1)
+    start = page * LOANS_PER_PAGE
+
+    keyboard = InlineKeyboardBuilder()
+    for loan in client_loans.loans[start : start + LOANS_PER_PAGE]:
+        token = tokens.issue(chat_id, str(loan.loan_id))
+        keyboard.button(
+            text=f"{loan.pawn_bill_number}",
+            callback_data=LoansCallback(epoch=token.epoch, loan=token.number),
+        )
+    epoch = tokens.epoch(chat_id)
+    keyboard.adjust(2)
+
+    navigation = []
+    if page > 0:
+        navigation.append(
+            InlineKeyboardButton(
+                text=PREV_PAGE_BUTTON,
+                callback_data=LoansPageCallback(epoch=epoch, page=page - 1).pack(),
+            )
+        )
+    if page < pages - 1:
+        navigation.append(
+            InlineKeyboardButton(
+                text=NEXT_PAGE_BUTTON.format(page=page + 2, pages=pages),
+                callback_data=LoansPageCallback(epoch=epoch, page=page + 1).pack(),
+            )
+        )
+    if navigation:
+        keyboard.row(*navigation)
+    keyboard.row(
+        InlineKeyboardButton(
+            text=LOANS_SUMMARY_BUTTON,
+            callback_data=LoansSummaryCallback(epoch=epoch).pack(),
+        )
+    )
+    return keyboard.as_markup()
+
+
+def _prefetch_page(
+    prefetcher: Optional[LoanPrefetcher],
+    chat_id: int,
+    client_loans: ClientLoans,
+    page: int,
+) -> None:
+    if prefetcher is None:
+        return
+    start = page * LOANS_PER_PAGE
+    prefetcher.start(
+        chat_id,
+        (
+            str(loan.loan_id)
+            for loan in client_loans.loans[start : start + LOANS_PER_PAGE]
+        ),
+    )
+
+
 @router.message(F.text == LOANS_MENU_TEXT)
 async def loans_menu_handler(
     message: Message,
     state: FSMContext,
     users: UsersRepo,
     lombardis: LombardisAPI,
+    tokens: CallbackTokens,
+    prefetcher: Optional[LoanPrefetcher] = None,
 ) -> None:
     try:
         user = await users.get_user({"chat_id": message.chat.id})
@@ -53,35 +168,88 @@ async def loans_menu_handler(
             await message.answer(NO_ACTIVE_LOANS)
             return
 
-        keyboard = InlineKeyboardBuilder()
-        for loan in client_loans.loans:
-            keyboard.button(
-                text=f"{loan.pawn_bill_number}",
-                callback_data=LoansCallback(loan_id=loan.loan_id),
-            )
-        keyboard.adjust(2)
+        tokens.keep_listing(message.chat.id, client_loans)
+        header = PAWN_TICKET_HEADER
+        if client_loans.stale:
+            header = f"{PAWN_TICKET_HEADER}\n\n{hitalic(STALE_DATA_NOTICE)}"
 
-        await message.answer(PAWN_TICKET_HEADER, reply_markup=keyboard.as_markup())
+        await message.answer(
+            header,
+            reply_markup=_loans_keyboard(message.chat.id, client_loans, 0, tokens),
+        )
         await state.set_state(LoanDetailsMode.as_new)
+        _prefetch_page(prefetcher, message.chat.id, client_loans, 0)
     except Exception as e:
         logger.exception(f"Error in loans_menu_handler: {e}")
 
 
-async def _generate_loan_details_message(
-    lombardis: LombardisAPI, loan_id: str
-) -> tuple[str, InlineKeyboardBuilder]:
+@router.callback_query(LoansPageCallback.filter())
+async def loans_page_handler(
+    callback: CallbackQuery,
+    callback_data: LoansPageCallback,
+    tokens: CallbackTokens,
+    prefetcher: Optional[LoanPrefetcher] = None,
+) -> None:
+    assert callback.bot is not None
+    assert callback.message is not None
     try:
-        loan_details = await lombardis.get_loan_details(loan_id)
+        chat_id = callback.message.chat.id
+        client_loans = tokens.listing(chat_id, callback_data.epoch)
+        if client_loans is None:
+            await callback.message.answer(BUTTON_EXPIRED)
+            return
 
-        keyboard = InlineKeyboardBuilder()
-        keyboard.button(text=PAY_LOAN_BUTTON, callback_data=f"pay_{loan_id}")
+        await callback.bot.edit_message_reply_markup(
+            chat_id=chat_id,
+            message_id=callback.message.message_id,
+            reply_markup=_loans_keyboard(
+                chat_id, client_loans, callback_data.page, tokens
+            ),
+        )
+        _prefetch_page(prefetcher, chat_id, client_loans, callback_data.page)
+    finally:
+        await callback.answer()
+
+
+def _render_loan_details(
+    token: LoanToken, loan_details: LoanDetails
+) -> tuple[str, InlineKeyboardMarkup]:
+    keyboard = InlineKeyboardBuilder()
+    keyboard.button(
+        text=PAY_LOAN_BUTTON,
+        callback_data=PayCallback(epoch=token.epoch, loan=token.number),
+    )
+
+    message_text = "\n".join(
+        [f"{hbold(loan_details.loan_number)}\n{loan_details.loan_sum} руб.\n"]
+        + [presentation for presentation in loan_details.stuff]
+        + [f"\nПроценты: {hitalic(loan_details.interests_sum)} {hitalic(RUB)}\n"]
+        + ([hitalic(STALE_DATA_NOTICE)] if loan_details.stale else [])
+    )
+    return message_text, keyboard.as_markup(resize_keyboard=True)
+
+
+async def _generate_loan_details_message(
+    lombardis: LombardisAPI,
+    loan_id: str,
+    token: LoanToken,
+    chat_id: int,
+    prefetcher: Optional[LoanPrefetcher] = None,
+    renders: Optional[RenderCache] = None,
+) -> RenderedMessage:
+    try:
+        loan_details: Optional[LoanDetails] = None
+        if prefetcher is not None:
+            loan_details = prefetcher.get(chat_id, loan_id)
+        if loan_details is None:
+            loan_details = await lombardis.get_loan_details(loan_id)
 
-        message_text = "\n".join(
-            [f"{hbold(loan_details.loan_number)}\n{loan_details.loan_sum} руб.\n"]
-            + [presentation for presentation in loan_details.stuff]
-            + [f"\nПроценты: {hitalic(loan_details.interests_sum)} {hitalic(RUB)}\n"]
+        if renders is not None:
+            return renders.render(loan_id, token, loan_details, _render_loan_details)
+        message_text, markup = _render_loan_details(token, loan_details)
+        return RenderedMessage(
+            loan_id, token, content_hash(loan_details), message_text, markup
         )
-        return message_text, keyboard
     except Exception as e:
         logger.exception(f"Error in _generate_loan_details_message: {e}")
         raise RuntimeError(f"Cant generate_loan_details for {loan_id}: {e}")
@@ -93,29 +261,58 @@ async def view_loans_as_editing(
     callback_data: LoansCallback,
     state: FSMContext,
     lombardis: LombardisAPI,
+    tokens: CallbackTokens,
+    prefetcher: Optional[LoanPrefetcher] = None,
+    renders: Optional[RenderCache] = None,
 ) -> None:
     assert callback.bot is not None
     assert callback.message is not None
+    answered = False
     try:
-        loan_id = str(callback_data.loan_id)
-        message_text, keyboard = await _generate_loan_details_message(
-            lombardis, loan_id
-        )
+        chat_id = callback.message.chat.id
+        token = LoanToken(callback_data.epoch, callback_data.loan)
+        loan_id = tokens.resolve(chat_id, token)
+        if loan_id is None:
+            await callback.message.answer(BUTTON_EXPIRED)
+            return
 
         state_data = await state.get_data()
         message_id = state_data.get("loan_details_message_id")
         if message_id is None:
             logger.error("Missing loan_details_message_id in state data.")
             return
+        # A re-tap of the loan on display needs neither a fetch nor an edit.
+        if renders is not None and renders.shows_fresh(
+            chat_id, message_id, loan_id, token
+        ):
+            return
 
-        await callback.bot.edit_message_text(
-            text=message_text,
-            reply_markup=keyboard.as_markup(resize_keyboard=True),
-            message_id=message_id,
-            chat_id=callback.message.chat.id,
+        await callback.answer()
+        answered = True
+        rendered = await _generate_loan_details_message(
+            lombardis, loan_id, token, chat_id, prefetcher, renders
         )
+        if renders is not None and renders.is_displayed(chat_id, message_id, rendered):
+            return
+
+        try:
+            await callback.bot.edit_message_text(
+                text=rendered.text,
+                reply_markup=rendered.markup,
+                message_id=message_id,
+                chat_id=chat_id,
+            )
+        except TelegramBadRequest as e:
+            # Displays are only tracked in memory, e.g. lost on restart.
+            if "message is not modified" not in e.message:
+                if renders is not None:
+                    renders.displayed(chat_id, message_id, None)
+                raise
+        if renders is not None:
+            renders.displayed(chat_id, message_id, rendered)
     finally:
-        await callback.answer()
+        if not answered:
+            await callback.answer()
 
 
 @router.callback_query(LoansCallback.filter(), LoanDetailsMode.as_new)
@@ -124,30 +321,173 @@ async def view_loan_as_new_message(
     callback_data: LoansCallback,
     state: FSMContext,
     lombardis: LombardisAPI,
+    tokens: CallbackTokens,
+    prefetcher: Optional[LoanPrefetcher] = None,
+    renders: Optional[RenderCache] = None,
 ) -> None:
     assert callback.message is not None
     try:
-        loan_id = str(callback_data.loan_id)
-        message_text, keyboard = await _generate_loan_details_message(
-            lombardis, loan_id
+        chat_id = callback.message.chat.id
+        token = LoanToken(callback_data.epoch, callback_data.loan)
+        loan_id = tokens.resolve(chat_id, token)
+        if loan_id is None:
+            await callback.message.answer(BUTTON_EXPIRED)
+            return
+        rendered = await _generate_loan_details_message(
+            lombardis, loan_id, token, chat_id, prefetcher, renders
         )
 
         sent_message = await callback.message.answer(
-            text=message_text,
-            reply_markup=keyboard.as_markup(resize_keyboard=True),
+            text=rendered.text, reply_markup=rendered.markup
         )
         await state.set_data({"loan_details_message_id": sent_message.message_id})
         await state.set_state(LoanDetailsMode.as_editing)
+        if renders is not None:
+            renders.displayed(chat_id, sent_message.message_id, rendered)
     finally:
         await callback.answer()
 
 
-@router.callback_query(lambda c: c.data.startswith("pay_"))
-async def process_loan_payment_callback(callback: CallbackQuery) -> None:
-    assert callback.data is not None
+def _split_message(blocks: list[str], separator: str = "\n") -> list[str]:
+    parts: list[str] = []
+    current = ""
+    for block in blocks:
+        candidate = f"{current}{separator}{block}" if current else block
+        if current and len(candidate) > MESSAGE_LIMIT:
+            parts.append(current)
+            candidate = block.lstrip("\n")
+        current = candidate
+    if current:
+        parts.append(current)
+    return parts
+
+
+async def _generate_loans_summary_message(
+    lombardis: LombardisAPI,
+    client_loans: ClientLoans,
+    chat_id: int,
+    prefetcher: Optional[LoanPrefetcher] = None,
+) -> list[str]:
+    active_loans = [loan for loan in client_loans.loans if not loan.closed]
+    if not active_loans:
+        return [NO_ACTIVE_LOANS]
+
+    # Loan sums only come with loan details: take the warm ones and fetch up
+    # to SUMMARY_MAX_FETCH of the rest in one concurrent batch.
+    loan_details: dict[str, LoanDetails] = {}
+    for loan in active_loans:
+        warm = prefetcher.get(chat_id, str(loan.loan_id)) if prefetcher else None
+        if warm is not None:
+            loan_details[str(loan.loan_id)] = warm
+    missing = [
+        str(loan.loan_id)
+        for loan in active_loans
+        if str(loan.loan_id) not in loan_details
+    ]
+    unfetched = max(0, len(missing) - SUMMARY_MAX_FETCH)
+    missing = missing[:SUMMARY_MAX_FETCH]
+    if missing:
+        batch = await lombardis.get_loan_details_many(missing)
+        loan_details.update(batch.results)
+        for loan_id, error in batch.errors.items():
+            logger.warning(f"Loan {loan_id} is missing from summary: {error}")
+
+    blocks = [LOANS_SUMMARY_HEADER]
+    for loan in active_loans:
+        details = loan_details.get(str(loan.loan_id))
+        loan_sum = f"{details.loan_sum} {RUB}" if details else "—"
+        interests = details.interests_sum if details else "—"
+        payment_date = (
+            loan.payment_date.strftime("%d.%m.%Y") if loan.payment_date else "—"
+        )
+        full_debt = loan.full_debt if loan.full_debt is not None else "—"
+        blocks.append(
+            f"\n{hbold(loan.pawn_bill_number)} — {loan_sum}\n"
+            f"Проценты: {interests} {RUB}\n"
+            + (
+                f"Сумма продления: {loan.prolongation_sum} {RUB}\n"
+                if loan.prolongation_sum is not None
+                else ""
+            )
+            + f"Оплатить до: {payment_date}\n"
+            f"Полный долг: {full_debt} {RUB}"
+        )
+
+    debts = [loan.full_debt for loan in active_loans if loan.full_debt is not None]
+    footer = []
+    if len(debts) == len(active_loans):
+        footer.append(hbold(LOANS_SUMMARY_TOTAL.format(total=sum(debts))))
+    elif debts:
+        footer.append(
+            hbold(
+                LOANS_SUMMARY_PARTIAL_TOTAL.format(
+                    total=sum(debts),
+                    unknown=len(active_loans) - len(debts),
+                    count=len(active_loans),
+                )
+            )
+        )
+    if unfetched:
+        footer.append(
+            hitalic(
+                LOANS_SUMMARY_CAPPED.format(
+                    shown=len(active_loans) - unfetched, count=len(active_loans)
+                )
+            )
+        )
+    if client_loans.stale:
+        footer.append(hitalic(STALE_DATA_NOTICE))
+    if footer:
+        blocks.append("\n" + "\n".join(footer))
+    return _split_message(blocks)
+
+
+@router.callback_query(LoansSummaryCallback.filter())
+async def loans_summary_handler(
+    callback: CallbackQuery,
+    callback_data: LoansSummaryCallback,
+    users: UsersRepo,
+    lombardis: LombardisAPI,
+    tokens: CallbackTokens,
+    prefetcher: Optional[LoanPrefetcher] = None,
+) -> None:
     assert callback.message is not None
+    try:
+        chat_id = callback.message.chat.id
+        # The listing the button was shown with; ask again only once it expired.
+        client_loans = tokens.listing(chat_id, callback_data.epoch)
+        if client_loans is None:
+            user = await users.get_user({"chat_id": chat_id})
+            if user is None:
+                return
+            client_loans = await lombardis.get_client_loans(user.client_id)
+
+        first, *rest = await _generate_loans_summary_message(
+            lombardis, client_loans, chat_id, prefetcher
+        )
+        await callback.message.answer(first)
+        # The rest of a long summary should not delay other users' replies.
+        with background_sends():
+            for part in rest:
+                await callback.message.answer(part)
+    except Exception as e:
+        logger.exception(f"Error in loans_summary_handler: {e}")
+    finally:
+        await callback.answer()
 
-    loan_id = callback.data.split("_")[1]
 
-    await callback.message.answer(PAYLOAN_SELECTION_MESSAGE.format(loan_id=loan_id))
-    await callback.answer()
+@router.callback_query(PayCallback.filter())
+async def process_loan_payment_callback(
+    callback: CallbackQuery, callback_data: PayCallback, tokens: CallbackTokens
+) -> None:
+    assert callback.message is not None
+    try:
+        loan_id = tokens.resolve(
+            callback.message.chat.id, LoanToken(callback_data.epoch, callback_data.loan)
+        )
+        if loan_id is None:
+            await callback.message.answer(BUTTON_EXPIRED)
+            return
+        await callback.message.answer(PAYLOAN_SELECTION_MESSAGE.format(loan_id=loan_id))
+    finally:
+        await callback.answer()
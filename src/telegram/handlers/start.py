@@ -14,6 +14,7 @@ from aiogram_calendar import DialogCalendar, DialogCalendarCallback, get_user_lo
 from lombardis.protocols import LombardisAPI
 from repository.dto import User
 from repository.protocols import UsersRepo
+from telegram.prefetch import LoanPrefetcher
 
 from .helpers import ensure_loan_number_format
 from .text_constants import (
@@ -36,13 +37,21 @@ class AuthState(StatesGroup):
 
 router = Router()
 
+CALLBACK_PREFIXES = (DialogCalendarCallback.__prefix__,)
+
 
 @router.message(CommandStart())
 async def command_start_handler(
-    message: Message, state: FSMContext, users: UsersRepo
+    message: Message,
+    state: FSMContext,
+    users: UsersRepo,
+    prefetcher: Optional[LoanPrefetcher] = None,
 ) -> None:
     assert message.from_user is not None
 
+    if prefetcher is not None:
+        prefetcher.cancel(message.chat.id)
+
     try:
         if await state.get_state() not in [
             AuthState.waiting_for_birthday,
@@ -14,10 +14,31 @@ PAYLOAN_SELECTION_MESSAGE = "Вы выбрали оплату долга {loan_i
 
 NO_ACTIVE_LOANS = "❌ У клиента нет активных залогов."
 
+BUTTON_EXPIRED = "Кнопка устарела. Откройте список займов заново."
+
 PAWN_TICKET_HEADER = "📜 Выберите залоговый билет:"
 
 PAY_LOAN_BUTTON = "✅ Оплатить проценты"
 
+LOANS_SUMMARY_BUTTON = "📋 Все залоги одним списком"
+
+PREV_PAGE_BUTTON = "◀️ Назад"
+NEXT_PAGE_BUTTON = "Ещё ▶️ ({page}/{pages})"
+
+LOANS_SUMMARY_HEADER = "📋 Ваши активные залоги:"
+
+LOANS_SUMMARY_TOTAL = "Итого к погашению: {total} ₽"
+
+LOANS_SUMMARY_PARTIAL_TOTAL = (
+    "Итого к погашению: не менее {total} ₽ "
+    "(долг по {unknown} из {count} залогов неизвестен)"
+)
+
+LOANS_SUMMARY_CAPPED = (
+    "Сумма займа и проценты показаны для {shown} из {count} залогов, "
+    "остальные — в карточке залога"
+)
+
 CLIENT_NOT_FOUND = """
 Клиент с такии данными не найден.
 
@@ -41,3 +62,5 @@ BIRTHDAY_PLEASE = """
 Выберите дату вашего рождения:"""
 
 RUB = "₽"
+
+STALE_DATA_NOTICE = "⚠️ Данные могут быть устаревшими: показаны последние сохранённые."
@@ -0,0 +1,114 @@
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware, Bot, Dispatcher
+from aiogram.types import TelegramObject
+from aiohttp import web
+
+from metrics.registry import REGISTRY
+
+from .dedup import SeenUpdates
+from .scheduler import ChatScheduler
+from .sender import SendScheduler
+from .storage import MemoryStorageTTL
+
+METRICS_PATH = "/metrics"
+
+HANDLER_SECONDS = REGISTRY.histogram(
+    "bot_handler_seconds", "Update handling time, per handler.", ("handler",)
+)
+HANDLER_ERRORS = REGISTRY.counter(
+    "bot_handler_errors_total", "Handlers that raised, per handler.", ("handler",)
+)
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Inner middleware timing the handler chosen for each event."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        handler_object = data.get("handler")
+        name = handler_object.callback.__name__ if handler_object else "unknown"
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            HANDLER_ERRORS.labels(name).inc()
+            raise
+        finally:
+            HANDLER_SECONDS.labels(name).observe(time.perf_counter() - started)
+
+
+def instrument_dispatcher(dp: Dispatcher) -> None:
+    middleware = HandlerMetricsMiddleware()
+    dp.message.middleware(middleware)
+    dp.callback_query.middleware(middleware)
+
+
+def watch_fsm(storage: MemoryStorageTTL) -> None:
+    REGISTRY.gauge(
+        "fsm_states", "FSM keys held in memory.", lambda: {(): storage.stats().states}
+    )
+    REGISTRY.gauge(
+        "fsm_bytes",
+        "Estimated memory held by FSM states.",
+        lambda: {(): storage.stats().bytes},
+    )
+    REGISTRY.gauge(
+        "fsm_evictions_total",
+        "FSM keys evicted as idle or over the limit.",
+        lambda: {(): storage.stats().evictions},
+        type="counter",
+    )
+
+
+def watch_scheduler(scheduler: ChatScheduler) -> None:
+    def collect() -> Dict[tuple[str, ...], float]:
+        stats = scheduler.stats()
+        return {
+            ("queued",): stats.queued,
+            ("running",): stats.running,
+            ("chats",): stats.chats,
+            ("wait_p50_seconds",): stats.wait_p50,
+            ("wait_p95_seconds",): stats.wait_p95,
+        }
+
+    REGISTRY.gauge(
+        "webhook_scheduler", "ChatScheduler queue state.", collect, ("stat",)
+    )
+
+
+def watch_updates(seen: SeenUpdates) -> None:
+    REGISTRY.gauge(
+        "updates_duplicates_total",
+        "Redelivered updates dropped.",
+        lambda: {(): seen.duplicates},
+        type="counter",
+    )
+
+
+def watch_sender(bot: Bot) -> None:
+    senders = [m for m in bot.session.middleware if isinstance(m, SendScheduler)]
+    if not senders:
+        return
+    stats = senders[0].stats
+    REGISTRY.gauge(
+        "bot_api_sends_total",
+        "Message sends by outcome.",
+        lambda: {
+            ("sent",): stats.sent,
+            ("delayed",): stats.delayed,
+            ("collapsed",): stats.collapsed,
+            ("retried",): stats.retried,
+        },
+        ("outcome",),
+        type="counter",
+    )
+
+
+async def metrics_view(request: web.Request) -> web.Response:
+    return web.Response(text=REGISTRY.render(), content_type="text/plain")
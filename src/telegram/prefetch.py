@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from lombardis.batch import BatchLimits, fan_out
+from lombardis.cache import CacheTTL
+from lombardis.dto import LoanDetails
+from lombardis.protocols import LombardisAPI
+
+logger = logging.getLogger(__name__)
+
+
+class LoanPrefetcher:
+    """Warms loan details for the loans a chat was just shown.
+
+    Keeps the last ``max_chats`` chats' details, each for ``ttl`` seconds;
+    by default as long as LombardisCached keeps loan details fresh.
+    """
+
+    def __init__(
+        self,
+        lombardis: LombardisAPI,
+        concurrency: int = 4,
+        ttl: float = CacheTTL().loan_details,
+        max_chats: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.lombardis = lombardis
+        self.concurrency = concurrency
+        self.ttl = ttl
+        self.max_chats = max_chats
+        self.clock = clock
+        self._tasks: Dict[int, asyncio.Task[None]] = {}
+        self._details: OrderedDict[int, Dict[str, Tuple[float, LoanDetails]]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._details)
+
+    def start(self, chat_id: int, loan_ids: Iterable[str]) -> None:
+        self.cancel(chat_id)
+        self._prune()
+        self._details[chat_id] = {}
+        while len(self._details) > self.max_chats:
+            self.cancel(next(iter(self._details)))
+        task = asyncio.create_task(self._prefetch(chat_id, list(loan_ids)))
+        self._tasks[chat_id] = task
+        task.add_done_callback(lambda _: self._forget_task(chat_id, task))
+
+    def cancel(self, chat_id: int) -> None:
+        task = self._tasks.pop(chat_id, None)
+        if task is not None:
+            task.cancel()
+        self._details.pop(chat_id, None)
+
+    def get(self, chat_id: int, loan_id: str) -> Optional[LoanDetails]:
+        chat_details = self._details.get(chat_id)
+        warm = chat_details.get(loan_id) if chat_details is not None else None
+        if chat_details is None or warm is None:
+            return None
+        fetched_at, loan_details = warm
+        if self.clock() - fetched_at > self.ttl:
+            del chat_details[loan_id]
+            if not chat_details and chat_id not in self._tasks:
+                del self._details[chat_id]
+            return None
+        return loan_details
+
+    async def close(self) -> None:
+        tasks = list(self._tasks.values())
+        for chat_id in list(self._tasks):
+            self.cancel(chat_id)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _prune(self) -> None:
+        """Drop the oldest chats while nothing of theirs is warm or in flight."""
+        now = self.clock()
+        while self._details:
+            chat_id, chat_details = next(iter(self._details.items()))
+            if chat_id in self._tasks or any(
+                now - fetched_at <= self.ttl for fetched_at, _ in chat_details.values()
+            ):
+                return
+            del self._details[chat_id]
+
+    def _forget_task(self, chat_id: int, task: asyncio.Task[None]) -> None:
+        if self._tasks.get(chat_id) is task:
+            del self._tasks[chat_id]
+
+    async def _prefetch(self, chat_id: int, loan_ids: list[str]) -> None:
+        async def fetch(loan_id: str) -> None:
+            loan_details = await self.lombardis.get_loan_details(loan_id)
+            # Stored as each one lands, so a tap needn't wait for the slowest.
+            chat_details = self._details.get(chat_id)
+            if chat_details is not None:
+                chat_details[loan_id] = (self.clock(), loan_details)
+
+        _, errors = await fan_out(
+            loan_ids, fetch, BatchLimits(concurrency=self.concurrency)
+        )
+        for loan_id, error in errors.items():
+            logger.warning(f"Prefetch of loan {loan_id} failed: {error}")
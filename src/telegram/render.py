@@ -0,0 +1,129 @@
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import astuple, dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from aiogram.types import InlineKeyboardMarkup
+
+from lombardis.cache import CacheTTL
+from lombardis.dto import LoanDetails
+
+from .tokens import LoanToken
+
+Renderer = Callable[[LoanToken, LoanDetails], Tuple[str, InlineKeyboardMarkup]]
+
+
+def content_hash(loan_details: LoanDetails) -> str:
+    return hashlib.blake2b(
+        repr(astuple(loan_details)).encode(), digest_size=8
+    ).hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
+class RenderedMessage:
+    loan_id: str
+    token: LoanToken
+    content_hash: str
+    text: str
+    markup: InlineKeyboardMarkup
+
+
+@dataclass
+class RenderStats:
+    hits: int = 0
+    misses: int = 0
+    skipped_edits: int = 0
+
+
+class RenderCache:
+    """Rendered loan messages keyed by loan_id, callback token and content hash.
+
+    Also remembers which rendering each chat's loan details message shows,
+    so re-opening the loan on display needs no edit_message_text call, and
+    no fetch either while the display is younger than ``fresh_for`` seconds.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        max_chats: int = 100_000,
+        fresh_for: float = CacheTTL().loan_details,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.max_chats = max_chats
+        self.fresh_for = fresh_for
+        self.clock = clock
+        self.stats = RenderStats()
+        self._rendered: OrderedDict[Tuple[str, LoanToken, str], RenderedMessage] = (
+            OrderedDict()
+        )
+        self._displayed: OrderedDict[int, Tuple[int, str, LoanToken, str]] = (
+            OrderedDict()
+        )
+        self._displayed_at: Dict[int, float] = {}
+
+    def render(
+        self,
+        loan_id: str,
+        token: LoanToken,
+        loan_details: LoanDetails,
+        renderer: Renderer,
+    ) -> RenderedMessage:
+        key = (loan_id, token, content_hash(loan_details))
+        rendered = self._rendered.get(key)
+        if rendered is not None:
+            self.stats.hits += 1
+            self._rendered.move_to_end(key)
+            return rendered
+
+        self.stats.misses += 1
+        text, markup = renderer(token, loan_details)
+        rendered = RenderedMessage(loan_id, token, key[2], text, markup)
+        self._rendered[key] = rendered
+        if len(self._rendered) > self.max_entries:
+            self._rendered.popitem(last=False)
+        return rendered
+
+    @staticmethod
+    def _shows(rendered: RenderedMessage) -> Tuple[str, LoanToken, str]:
+        return rendered.loan_id, rendered.token, rendered.content_hash
+
+    def shows_fresh(
+        self, chat_id: int, message_id: int, loan_id: str, token: LoanToken
+    ) -> bool:
+        """Whether the message shows this loan, rendered under ``fresh_for`` ago."""
+        shown = self._displayed.get(chat_id)
+        if shown is None or shown[:3] != (message_id, loan_id, token):
+            return False
+        if self.clock() - self._displayed_at[chat_id] >= self.fresh_for:
+            return False
+        self.stats.skipped_edits += 1
+        self._displayed.move_to_end(chat_id)
+        return True
+
+    def is_displayed(
+        self, chat_id: int, message_id: int, rendered: RenderedMessage
+    ) -> bool:
+        shown = self._displayed.get(chat_id)
+        if shown != (message_id, *self._shows(rendered)):
+            return False
+        self.stats.skipped_edits += 1
+        self._displayed.move_to_end(chat_id)
+        return True
+
+    def displayed(
+        self, chat_id: int, message_id: int, rendered: Optional[RenderedMessage]
+    ) -> None:
+        """Record what the chat's message shows now; None if it is unknown."""
+        if rendered is None:
+            self._displayed.pop(chat_id, None)
+            self._displayed_at.pop(chat_id, None)
+            return
+        self._displayed[chat_id] = (message_id, *self._shows(rendered))
+        self._displayed_at[chat_id] = self.clock()
+        self._displayed.move_to_end(chat_id)
+        if len(self._displayed) > self.max_chats:
+            oldest, _ = self._displayed.popitem(last=False)
+            del self._displayed_at[oldest]
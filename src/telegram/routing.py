@@ -0,0 +1,64 @@
+import logging
+from typing import Any, Dict, Optional
+
+from aiogram import Router
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.types import CallbackQuery, TelegramObject
+
+from .handlers.text_constants import BUTTON_EXPIRED
+
+logger = logging.getLogger(__name__)
+
+# Where the chat lives in each kind of update, in lookup order.
+CHAT_PATHS = (
+    ("chat", "id"),
+    ("message", "chat", "id"),
+    ("from", "id"),
+    ("user", "id"),
+)
+
+
+def chat_id_of(update: Dict[str, Any]) -> Optional[int]:
+    for kind, payload in update.items():
+        if kind == "update_id" or not isinstance(payload, dict):
+            continue
+        for path in CHAT_PATHS:
+            value: Any = payload
+            for part in path:
+                value = value.get(part) if isinstance(value, dict) else None
+            if isinstance(value, int):
+                return value
+    return None
+
+
+class CallbackRouter(Router):
+    """Sends each callback query straight to the router owning its prefix.
+
+    aiogram tries every callback handler's filters in turn; here the part of
+    callback_data before the first ":" picks the router with one dict lookup.
+    A callback no router owns, such as a button of a retired version, is
+    answered as expired. Other updates propagate to sub-routers as usual.
+    """
+
+    def __init__(self, *, name: Optional[str] = None):
+        super().__init__(name=name)
+        self._by_prefix: Dict[str, Router] = {}
+
+    def include_callbacks(self, router: Router, *prefixes: str) -> None:
+        for prefix in prefixes:
+            if prefix in self._by_prefix:
+                raise RuntimeError(f"Callback prefix {prefix!r} is already routed")
+            self._by_prefix[prefix] = router
+
+    async def propagate_event(
+        self, update_type: str, event: TelegramObject, **kwargs: Any
+    ) -> Any:
+        if update_type != "callback_query" or not isinstance(event, CallbackQuery):
+            return await super().propagate_event(update_type, event, **kwargs)
+        prefix = (event.data or "").partition(":")[0]
+        router = self._by_prefix.get(prefix)
+        if router is None:
+            logger.debug(f"No router for callback prefix {prefix!r}")
+            await event.answer(BUTTON_EXPIRED)
+            return UNHANDLED
+        return await router.propagate_event(update_type, event, **kwargs)
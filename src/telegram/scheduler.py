@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+from aiohttp import web
+
+from .dedup import SeenUpdates
+from .routing import chat_id_of
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[Any]]
+
+
+@dataclass
+class SchedulerStats:
+    queued: int
+    running: int
+    chats: int
+    processed: int
+    rejected: int
+    wait_p50: float
+    wait_p95: float
+    wait_max: float
+
+
+class ChatScheduler:
+    """Runs jobs in submission order per chat, at most ``concurrency`` at once.
+
+    Each chat with pending jobs gets one runner task that drains its queue,
+    so two updates from the same chat never overlap while different chats
+    share the global limit. ``submit`` refuses work above ``max_queued``.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 64,
+        max_queued: int = 10_000,
+        wait_window: int = 1000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_queued = max_queued
+        self.clock = clock
+        self.processed = 0
+        self.rejected = 0
+        self._slots = asyncio.Semaphore(concurrency)
+        self._chats: Dict[Hashable, Deque[Tuple[Job, float]]] = {}
+        self._runners: Set[asyncio.Task[None]] = set()
+        self._queued = 0
+        self._running = 0
+        self._waits: Deque[float] = deque(maxlen=wait_window)
+
+    def submit(self, chat: Hashable, job: Job) -> bool:
+        if self._queued >= self.max_queued:
+            self.rejected += 1
+            return False
+
+        self._queued += 1
+        queue = self._chats.get(chat)
+        if queue is not None:
+            queue.append((job, self.clock()))
+            return True
+
+        self._chats[chat] = deque([(job, self.clock())])
+        runner = asyncio.create_task(self._drain(chat))
+        self._runners.add(runner)
+        runner.add_done_callback(self._runners.discard)
+        return True
+
+    async def _drain(self, chat: Hashable) -> None:
+        queue = self._chats[chat]
+        try:
+            while queue:
+                job, enqueued_at = queue[0]
+                async with self._slots:
+                    queue.popleft()
+                    self._queued -= 1
+                    self._waits.append(self.clock() - enqueued_at)
+                    self._running += 1
+                    try:
+                        await job()
+                    except Exception as e:
+                        logger.exception(f"Scheduled job for chat {chat} failed: {e}")
+                    finally:
+                        self._running -= 1
+                        self.processed += 1
+        finally:
+            self._queued -= len(queue)
+            del self._chats[chat]
+
+    def stats(self) -> SchedulerStats:
+        waits = sorted(self._waits)
+
+        def quantile(q: float) -> float:
+            return waits[min(int(len(waits) * q), len(waits) - 1)] if waits else 0.0
+
+        return SchedulerStats(
+            queued=self._queued,
+            running=self._running,
+            chats=len(self._chats),
+            processed=self.processed,
+            rejected=self.rejected,
+            wait_p50=quantile(0.5),
+            wait_p95=quantile(0.95),
+            wait_max=waits[-1] if waits else 0.0,
+        )
+
+    async def close(self, timeout: float = 30.0) -> None:
+        """Let queued jobs finish, cancelling whatever is left after ``timeout``."""
+        if not self._runners:
+            return
+        _, pending = await asyncio.wait(set(self._runners), timeout=timeout)
+        for runner in pending:
+            runner.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+class ScheduledRequestHandler(SimpleRequestHandler):
+    """Acknowledges webhook updates at once and feeds them via a ChatScheduler."""
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        scheduler: ChatScheduler,
+        seen: Optional[SeenUpdates] = None,
+        **data: Any,
+    ):
+        super().__init__(dispatcher=dispatcher, bot=bot, **data)
+        self.scheduler = scheduler
+        self.seen = seen
+
+    async def handle(self, request: web.Request) -> web.Response:
+        bot = await self.resolve_bot(request)
+        secret = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+        if not self.verify_secret(secret, bot):
+            return web.Response(body="Unauthorized", status=401)
+
+        try:
+            update = await request.json(loads=bot.session.json_loads)
+            update_id = update["update_id"]
+        except (ValueError, TypeError, KeyError):
+            return web.Response(body="Malformed update", status=400)
+        # Redeliveries are acknowledged without taking a place in the queue.
+        if self.seen is not None and not self.seen.first_time(update_id):
+            return web.json_response({}, dumps=bot.session.json_dumps)
+        chat = chat_id_of(update)
+
+        async def job() -> None:
+            await self._background_feed_update(bot=bot, update=update)
+
+        key = ("update", update_id) if chat is None else chat
+        if not self.scheduler.submit(key, job):
+            # Telegram redelivers the update later; that must not be a duplicate.
+            if self.seen is not None:
+                self.seen.forget(update_id)
+            return web.Response(body="Overloaded", status=503)
+        return web.json_response({}, dumps=bot.session.json_dumps)
+
+    async def close(self) -> None:
+        await self.scheduler.close()
+        await super().close()
@@ -0,0 +1,246 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from metrics.registry import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+COLLAPSED_EDITS = REGISTRY.counter(
+    "bot_api_edits_collapsed_total",
+    "Edits dropped unsent because a newer edit of the message superseded them.",
+    ("method",),
+)
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+send_priority: ContextVar[Priority] = ContextVar(
+    "send_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def background_sends() -> Iterator[None]:
+    """Sends made inside this block yield to interactive replies."""
+    token = send_priority.set(Priority.BACKGROUND)
+    try:
+        yield
+    finally:
+        send_priority.reset(token)
+
+
+class TokenBucket:
+    def __init__(
+        self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated_at = clock()
+        self.paused_until = 0.0
+
+    def delay(self) -> float:
+        """Seconds until a token is available; zero if one is."""
+        now = self.clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+        # Tolerate float drift so a refill never ends in endless tiny sleeps.
+        wait = 0.0 if self.tokens > 1 - 1e-9 else (1 - self.tokens) / self.rate
+        return max(wait, self.paused_until - now)
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, self.clock() + seconds)
+
+
+@dataclass
+class SenderStats:
+    sent: int = 0
+    delayed: int = 0
+    collapsed: int = 0
+    retried: int = 0
+
+
+# Bot API methods that count towards Telegram's message limits.
+LIMITED_PREFIXES = ("send", "edit", "copy", "forward")
+COLLAPSIBLE = ("editMessageText", "editMessageReplyMarkup", "editMessageCaption")
+
+
+class SendScheduler(BaseRequestMiddleware):
+    """Bot session middleware pacing outgoing messages to Telegram's limits.
+
+    Every message-producing call takes a token from a global bucket (~30/s)
+    and from its chat's bucket (1/s, 20/min in groups). Interactive sends go
+    before background ones (see ``background_sends``). A RetryAfter pauses
+    the chat and the call is retried. An edit still waiting for its turn is
+    dropped when a newer edit of the same message arrives; the dropped call
+    returns True and is counted in bot_api_edits_collapsed_total.
+
+    Pacing is inline, there is no outbound queue: the caller's await spans
+    the wait for both buckets and any RetryAfter pauses (up to
+    ``max_retries``), so a handler run by ChatScheduler holds its chat's
+    queue meanwhile. Priority only decides which waiting caller goes next.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        group_rate: float = 20 / 60,
+        chat_burst: float = 3.0,
+        max_chats: int = 10_000,
+        max_retries: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.chat_burst = chat_burst
+        self.max_chats = max_chats
+        self.max_retries = max_retries
+        self.clock = clock
+        self.stats = SenderStats()
+        self.global_bucket = TokenBucket(global_rate, global_rate, clock)
+        self._chats: OrderedDict[Hashable, TokenBucket] = OrderedDict()
+        self._waiting: Dict[Priority, int] = {priority: 0 for priority in Priority}
+        self._edits: Dict[Tuple[Hashable, int], int] = {}
+        self._generation = 0
+
+    def _chat_bucket(self, chat_id: Hashable) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            group = isinstance(chat_id, str) or (
+                isinstance(chat_id, int) and chat_id < 0
+            )
+            rate = self.group_rate if group else self.chat_rate
+            bucket = TokenBucket(rate, self.chat_burst, self.clock)
+            self._chats[chat_id] = bucket
+            if len(self._chats) > self.max_chats:
+                self._chats.popitem(last=False)
+        else:
+            self._chats.move_to_end(chat_id)
+        return bucket
+
+    def _superseded(
+        self, edit: Optional[Tuple[Hashable, int]], generation: int
+    ) -> bool:
+        return edit is not None and self._edits.get(edit) != generation
+
+    async def _acquire(
+        self,
+        bucket: Optional[TokenBucket],
+        priority: Priority,
+        edit: Optional[Tuple[Hashable, int]],
+        generation: int,
+    ) -> bool:
+        """Wait for a send slot; False if a newer edit made this one moot.
+
+        Only sends whose chat is ready count as waiting for the global bucket,
+        so a paused chat does not hold back the lower-priority lanes.
+        """
+        waiting = False
+        delayed = False
+        try:
+            while True:
+                if self._superseded(edit, generation):
+                    return False
+                chat_delay = bucket.delay() if bucket is not None else 0.0
+                if chat_delay > 0:
+                    if waiting:
+                        self._waiting[priority] -= 1
+                        waiting = False
+                    delayed = True
+                    await asyncio.sleep(chat_delay)
+                    continue
+
+                if not waiting:
+                    self._waiting[priority] += 1
+                    waiting = True
+                ahead = any(self._waiting[p] for p in Priority if p < priority)
+                delay = self.global_bucket.delay()
+                if not ahead and delay <= 0:
+                    self.global_bucket.take()
+                    if bucket is not None:
+                        bucket.take()
+                    if delayed:
+                        self.stats.delayed += 1
+                    return True
+                delayed = True
+                await asyncio.sleep(delay if delay > 0 else 1 / self.global_bucket.rate)
+        finally:
+            if waiting:
+                self._waiting[priority] -= 1
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        api_method = method.__api_method__
+        if not api_method.startswith(LIMITED_PREFIXES):
+            return await make_request(bot, method)
+
+        chat_id: Any = getattr(method, "chat_id", None)
+        bucket = self._chat_bucket(chat_id) if chat_id is not None else None
+        edit: Optional[Tuple[Hashable, int]] = None
+        generation = 0
+        message_id = getattr(method, "message_id", None)
+        if api_method in COLLAPSIBLE and chat_id is not None and message_id:
+            edit = (chat_id, message_id)
+            self._generation += 1
+            generation = self._edits[edit] = self._generation
+
+        attempt = 0
+        try:
+            while True:
+                if not await self._acquire(
+                    bucket, send_priority.get(), edit, generation
+                ):
+                    self.stats.collapsed += 1
+                    COLLAPSED_EDITS.labels(api_method).inc()
+                    logger.debug(
+                        f"{api_method} of message {message_id} in {chat_id} "
+                        "superseded by a newer edit, dropped"
+                    )
+                    return Response[Any](ok=True, result=True)
+                try:
+                    response = await make_request(bot, method)
+                    self.stats.sent += 1
+                    return response
+                except TelegramRetryAfter as e:
+                    if attempt == self.max_retries:
+                        raise
+                    attempt += 1
+                    self.stats.retried += 1
+                    logger.warning(
+                        f"{api_method} to {chat_id} hit flood control, "
+                        f"retrying in {e.retry_after}s"
+                    )
+                    (bucket or self.global_bucket).pause(e.retry_after)
+        finally:
+            if edit is not None and self._edits.get(edit) == generation:
+                del self._edits[edit]
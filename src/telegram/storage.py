@@ -0,0 +1,297 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Set
+
+import aiosqlite
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import (
+    BaseStorage,
+    DefaultKeyBuilder,
+    StateType,
+    StorageKey,
+)
+
+from repository import sqlite
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class _Record:
+    state: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+    updated_at: float = 0.0
+    touched_at: float = 0.0
+    size: int = 0
+
+    @property
+    def empty(self) -> bool:
+        return self.state is None and not self.data
+
+
+# Rough per-key overhead of the StorageKey, the record and the dict slot.
+KEY_OVERHEAD = 256
+
+
+def _approximate_size(record: _Record) -> int:
+    data = len(repr(record.data)) if record.data else 0
+    return KEY_OVERHEAD + len(record.state or "") + data
+
+
+@dataclass
+class FSMStats:
+    states: int
+    bytes: int
+    evictions: int
+
+
+class MemoryStorageTTL(BaseStorage):
+    """In-memory FSM storage that forgets chats idle for ``idle_ttl`` seconds.
+
+    At most ``max_states`` keys are kept; the least recently used go first.
+    Unlike aiogram's MemoryStorage, reading an unknown key stores nothing.
+    """
+
+    def __init__(
+        self,
+        idle_ttl: float = 24 * 3600,
+        max_states: int = 100_000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.idle_ttl = idle_ttl
+        self.max_states = max_states
+        self.clock = clock
+        self.evictions = 0
+        self._records: OrderedDict[StorageKey, _Record] = OrderedDict()
+        self._bytes = 0
+
+    def stats(self) -> FSMStats:
+        self._evict()
+        return FSMStats(len(self._records), self._bytes, self.evictions)
+
+    async def close(self) -> None:
+        pass
+
+    def _evictable(self, key: StorageKey) -> bool:
+        return True
+
+    def _drop(self, key: StorageKey) -> None:
+        record = self._records.pop(key)
+        self._bytes -= record.size
+
+    def _evict(self) -> None:
+        idle_before = self.clock() - self.idle_ttl
+        while self._records:
+            key, record = next(iter(self._records.items()))
+            if (
+                len(self._records) <= self.max_states
+                and record.touched_at >= idle_before
+            ):
+                return
+            if not self._evictable(key):
+                return
+            self._drop(key)
+            self.evictions += 1
+
+    def _get(self, key: StorageKey) -> Optional[_Record]:
+        record = self._records.get(key)
+        if record is None:
+            return None
+        now = self.clock()
+        if record.touched_at < now - self.idle_ttl and self._evictable(key):
+            self._drop(key)
+            self.evictions += 1
+            return None
+        record.touched_at = now
+        self._records.move_to_end(key)
+        return record
+
+    def _put(self, key: StorageKey, record: _Record) -> None:
+        record.touched_at = self.clock()
+        record.size = _approximate_size(record)
+        self._records[key] = record
+        self._bytes += record.size
+        self._evict()
+
+    async def _load(self, key: StorageKey) -> _Record:
+        return self._get(key) or _Record()
+
+    def _store(self, key: StorageKey, record: _Record) -> None:
+        record.updated_at = self.clock()
+        if key in self._records:
+            self._drop(key)
+        if not record.empty:
+            self._put(key, record)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        record = await self._load(key)
+        record.state = state.state if isinstance(state, State) else state
+        self._store(key, record)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return (await self._load(key)).state
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        record = await self._load(key)
+        record.data = data.copy()
+        self._store(key, record)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return (await self._load(key)).data.copy()
+
+
+class SQLiteStorage(MemoryStorageTTL):
+    """FSM storage persisted to SQLite behind an in-memory write-back layer.
+
+    Reads are served from memory once a key has been loaded. Writes only mark
+    the key dirty; a background task flushes dirty keys every
+    ``flush_interval`` seconds in one transaction. States that were not
+    written for ``ttl`` seconds are treated as abandoned and dropped. Idle
+    keys leave memory as in MemoryStorageTTL, but only once flushed.
+    """
+
+    def __init__(
+        self,
+        db_name: str,
+        ttl: float = 7 * 24 * 3600,
+        flush_interval: float = 1.0,
+        idle_ttl: float = 3600,
+        max_states: int = 100_000,
+        clock: Callable[[], float] = time.time,
+    ):
+        super().__init__(idle_ttl=idle_ttl, max_states=max_states, clock=clock)
+        self.db_name = db_name
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self.key_builder = DefaultKeyBuilder(
+            with_bot_id=True, with_business_connection_id=True, with_destiny=True
+        )
+        self.connection: aiosqlite.Connection | None = None
+        self._dirty: Set[StorageKey] = set()
+        self._flusher: Optional[asyncio.Task[None]] = None
+
+    async def connect(self) -> None:
+        if self.connection is None:
+            try:
+                self.connection = await sqlite.connect(self.db_name)
+                await self.connection.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS fsm (
+                        key TEXT PRIMARY KEY,
+                        state TEXT,
+                        data TEXT NOT NULL,
+                        updated_at REAL NOT NULL
+                    )
+                    """
+                )
+                await self.connection.execute(
+                    "CREATE INDEX IF NOT EXISTS fsm_updated_at ON fsm (updated_at)"
+                )
+                await self.connection.commit()
+            except Exception as e:
+                raise RuntimeError(f"Failed to connect to FSM sqlite database: {e}")
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        if self.connection:
+            await self.flush()
+            try:
+                await self.connection.close()
+                self.connection = None
+            except Exception as e:
+                raise RuntimeError(f"Failed to close FSM sqlite database: {e}")
+
+    def _evictable(self, key: StorageKey) -> bool:
+        return key not in self._dirty
+
+    def _fresh(self, record: _Record) -> bool:
+        return record.updated_at >= self.clock() - self.ttl
+
+    async def _load(self, key: StorageKey) -> _Record:
+        record = self._get(key)
+        if record is not None and self._fresh(record):
+            return record
+
+        await self.connect()
+        assert self.connection is not None
+        try:
+            async with self.connection.execute(
+                "SELECT state, data, updated_at FROM fsm WHERE key = ? AND updated_at >= ?",
+                (self.key_builder.build(key), self.clock() - self.ttl),
+            ) as cursor:
+                row = await cursor.fetchone()
+        except Exception as e:
+            raise RuntimeError(f"Failed to load FSM state for {key}: {e}")
+
+        # A write may have landed while the row was loading; it wins.
+        record = self._get(key)
+        if record is None or not self._fresh(record):
+            if key in self._records:
+                self._drop(key)
+            if row is None:
+                # Kept as a negative entry so the next read skips the database.
+                record = _Record(updated_at=self.clock())
+            else:
+                record = _Record(row[0], json.loads(row[1]), row[2])
+            self._put(key, record)
+        return record
+
+    def _store(self, key: StorageKey, record: _Record) -> None:
+        self._dirty.add(key)
+        record.updated_at = self.clock()
+        if key in self._records:
+            self._drop(key)
+        self._put(key, record)
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.exception(f"FSM flush failed: {e}")
+
+    async def flush(self) -> None:
+        """Write dirty keys and drop abandoned states in one transaction."""
+        dirty, self._dirty = self._dirty, set()
+        upserts = []
+        deletes = []
+        for key in dirty:
+            record = self._records.get(key)
+            if record is None or record.empty:
+                deletes.append((self.key_builder.build(key),))
+            else:
+                upserts.append(
+                    (
+                        self.key_builder.build(key),
+                        record.state,
+                        json.dumps(record.data),
+                        record.updated_at,
+                    )
+                )
+
+        await self.connect()
+        assert self.connection is not None
+        try:
+            await self.connection.executemany(
+                "INSERT OR REPLACE INTO fsm (key, state, data, updated_at) VALUES (?, ?, ?, ?)",
+                upserts,
+            )
+            await self.connection.executemany("DELETE FROM fsm WHERE key = ?", deletes)
+            await self.connection.execute(
+                "DELETE FROM fsm WHERE updated_at < ?", (self.clock() - self.ttl,)
+            )
+            await self.connection.commit()
+        except Exception as e:
+            self._dirty |= dirty
+            raise RuntimeError(f"Failed to flush FSM states: {e}")
+        self._evict()
@@ -0,0 +1,116 @@
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, NamedTuple, Optional
+
+from lombardis.dto import ClientLoans
+
+
+# Random, so a restarted process does not reuse the epochs of the last one.
+EPOCH_BITS = 24
+
+
+class LoanToken(NamedTuple):
+    epoch: int
+    number: int
+
+
+@dataclass(slots=True)
+class _ChatTokens:
+    touched_at: float
+    epoch: int
+    loan_ids: Dict[int, str] = field(default_factory=dict)
+    tokens: Dict[str, int] = field(default_factory=dict)
+    listing: Optional[ClientLoans] = None
+
+
+class CallbackTokens:
+    """Short per-chat numbers standing in for loan ids in callback_data.
+
+    It also keeps the loan list a chat was last shown, so its pages can be
+    rendered without asking Lombardis again; keeping a new list starts a new
+    epoch. A chat's tokens and list expire
+    ``ttl`` seconds after it was last issued a token or given a list.
+
+    Indices restart at 0 whenever a chat's registry is recreated (expiry,
+    eviction, restart), so every token also carries the registry's random
+    epoch. A token from another epoch never resolves.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 86_400.0,
+        max_chats: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+        new_epoch: Callable[[], int] = lambda: random.getrandbits(EPOCH_BITS),
+    ):
+        self.ttl = ttl
+        self.max_chats = max_chats
+        self.clock = clock
+        self.new_epoch = new_epoch
+        self._chats: OrderedDict[int, _ChatTokens] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._chats)
+
+    def _expire(self, now: float) -> None:
+        while self._chats:
+            chat_id, chat = next(iter(self._chats.items()))
+            if now - chat.touched_at < self.ttl and len(self._chats) <= self.max_chats:
+                break
+            del self._chats[chat_id]
+
+    def _touch(self, chat_id: int) -> _ChatTokens:
+        now = self.clock()
+        self._expire(now)
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            chat = self._chats[chat_id] = _ChatTokens(now, self.new_epoch())
+            self._expire(now)
+        else:
+            chat.touched_at = now
+            self._chats.move_to_end(chat_id)
+        return chat
+
+    def _get(self, chat_id: int) -> Optional[_ChatTokens]:
+        self._expire(self.clock())
+        return self._chats.get(chat_id)
+
+    def issue(self, chat_id: int, loan_id: str) -> LoanToken:
+        chat = self._touch(chat_id)
+        index = chat.tokens.get(loan_id)
+        if index is None:
+            index = chat.tokens[loan_id] = len(chat.loan_ids)
+            chat.loan_ids[index] = loan_id
+        return LoanToken(chat.epoch, index)
+
+    def resolve(self, chat_id: int, token: LoanToken) -> Optional[str]:
+        chat = self._get(chat_id)
+        if chat is None or chat.epoch != token.epoch:
+            return None
+        return chat.loan_ids.get(token.number)
+
+    def epoch(self, chat_id: int) -> int:
+        """The chat's current epoch, starting a registry if it has none."""
+        return self._touch(chat_id).epoch
+
+    def keep_listing(self, chat_id: int, client_loans: ClientLoans) -> None:
+        """Keeps the chat's new loan list under a new epoch.
+
+        Buttons issued for the list it replaces, pages included, expire.
+        """
+        chat = self._touch(chat_id)
+        epoch = self.new_epoch()
+        while epoch == chat.epoch:
+            epoch = self.new_epoch()
+        chat.epoch = epoch
+        chat.loan_ids.clear()
+        chat.tokens.clear()
+        chat.listing = client_loans
+
+    def listing(self, chat_id: int, epoch: int) -> Optional[ClientLoans]:
+        chat = self._get(chat_id)
+        if chat is None or chat.epoch != epoch:
+            return None
+        return chat.listing
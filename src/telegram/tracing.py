@@ -0,0 +1,148 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import TelegramObject, Update
+
+from metrics.tracing import Trace, current_trace, span
+
+logger = logging.getLogger(__name__)
+
+
+class Tracer:
+    """Logs slow updates with their spans and samples traces to a JSONL file.
+
+    Slow updates always go to the sink; others with probability
+    ``sample_rate``. Traces are queued and appended by one writer task off
+    the event loop; when ``max_pending`` are already waiting, new ones are
+    dropped and counted in ``dropped``.
+    """
+
+    def __init__(
+        self,
+        slow_threshold: float = 1.0,
+        sample_rate: float = 0.0,
+        sink: Optional[str] = None,
+        sample: Callable[[], float] = random.random,
+        max_pending: int = 1000,
+    ):
+        self.slow_threshold = slow_threshold
+        self.sample_rate = sample_rate
+        self.sink = sink
+        self.sample = sample
+        self.dropped = 0
+        self._pending: asyncio.Queue[str] = asyncio.Queue(max_pending)
+        self._writer: Optional[asyncio.Task[None]] = None
+
+    def finish(self, trace: Trace) -> None:
+        slow = trace.duration >= self.slow_threshold
+        if slow:
+            breakdown = ", ".join(
+                f"{part.kind}:{part.name}={part.duration * 1000:.0f}ms"
+                for part in sorted(trace.spans, key=lambda s: -s.duration)[:10]
+            )
+            logger.warning(
+                f"Slow {trace.update_type} update {trace.update_id} "
+                f"(chat {trace.chat_id}) took {trace.duration * 1000:.0f}ms"
+                f"{': ' + breakdown if breakdown else ''}"
+            )
+        if self.sink is not None and (slow or self.sample() < self.sample_rate):
+            self._write(trace)
+
+    def _write(self, trace: Trace) -> None:
+        try:
+            self._pending.put_nowait(
+                json.dumps(trace.to_dict(), ensure_ascii=False) + "\n"
+            )
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._drain())
+
+    def _append(self, lines: List[str]) -> None:
+        assert self.sink is not None
+        with open(self.sink, "a", encoding="utf-8") as sink:
+            sink.writelines(lines)
+
+    async def _drain(self) -> None:
+        while True:
+            lines = [await self._pending.get()]
+            while not self._pending.empty():
+                lines.append(self._pending.get_nowait())
+            try:
+                await asyncio.to_thread(self._append, lines)
+            except Exception as e:
+                logger.exception(
+                    f"Failed to write {len(lines)} traces to {self.sink}: {e}"
+                )
+            finally:
+                for _ in lines:
+                    self._pending.task_done()
+
+    async def close(self) -> None:
+        """Write out the queued traces and stop the writer."""
+        if self._writer is None:
+            return
+        await self._pending.join()
+        self._writer.cancel()
+        await asyncio.gather(self._writer, return_exceptions=True)
+        self._writer = None
+
+
+class TracingMiddleware(BaseMiddleware):
+    """Outer update middleware timing every update end to end."""
+
+    def __init__(self, tracer: Tracer):
+        self.tracer = tracer
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if not isinstance(event, Update):
+            return await handler(event, data)
+
+        chat = data.get("event_chat")
+        trace = Trace(
+            update_id=event.update_id,
+            update_type=event.event_type,
+            chat_id=chat.id if chat is not None else None,
+        )
+        token = current_trace.set(trace)
+        try:
+            return await handler(event, data)
+        except Exception as e:
+            trace.error = repr(e)
+            raise
+        finally:
+            trace.duration = time.perf_counter() - trace.started
+            trace.finished = True
+            current_trace.reset(token)
+            self.tracer.finish(trace)
+
+
+class TracingRequestMiddleware(BaseRequestMiddleware):
+    """Records Bot API calls as spans; installed outside the SendScheduler so
+    time spent waiting for a send slot counts too."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        with span("bot_api", method.__api_method__):
+            return await make_request(bot, method)
@@ -1,6 +1,7 @@
 import hashlib
+import hmac
 import logging
-import random
+from typing import Optional
 
 from aiogram import Bot, Dispatcher
 from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
@@ -10,11 +11,20 @@ from config import conf
 from lombardis.protocols import LombardisAPI
 from repository.protocols import UsersRepo
 
+from .admin import AdminRoutes
+from .dedup import SeenUpdates
+from .metrics import METRICS_PATH, metrics_view
+from .scheduler import ChatScheduler, ScheduledRequestHandler
+
 WEBHOOK_BASE = conf["WEBHOOK_BASE"]
 WEBHOOK_PATH = "/webhook"
 WEBHOOK_URL = f"{WEBHOOK_BASE}{WEBHOOK_PATH}"
 
-WEBHOOK_SECRET = hashlib.sha256(random.randbytes(256)).hexdigest()
+# Derived from the bot token so every worker process agrees on it.
+WEBHOOK_SECRET = hmac.new(
+    conf["BOT_TOKEN"].encode(), WEBHOOK_URL.encode(), hashlib.sha256
+).hexdigest()
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
 
 WEBHOOK_SUCCESS = f'Webhook URL: "{WEBHOOK_URL}" Secret: "{WEBHOOK_SECRET}"'
 WEBHOOK_DELETED = "Webhook deleted."
@@ -23,29 +33,60 @@ logger = logging.getLogger(__name__)
 
 
 def get_webhook_app(
-    dp: Dispatcher, bot: Bot, users: UsersRepo, lombardis: LombardisAPI
+    dp: Dispatcher,
+    bot: Bot,
+    users: UsersRepo,
+    lombardis: LombardisAPI,
+    register_webhook: bool = True,
+    scheduler: Optional[ChatScheduler] = None,
+    seen: Optional[SeenUpdates] = None,
+    metrics: bool = False,
 ) -> web.Application:
+    """Serve the webhook; workers behind a front leave registration to it.
+
+    ``seen`` is used by the scheduled handler; without a scheduler, pass it
+    to get_dispatcher instead.
+    """
+
     async def on_startup() -> None:
-        await bot.set_webhook(WEBHOOK_URL, secret_token=WEBHOOK_SECRET)
-        logger.info(WEBHOOK_SUCCESS)
+        if register_webhook:
+            await bot.set_webhook(WEBHOOK_URL, secret_token=WEBHOOK_SECRET)
+            logger.info(WEBHOOK_SUCCESS)
 
     async def on_shutdown() -> None:
-        await bot.delete_webhook()
+        if register_webhook:
+            await bot.delete_webhook()
+            logger.info(WEBHOOK_DELETED)
         await users.close()
-        logger.info(WEBHOOK_DELETED)
 
     dp.startup.register(on_startup)
     dp.shutdown.register(on_shutdown)
 
     app = web.Application()
-    webhook_requests_handler = SimpleRequestHandler(
-        dispatcher=dp,
-        bot=bot,
-        users=users,
-        lombardis=lombardis,
-        secret_token=WEBHOOK_SECRET,
-    )
+    webhook_requests_handler: SimpleRequestHandler
+    if scheduler is None:
+        webhook_requests_handler = SimpleRequestHandler(
+            dispatcher=dp,
+            bot=bot,
+            users=users,
+            lombardis=lombardis,
+            secret_token=WEBHOOK_SECRET,
+        )
+    else:
+        webhook_requests_handler = ScheduledRequestHandler(
+            dispatcher=dp,
+            bot=bot,
+            scheduler=scheduler,
+            seen=seen,
+            users=users,
+            lombardis=lombardis,
+            secret_token=WEBHOOK_SECRET,
+        )
     webhook_requests_handler.register(app, path=WEBHOOK_PATH)
+    if metrics:
+        app.router.add_get(METRICS_PATH, metrics_view)
+    if conf["ADMIN_SECRET"]:
+        AdminRoutes(conf["ADMIN_SECRET"]).register(app)
     setup_application(app, dp, bot=bot)
 
     return app
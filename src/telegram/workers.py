@@ -0,0 +1,309 @@
+import asyncio
+import hmac
+import json
+import logging
+import multiprocessing
+import re
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence
+
+from aiogram import Bot
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector, web
+from yarl import URL
+
+from .admin import ADMIN_HEADER, MAX_PROFILE_SECONDS
+from .metrics import METRICS_PATH
+from .routing import chat_id_of
+from .webhook import (
+    SECRET_HEADER,
+    WEBHOOK_DELETED,
+    WEBHOOK_PATH,
+    WEBHOOK_SECRET,
+    WEBHOOK_SUCCESS,
+    WEBHOOK_URL,
+)
+
+logger = logging.getLogger(__name__)
+
+SESSION = web.AppKey("session", ClientSession)
+
+# Per-worker diagnostics, e.g. /workers/0/metrics or /workers/1/admin/tasks.
+WORKER_ROUTE = r"/workers/{index:\d+}/{path:(metrics|admin/.*)}"
+WORKER_TIMEOUT = ClientTimeout(total=MAX_PROFILE_SECONDS + 30)
+SAMPLE = re.compile(r"^([^\s{]+)(?:\{(.*)\})?\s+(\S+)$")
+
+
+def worker_for(update: Dict[str, Any], workers: int) -> int:
+    """Pin every chat to one worker so its FSM state and caches stay local."""
+    chat_id = chat_id_of(update)
+    if chat_id is None:
+        return int(update.get("update_id", 0)) % workers
+    return chat_id % workers
+
+
+def merge_metrics(outputs: Sequence[Optional[str]]) -> str:
+    """Merge the workers' /metrics into one exposition with a ``worker`` label.
+
+    A worker that did not answer (None) is reported by front_worker_up only.
+    """
+    families: Dict[str, List[str]] = {}
+    headers: Dict[str, List[str]] = {}
+    for index, output in enumerate(outputs):
+        family = ""
+        for line in (output or "").splitlines():
+            if line.startswith("# "):
+                parts = line.split(" ", 3)
+                if len(parts) >= 3 and parts[1] in ("HELP", "TYPE"):
+                    family = parts[2]
+                    header = headers.setdefault(family, [])
+                    families.setdefault(family, [])
+                    if not any(h.startswith(f"# {parts[1]} ") for h in header):
+                        header.append(line)
+                continue
+            match = SAMPLE.match(line)
+            if match is None:
+                continue
+            name, labels, value = match.groups()
+            worker = f'worker="{index}"'
+            labels = f"{worker},{labels}" if labels else worker
+            families.setdefault(family or name, []).append(
+                f"{name}{{{labels}}} {value}"
+            )
+
+    lines = [
+        "# HELP front_worker_up Whether the worker answered this scrape.",
+        "# TYPE front_worker_up gauge",
+    ]
+    lines += [
+        f'front_worker_up{{worker="{index}"}} {int(output is not None)}'
+        for index, output in enumerate(outputs)
+    ]
+    for family, samples in families.items():
+        lines += headers.get(family, []) + samples
+    return "\n".join(lines) + "\n"
+
+
+def get_front_app(
+    bot: Bot, worker_urls: Sequence[str], register_webhook: bool = True
+) -> web.Application:
+    """Accept Telegram webhooks and forward each update to its chat's worker.
+
+    The front is the only process that calls set_webhook/delete_webhook.
+    Workers share USERS_DB, FSM_DB and LOMBARDIS_DB, which is why every
+    SQLite connection is opened through repository.sqlite.connect.
+    GET /metrics merges every worker's metrics; /workers/{i}/metrics and
+    /workers/{i}/admin/... reach one worker's own routes.
+    """
+    app = web.Application()
+
+    async def session_ctx(app: web.Application) -> AsyncIterator[None]:
+        connector = TCPConnector(limit=0, keepalive_timeout=60)
+        app[SESSION] = ClientSession(
+            connector=connector, timeout=ClientTimeout(total=60)
+        )
+        if register_webhook:
+            await bot.set_webhook(WEBHOOK_URL, secret_token=WEBHOOK_SECRET)
+            logger.info(WEBHOOK_SUCCESS)
+        yield
+        if register_webhook:
+            await bot.delete_webhook()
+            logger.info(WEBHOOK_DELETED)
+        await app[SESSION].close()
+        await bot.session.close()
+
+    async def forward(request: web.Request) -> web.StreamResponse:
+        secret = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(secret, WEBHOOK_SECRET):
+            return web.Response(status=401, text="Unauthorized")
+
+        body = await request.read()
+        try:
+            update = json.loads(body)
+        except ValueError:
+            update = None
+        if not isinstance(update, dict) or "update_id" not in update:
+            return web.Response(status=400, text="Malformed update")
+
+        url = worker_urls[worker_for(update, len(worker_urls))]
+        try:
+            async with request.app[SESSION].post(
+                url,
+                data=body,
+                headers={
+                    SECRET_HEADER: WEBHOOK_SECRET,
+                    "Content-Type": "application/json",
+                },
+            ) as response:
+                return web.Response(
+                    status=response.status,
+                    body=await response.read(),
+                    content_type=response.content_type,
+                )
+        except (ClientError, TimeoutError) as e:
+            logger.error(f"Worker {url} is unavailable: {e}")
+            # Telegram redelivers on any non-2xx answer.
+            return web.Response(status=503, text="Worker unavailable")
+
+    async def scrape(session: ClientSession, url: str) -> Optional[str]:
+        try:
+            async with session.get(URL(url).with_path(METRICS_PATH)) as response:
+                if response.status != 200:
+                    logger.error(
+                        f"Worker {url} answered /metrics with {response.status}"
+                    )
+                    return None
+                return await response.text()
+        except (ClientError, TimeoutError) as e:
+            logger.error(f"Worker {url} is unavailable: {e}")
+            return None
+
+    async def metrics(request: web.Request) -> web.StreamResponse:
+        session = request.app[SESSION]
+        outputs = await asyncio.gather(*(scrape(session, url) for url in worker_urls))
+        return web.Response(text=merge_metrics(outputs), content_type="text/plain")
+
+    async def to_worker(request: web.Request) -> web.StreamResponse:
+        index = int(request.match_info["index"])
+        if index >= len(worker_urls):
+            return web.Response(status=404, text="No such worker")
+        url = (
+            URL(worker_urls[index])
+            .with_path("/" + request.match_info["path"])
+            .with_query(request.query)
+        )
+        headers = {
+            name: request.headers[name]
+            for name in (ADMIN_HEADER, "Content-Type")
+            if name in request.headers
+        }
+        try:
+            async with request.app[SESSION].request(
+                request.method,
+                url,
+                data=await request.read(),
+                headers=headers,
+                timeout=WORKER_TIMEOUT,
+            ) as response:
+                return web.Response(
+                    status=response.status,
+                    body=await response.read(),
+                    headers={
+                        name: response.headers[name]
+                        for name in ("Content-Type", "Content-Disposition")
+                        if name in response.headers
+                    },
+                )
+        except (ClientError, TimeoutError) as e:
+            logger.error(f"Worker {url} is unavailable: {e}")
+            return web.Response(status=503, text="Worker unavailable")
+
+    app.cleanup_ctx.append(session_ctx)
+    app.router.add_post(WEBHOOK_PATH, forward)
+    app.router.add_get(METRICS_PATH, metrics)
+    app.router.add_route("*", WORKER_ROUTE, to_worker)
+    return app
+
+
+def worker_urls(host: str, base_port: int, workers: int) -> List[str]:
+    return [f"http://{host}:{base_port + i}{WEBHOOK_PATH}" for i in range(workers)]
+
+
+def start_workers(
+    target: Callable[..., None], ports: Sequence[int]
+) -> List[multiprocessing.process.BaseProcess]:
+    context = multiprocessing.get_context("spawn")
+    processes: List[multiprocessing.process.BaseProcess] = [
+        context.Process(target=target, args=(port,), name=f"worker-{port}", daemon=True)
+        for port in ports
+    ]
+    for process in processes:
+        process.start()
+    return processes
+
+
+def stop_workers(processes: Sequence[multiprocessing.process.BaseProcess]) -> None:
+    # SIGTERM lets aiohttp run the workers' shutdown hooks (FSM flushes etc.).
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join(timeout=10)
+
+
+class WorkerPool:
+    """Runs a worker process per port and restarts the ones that exit.
+
+    A worker that dies within ``min_uptime`` of starting is restarted after
+    a doubling delay, up to ``max_backoff`` seconds, so a crash loop does not
+    spin the front.
+    """
+
+    def __init__(
+        self,
+        target: Callable[..., None],
+        ports: Sequence[int],
+        check_interval: float = 1.0,
+        min_uptime: float = 60.0,
+        max_backoff: float = 30.0,
+    ):
+        self.target = target
+        self.ports = list(ports)
+        self.check_interval = check_interval
+        self.min_uptime = min_uptime
+        self.max_backoff = max_backoff
+        self.restarts = 0
+        self.processes: List[multiprocessing.process.BaseProcess] = []
+        self._started_at = [0.0] * len(self.ports)
+        self._failures = [0] * len(self.ports)
+        self._restart_at: List[Optional[float]] = [None] * len(self.ports)
+        self._stopped = False
+
+    def start(self) -> None:
+        self.processes = start_workers(self.target, self.ports)
+        self._started_at = [time.monotonic()] * len(self.ports)
+
+    def check(self) -> None:
+        """Schedule restarts of dead workers and run the ones that are due."""
+        if self._stopped:
+            return
+        now = time.monotonic()
+        for index, process in enumerate(self.processes):
+            if process.is_alive():
+                continue
+            restart_at = self._restart_at[index]
+            if restart_at is None:
+                if now - self._started_at[index] < self.min_uptime:
+                    self._failures[index] += 1
+                else:
+                    self._failures[index] = 0
+                delay = min(
+                    self.max_backoff, self.check_interval * 2 ** self._failures[index]
+                )
+                self._restart_at[index] = now + delay
+                logger.error(
+                    f"Worker on port {self.ports[index]} exited with "
+                    f"{process.exitcode}, restarting in {delay:.0f}s"
+                )
+            elif now >= restart_at:
+                [self.processes[index]] = start_workers(
+                    self.target, [self.ports[index]]
+                )
+                self._started_at[index] = now
+                self._restart_at[index] = None
+                self.restarts += 1
+
+    async def supervise(self, app: web.Application) -> AsyncIterator[None]:
+        """aiohttp cleanup context checking the workers while the app runs."""
+
+        async def run() -> None:
+            while True:
+                await asyncio.sleep(self.check_interval)
+                self.check()
+
+        task = asyncio.create_task(run())
+        yield
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    def stop(self) -> None:
+        self._stopped = True
+        stop_workers(self.processes)
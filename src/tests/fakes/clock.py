@@ -0,0 +1,11 @@
+class FakeClock:
+    """A monotonic clock for tests: it only moves when told to."""
+
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
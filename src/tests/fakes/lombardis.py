@@ -1,8 +1,17 @@
+import asyncio
 import random
 import uuid
+from collections import Counter
+from datetime import datetime
 
-from lombardis.dto import ClientDetails, ClientID, ClientLoans, Loan, LoanDetails
-from lombardis.protocols import LombardisAPI
+from lombardis.batch import BatchLimits, LombardisBatchMixin
+from lombardis.dto import (
+    ClientDetails,
+    ClientID,
+    ClientLoans,
+    Loan,
+    LoanDetails,
+)
 
 
 def get_random_phone_number() -> str:
@@ -13,10 +22,16 @@ LOANS = [
     Loan(
         loan_id=uuid.uuid4(),
         pawn_bill_number="АА000142",
+        payment_date=datetime(2025, 6, 1),
+        full_debt=550.00,
+        prolongation_sum=50.00,
     ),
     Loan(
         loan_id=uuid.uuid4(),
         pawn_bill_number="ББ000253",
+        payment_date=datetime(2025, 6, 15),
+        full_debt=850.00,
+        prolongation_sum=50.00,
     ),
 ]
 
@@ -36,20 +51,40 @@ LOAN_DETAILS = {
 }
 
 
-class LombardisFake(LombardisAPI):
+class LombardisFake(LombardisBatchMixin):
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+        self.batch_limits = BatchLimits()
+
+    async def _call(self, api_method: str) -> None:
+        self.calls[api_method] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def connect(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
     async def get_client_id(self, query_string: str) -> ClientID:
+        await self._call("getClientID")
         return ClientID(client_id=uuid.uuid4())
 
     async def get_client_details(self, client_id: str) -> ClientDetails:
+        await self._call("getClientDetails")
         return ClientDetails(
             full_name="Иванов Иван Иванович",
             phone=get_random_phone_number(),
         )
 
     async def get_client_loans(self, client_id: str) -> ClientLoans:
+        await self._call("getClientLoans")
         return ClientLoans(loans=LOANS)
 
     async def get_loan_details(self, loan_id: str) -> LoanDetails:
+        await self._call("getLoanDetails")
         result = LOAN_DETAILS.get(loan_id)
         if result is None:
             raise ValueError()
@@ -0,0 +1,44 @@
+import dataclasses
+from typing import Any, Dict
+
+from polyfactory.factories import DataclassFactory
+
+from lombardis.schemas import (
+    ClientDetailsResponse,
+    ClientIDResponse,
+    ClientLoansResponse,
+    LoanDetailsResponse,
+    LoanResponse,
+    StuffItemResponse,
+)
+
+
+class ClientIDResponseFactory(DataclassFactory[ClientIDResponse]):
+    __model__ = ClientIDResponse
+
+
+class ClientDetailsResponseFactory(DataclassFactory[ClientDetailsResponse]):
+    __model__ = ClientDetailsResponse
+
+
+class ClientLoansResponseFactory(DataclassFactory[ClientLoansResponse]):
+    __model__ = ClientLoansResponse
+
+
+class LoanResponseFactory(DataclassFactory[LoanResponse]):
+    __model__ = LoanResponse
+
+
+class StuffItemResponseFactory(DataclassFactory[StuffItemResponse]):
+    __model__ = StuffItemResponse
+
+
+class LoanDetailsResponseFactory(DataclassFactory[LoanDetailsResponse]):
+    __model__ = LoanDetailsResponse
+
+
+def build_payload(
+    factory: type[DataclassFactory[Any]], **kwargs: Any
+) -> Dict[str, Any]:
+    """Build a JSON-like Lombardis response body using the provided factory."""
+    return dataclasses.asdict(factory.build(**kwargs))
@@ -0,0 +1,62 @@
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from pydantic_core import to_json
+
+
+class LombardisServerFake:
+    """Local aiohttp stand-in for the Lombardis HTTP API."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.responses: Dict[str, bytes] = {}
+        self.peers: Set[Tuple[str, int]] = set()
+        self.requests = 0
+        # (status, delay) overrides consumed by the next requests, in order.
+        self.script: Deque[Tuple[int, float]] = deque()
+        self.server: Optional[TestServer] = None
+
+    def configure(self, api_method: str, response_data: Any) -> None:
+        self.responses[api_method] = to_json(response_data)
+
+    @property
+    def connections(self) -> int:
+        return len(self.peers)
+
+    @property
+    def base_url(self) -> str:
+        assert self.server is not None
+        return str(self.server.make_url("")).rstrip("/")
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        peer = (
+            request.transport.get_extra_info("peername") if request.transport else None
+        )
+        if peer is not None:
+            self.peers.add(peer[:2])
+        status, delay = self.script.popleft() if self.script else (200, self.latency)
+        if delay:
+            await asyncio.sleep(delay)
+        if status != 200:
+            return web.Response(status=status)
+        api_method = request.match_info["api_method"]
+        if api_method not in self.responses:
+            raise web.HTTPNotFound()
+        return web.Response(
+            body=self.responses[api_method], content_type="application/json"
+        )
+
+    async def __aenter__(self) -> "LombardisServerFake":
+        app = web.Application()
+        app.router.add_route("*", "/{api_method}", self.handle)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        if self.server is not None:
+            await self.server.close()
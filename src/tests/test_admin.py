@@ -0,0 +1,114 @@
+import asyncio
+import tracemalloc
+from typing import Any, List
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from metrics.profiler import SamplingProfiler
+from telegram.admin import ADMIN_HEADER, AdminRoutes
+
+SECRET = "admin-secret"
+AUTH = {ADMIN_HEADER: SECRET}
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def client():
+    app = web.Application()
+    AdminRoutes(SECRET).register(app)
+    async with TestClient(TestServer(app)) as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_admin_routes_require_the_secret(client) -> None:
+    for headers in ({}, {ADMIN_HEADER: "wrong"}):
+        response = await client.get("/admin/tasks", headers=headers)
+        assert response.status == 401
+
+
+@pytest.mark.asyncio
+async def test_tasks_are_counted_by_coroutine(client) -> None:
+    async def parked() -> None:
+        await asyncio.sleep(10)
+
+    tasks = [asyncio.create_task(parked()) for _ in range(3)]
+    await asyncio.sleep(0)
+    response = await client.get("/admin/tasks", headers=AUTH)
+    body = await response.json()
+    for task in tasks:
+        task.cancel()
+
+    name = "test_tasks_are_counted_by_coroutine.<locals>.parked"
+    assert body["by_coroutine"][name] == 3
+    assert body["total"] >= 3
+
+
+def burn_cpu() -> None:
+    sum(i * i for i in range(200_000))
+
+
+@pytest.mark.asyncio
+async def test_profile_returns_collapsed_stacks(client) -> None:
+    async def busy() -> None:
+        for _ in range(20):
+            burn_cpu()
+            await asyncio.sleep(0.005)
+
+    burner = asyncio.create_task(busy())
+    response = await client.get("/admin/profile?seconds=0.3", headers=AUTH)
+    text = await response.text()
+    await burner
+
+    assert response.status == 200
+    assert any("burn_cpu" in line for line in text.splitlines())
+    for line in text.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+
+    response = await client.get("/admin/profile?seconds=1000", headers=AUTH)
+    assert response.status == 400
+
+
+def test_profiler_refuses_to_start_twice() -> None:
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    with pytest.raises(RuntimeError):
+        profiler.start()
+    burn_cpu()
+    assert "burn_cpu" in profiler.stop()
+
+
+@pytest.mark.asyncio
+async def test_memory_snapshot_and_diff(client) -> None:
+    response = await client.get("/admin/memory/diff", headers=AUTH)
+    assert response.status == 409
+
+    response = await client.post("/admin/memory/snapshot", headers=AUTH)
+    assert response.status == 200
+    assert (await response.text()).startswith("traced:")
+
+    hoard: List[Any] = [bytearray(1024) for _ in range(1000)]
+    response = await client.get("/admin/memory/diff", headers=AUTH)
+    diff = await response.text()
+    assert "test_admin.py" in diff.splitlines()[0]
+    del hoard
+
+    response = await client.post("/admin/memory/stop", headers=AUTH)
+    assert response.status == 200
+    assert not tracemalloc.is_tracing()
+
+
+@pytest.mark.asyncio
+async def test_memory_stop_leaves_tracing_it_did_not_start(client) -> None:
+    tracemalloc.start()
+    try:
+        response = await client.post("/admin/memory/snapshot", headers=AUTH)
+        assert response.status == 200
+        response = await client.post("/admin/memory/stop", headers=AUTH)
+        assert response.status == 200
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,232 @@
+import uuid
+from types import SimpleNamespace
+from typing import Any, List
+
+import pytest
+from aiogram import Bot, Dispatcher, F, Router
+from aiogram.types import CallbackQuery, Message, Update
+
+from lombardis.dto import ClientLoans, Loan
+from telegram.handlers.loans import (
+    LOANS_PER_PAGE,
+    LoansCallback,
+    LoansPageCallback,
+    PayCallback,
+    _loans_keyboard,
+    loans_page_handler,
+)
+from telegram.handlers.text_constants import BUTTON_EXPIRED
+from telegram.routing import CallbackRouter
+from telegram.tokens import CallbackTokens, LoanToken
+from tests.fakes.clock import FakeClock
+
+LOAN_ID = "a4b0d1a6-2f0c-4f5e-9d7e-0e1c4a3b2c1d"
+OTHER_LOAN_ID = "0d1c2b3a-4f5e-4d7e-9f0c-1e2d3c4b5a69"
+
+
+def test_tokens_are_short_stable_and_per_chat() -> None:
+    tokens = CallbackTokens()
+
+    first = tokens.issue(1, LOAN_ID)
+    second = tokens.issue(1, OTHER_LOAN_ID)
+    assert (first.number, second.number) == (0, 1)
+    assert first.epoch == second.epoch == tokens.epoch(1)
+    assert tokens.issue(1, LOAN_ID) == first
+    assert tokens.resolve(1, first) == LOAN_ID
+    assert tokens.resolve(1, second) == OTHER_LOAN_ID
+    assert tokens.resolve(2, first) is None
+    assert len(LoansCallback(epoch=second.epoch, loan=second.number).pack()) < 20
+    assert len(PayCallback(epoch=second.epoch, loan=second.number).pack()) < 20
+
+
+def test_tokens_expire_and_are_bounded() -> None:
+    clock = FakeClock()
+    tokens = CallbackTokens(ttl=10, max_chats=2, clock=clock)
+
+    token = tokens.issue(1, LOAN_ID)
+    clock.now = 9
+    assert tokens.resolve(1, token) == LOAN_ID
+    clock.now = 10
+    assert tokens.resolve(1, token) is None
+
+    for chat_id in range(3):
+        tokens.issue(chat_id, LOAN_ID)
+    assert len(tokens) == 2
+    assert tokens.resolve(0, LoanToken(0, 0)) is None
+
+
+def test_tokens_from_an_expired_registry_are_refused() -> None:
+    clock = FakeClock()
+    epochs = iter([7, 8, 9])
+    tokens = CallbackTokens(ttl=10, clock=clock, new_epoch=lambda: next(epochs))
+
+    old = tokens.issue(1, LOAN_ID)
+    clock.now = 10
+    # The new registry hands index 0 to a different loan.
+    new = tokens.issue(1, OTHER_LOAN_ID)
+    assert (old, new) == (LoanToken(7, 0), LoanToken(8, 0))
+    assert tokens.resolve(1, old) is None
+    assert tokens.resolve(1, new) == OTHER_LOAN_ID
+
+    tokens.keep_listing(1, ClientLoans(loans=[]))
+    assert tokens.listing(1, 8) is None
+    assert tokens.listing(1, 9) is not None
+
+
+def test_a_new_listing_expires_the_buttons_of_the_old_one() -> None:
+    epochs = iter([7, 7, 8, 8, 9])
+    tokens = CallbackTokens(new_epoch=lambda: next(epochs))
+
+    tokens.keep_listing(1, many_loans(1))
+    old = tokens.issue(1, LOAN_ID)
+    assert old == LoanToken(8, 0)
+
+    tokens.keep_listing(1, many_loans(2))
+    assert tokens.epoch(1) == 9
+    assert tokens.listing(1, 8) is None
+    assert tokens.resolve(1, old) is None
+    assert tokens.issue(1, OTHER_LOAN_ID) == LoanToken(9, 0)
+
+
+def callback_update(update_id: int, data: str) -> Update:
+    user = {"id": 1, "is_bot": False, "first_name": "Test"}
+    return Update.model_validate(
+        {
+            "update_id": update_id,
+            "callback_query": {
+                "id": str(update_id),
+                "from": user,
+                "chat_instance": "1",
+                "data": data,
+            },
+        }
+    )
+
+
+def message_update(update_id: int, text: str) -> Update:
+    return Update.model_validate(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 0,
+                "chat": {"id": 1, "type": "private"},
+                "text": text,
+            },
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_callback_router_dispatches_by_prefix() -> None:
+    handled: List[Any] = []
+    first, second = Router(), Router()
+
+    @first.callback_query(LoansCallback.filter())
+    async def on_loan(callback: CallbackQuery, callback_data: LoansCallback) -> None:
+        handled.append(("loan", callback_data.loan))
+
+    @second.callback_query(PayCallback.filter())
+    async def on_pay(callback: CallbackQuery, callback_data: PayCallback) -> None:
+        handled.append(("pay", callback_data.loan))
+
+    @second.message(F.text == "hi")
+    async def on_message(message: Message) -> None:
+        handled.append("message")
+
+    callbacks = CallbackRouter()
+    callbacks.include_routers(first, second)
+    callbacks.include_callbacks(first, LoansCallback.__prefix__)
+    callbacks.include_callbacks(second, PayCallback.__prefix__)
+    with pytest.raises(RuntimeError):
+        callbacks.include_callbacks(second, LoansCallback.__prefix__)
+    dp = Dispatcher()
+    dp.include_router(callbacks)
+    bot = Bot("123:abc")
+    requests: List[Any] = []
+
+    async def record(make_request: Any, bot: Bot, method: Any) -> Any:
+        requests.append(method)
+        return True
+
+    bot.session.middleware(record)
+
+    await dp.feed_update(bot, callback_update(1, LoansCallback(epoch=1, loan=3).pack()))
+    await dp.feed_update(bot, callback_update(2, PayCallback(epoch=1, loan=4).pack()))
+    await dp.feed_update(bot, callback_update(3, "unknown:1"))
+    await dp.feed_update(bot, message_update(4, "hi"))
+    await bot.session.close()
+
+    assert handled == [("loan", 3), ("pay", 4), "message"]
+    # Only the unrouted callback is answered here; handlers answer their own.
+    [answer] = requests
+    assert (answer.callback_query_id, answer.text) == ("3", BUTTON_EXPIRED)
+
+
+def many_loans(count: int) -> ClientLoans:
+    return ClientLoans(
+        loans=[
+            Loan(loan_id=uuid.uuid4(), pawn_bill_number=f"АА{i:06}")
+            for i in range(count)
+        ]
+    )
+
+
+def button_data(markup: Any) -> List[str]:
+    return [button.callback_data for row in markup.inline_keyboard for button in row]
+
+
+def test_loans_keyboard_is_paged() -> None:
+    tokens = CallbackTokens()
+    client_loans = many_loans(LOANS_PER_PAGE * 2 + 5)
+
+    first = button_data(_loans_keyboard(1, client_loans, 0, tokens))
+    epoch = tokens.epoch(1)
+    assert first.count(LoansPageCallback(epoch=epoch, page=1).pack()) == 1
+    assert sum(data.startswith("loans:") for data in first) == LOANS_PER_PAGE
+
+    last = button_data(_loans_keyboard(1, client_loans, 2, tokens))
+    assert last.count(LoansPageCallback(epoch=epoch, page=1).pack()) == 1
+    assert LoansPageCallback(epoch=epoch, page=3).pack() not in last
+    assert sum(data.startswith("loans:") for data in last) == 5
+    # Only loans on rendered pages got tokens.
+    assert tokens.resolve(1, LoanToken(epoch, LOANS_PER_PAGE)) == str(
+        client_loans.loans[LOANS_PER_PAGE * 2].loan_id
+    )
+    assert tokens.resolve(1, LoanToken(epoch, LOANS_PER_PAGE + 5)) is None
+
+
+@pytest.mark.asyncio
+async def test_paging_uses_the_kept_listing() -> None:
+    edits: List[Any] = []
+    answers: List[str] = []
+
+    async def edit_message_reply_markup(**kwargs: Any) -> bool:
+        edits.append(kwargs)
+        return True
+
+    async def answer(text: str = "") -> None:
+        answers.append(text)
+
+    message = SimpleNamespace(chat=SimpleNamespace(id=1), message_id=7, answer=answer)
+    callback: Any = SimpleNamespace(
+        bot=SimpleNamespace(edit_message_reply_markup=edit_message_reply_markup),
+        message=message,
+        answer=answer,
+    )
+    tokens = CallbackTokens()
+
+    await loans_page_handler(callback, LoansPageCallback(epoch=0, page=1), tokens)
+    assert edits == []
+    assert answers == [BUTTON_EXPIRED, ""]
+
+    tokens.keep_listing(1, many_loans(LOANS_PER_PAGE + 1))
+    epoch = tokens.epoch(1)
+    await loans_page_handler(
+        callback, LoansPageCallback(epoch=epoch + 1, page=1), tokens
+    )
+    assert edits == []
+    await loans_page_handler(callback, LoansPageCallback(epoch=epoch, page=1), tokens)
+    assert edits[0]["message_id"] == 7
+    previous = LoansPageCallback(epoch=epoch, page=0).pack()
+    assert previous in button_data(edits[0]["reply_markup"])
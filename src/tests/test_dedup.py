@@ -0,0 +1,60 @@
+import pytest
+from aiogram import Bot, Dispatcher
+from aiogram.types import Message, Update
+
+from telegram.dedup import DeduplicateUpdatesMiddleware, SeenUpdates
+from tests.fakes.clock import FakeClock
+
+
+def make_update(update_id: int) -> Update:
+    return Update.model_validate(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": 1,
+                "date": 0,
+                "chat": {"id": 42, "type": "private"},
+                "text": "hi",
+            },
+        }
+    )
+
+
+def test_seen_within_window() -> None:
+    clock = FakeClock()
+    seen = SeenUpdates(window=60, clock=clock)
+
+    assert seen.first_time(1)
+    assert not seen.first_time(1)
+    clock.now = 61
+    assert seen.first_time(1)
+    assert seen.duplicates == 1
+
+
+def test_seen_is_bounded() -> None:
+    seen = SeenUpdates(max_entries=3)
+    for update_id in range(10):
+        seen.first_time(update_id)
+
+    assert len(seen) == 3
+    assert not seen.first_time(9)
+
+
+@pytest.mark.asyncio
+async def test_middleware_skips_redelivered_updates() -> None:
+    handled = []
+    dp = Dispatcher()
+    seen = SeenUpdates()
+    dp.update.outer_middleware(DeduplicateUpdatesMiddleware(seen))
+
+    @dp.message()
+    async def handler(message: Message) -> None:
+        handled.append(message.message_id)
+
+    bot = Bot("123:abc")
+    for update_id in (1, 2, 1, 1):
+        await dp.feed_update(bot, make_update(update_id))
+    await bot.session.close()
+
+    assert len(handled) == 2
+    assert seen.duplicates == 2
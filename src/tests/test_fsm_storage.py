@@ -0,0 +1,149 @@
+from pathlib import Path
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+
+from telegram.storage import FSMStats, MemoryStorageTTL, SQLiteStorage
+from tests.fakes.clock import FakeClock
+
+KEY = StorageKey(bot_id=1, chat_id=2, user_id=2)
+
+
+async def count_rows(storage: SQLiteStorage) -> int:
+    await storage.connect()
+    assert storage.connection is not None
+    async with storage.connection.execute("SELECT COUNT(*) FROM fsm") as cursor:
+        row = await cursor.fetchone()
+    assert row is not None
+    return int(row[0])
+
+
+@pytest.mark.asyncio
+async def test_states_survive_restart(tmp_path: Path) -> None:
+    db_name = str(tmp_path / "fsm.db")
+    storage = SQLiteStorage(db_name, flush_interval=60)
+    await storage.set_state(KEY, "AuthState:birth_date")
+    await storage.set_data(KEY, {"loan_details_message_id": 42})
+    await storage.close()
+
+    restarted = SQLiteStorage(db_name)
+    assert await restarted.get_state(KEY) == "AuthState:birth_date"
+    assert await restarted.get_data(KEY) == {"loan_details_message_id": 42}
+    await restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_writes_are_batched_until_flush(tmp_path: Path) -> None:
+    storage = SQLiteStorage(str(tmp_path / "fsm.db"), flush_interval=60)
+    for chat_id in range(100):
+        key = StorageKey(bot_id=1, chat_id=chat_id, user_id=chat_id)
+        await storage.set_state(key, "AuthState:birth_date")
+
+    assert await count_rows(storage) == 0
+    await storage.flush()
+    assert await count_rows(storage) == 100
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_cleared_state_deletes_row(tmp_path: Path) -> None:
+    storage = SQLiteStorage(str(tmp_path / "fsm.db"), flush_interval=60)
+    await storage.set_state(KEY, "AuthState:birth_date")
+    await storage.flush()
+
+    await storage.set_state(KEY, None)
+    await storage.flush()
+
+    assert await count_rows(storage) == 0
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_abandoned_states_expire(tmp_path: Path) -> None:
+    clock = FakeClock(1000.0)
+    storage = SQLiteStorage(
+        str(tmp_path / "fsm.db"), ttl=60, flush_interval=60, clock=clock
+    )
+    await storage.set_state(KEY, "AuthState:birth_date")
+    await storage.flush()
+
+    clock.advance(61)
+    assert await storage.get_state(KEY) is None
+    await storage.flush()
+    assert await count_rows(storage) == 0
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_idle_states_are_evicted() -> None:
+    clock = FakeClock(1000.0)
+    storage = MemoryStorageTTL(idle_ttl=60, clock=clock)
+    await storage.set_state(KEY, "AuthState:birth_date")
+    other = StorageKey(bot_id=1, chat_id=3, user_id=3)
+    await storage.set_state(other, "AuthState:birth_date")
+
+    clock.advance(45)
+    assert await storage.get_state(other) == "AuthState:birth_date"
+    clock.advance(45)
+
+    assert await storage.get_state(KEY) is None
+    assert await storage.get_state(other) == "AuthState:birth_date"
+    assert storage.stats().states == 1
+
+
+@pytest.mark.asyncio
+async def test_state_cap_drops_least_recently_used() -> None:
+    storage = MemoryStorageTTL(max_states=2)
+    keys = [StorageKey(bot_id=1, chat_id=i, user_id=i) for i in range(3)]
+    await storage.set_state(keys[0], "A")
+    await storage.set_state(keys[1], "B")
+    await storage.get_state(keys[0])
+    await storage.set_state(keys[2], "C")
+
+    assert [await storage.get_state(key) for key in keys] == ["A", None, "C"]
+    assert storage.stats().evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_stats_track_bytes() -> None:
+    storage = MemoryStorageTTL()
+    await storage.set_data(KEY, {"loan_details_message_id": 42})
+    assert storage.stats().bytes > 0
+
+    await storage.set_data(KEY, {})
+    assert storage.stats() == FSMStats(states=0, bytes=0, evictions=0)
+
+
+@pytest.mark.asyncio
+async def test_sqlite_hot_layer_keeps_dirty_states(tmp_path: Path) -> None:
+    storage = SQLiteStorage(str(tmp_path / "fsm.db"), flush_interval=60, max_states=1)
+    other = StorageKey(bot_id=1, chat_id=3, user_id=3)
+    await storage.set_state(KEY, "A")
+    await storage.set_state(other, "B")
+    assert storage.stats().states == 2
+
+    await storage.flush()
+    assert storage.stats().states == 1
+    assert await storage.get_state(KEY) == "A"
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_soak_abandoned_flows() -> None:
+    """100k users start the auth flow and never finish it."""
+    clock = FakeClock(1000.0)
+    storage = MemoryStorageTTL(idle_ttl=15 * 60, max_states=20_000, clock=clock)
+
+    for chat_id in range(100_000):
+        key = StorageKey(bot_id=1, chat_id=chat_id, user_id=chat_id)
+        await storage.set_state(key, "AuthState:waiting_for_birthday")
+        await storage.update_data(key, {"birth_date": "01.01.1990"})
+        clock.advance(0.05)
+        if chat_id % 1000 == 0:
+            assert storage.stats().states <= 20_000
+    stats = storage.stats()
+    assert 17_900 < stats.states <= 18_000
+    assert stats.bytes < stats.states * 400
+
+    clock.advance(15 * 60 + 1)
+    assert storage.stats() == FSMStats(states=0, bytes=0, evictions=100_000)
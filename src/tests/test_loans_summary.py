@@ -0,0 +1,164 @@
+import uuid
+from dataclasses import replace
+from types import SimpleNamespace
+from typing import Any, List
+
+import pytest
+
+from lombardis.dto import ClientLoans, Loan
+from telegram.handlers.loans import (
+    MESSAGE_LIMIT,
+    SUMMARY_MAX_FETCH,
+    LoansSummaryCallback,
+    _generate_loans_summary_message,
+    loans_summary_handler,
+)
+from telegram.handlers.text_constants import (
+    LOANS_SUMMARY_CAPPED,
+    LOANS_SUMMARY_HEADER,
+    LOANS_SUMMARY_PARTIAL_TOTAL,
+    LOANS_SUMMARY_TOTAL,
+    NO_ACTIVE_LOANS,
+)
+from telegram.sender import Priority, send_priority
+from telegram.tokens import CallbackTokens
+from tests.fakes.lombardis import LOANS, LombardisFake
+
+CHAT_ID = 1
+
+
+def many_loans(count: int) -> ClientLoans:
+    return ClientLoans(
+        loans=[
+            Loan(loan_id=uuid.uuid4(), pawn_bill_number=f"АА{i:06}", full_debt=100.0)
+            for i in range(count)
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_summary_lists_active_loans_with_their_interest() -> None:
+    loans = LOANS + [replace(LOANS[0], loan_id=uuid.uuid4(), closed=True)]
+
+    [text] = await _generate_loans_summary_message(
+        LombardisFake(), ClientLoans(loans=loans), CHAT_ID
+    )
+
+    assert text.startswith(LOANS_SUMMARY_HEADER)
+    assert text.count("Проценты: 50.0 ₽") == 2
+    assert text.count("Сумма продления: 50.0 ₽") == 2
+    assert "500.0 ₽" in text and "800.0 ₽" in text
+    assert LOANS_SUMMARY_TOTAL.format(total=1400.0) in text
+
+
+@pytest.mark.asyncio
+async def test_summary_total_is_marked_partial() -> None:
+    loans = [LOANS[0], replace(LOANS[1], full_debt=None)]
+
+    [text] = await _generate_loans_summary_message(
+        LombardisFake(), ClientLoans(loans=loans), CHAT_ID
+    )
+
+    partial = LOANS_SUMMARY_PARTIAL_TOTAL.format(total=550.0, unknown=1, count=2)
+    assert partial in text
+    assert LOANS_SUMMARY_TOTAL.format(total=550.0) not in text
+
+    [text] = await _generate_loans_summary_message(
+        LombardisFake(),
+        ClientLoans(loans=[replace(loan, full_debt=None) for loan in LOANS]),
+        CHAT_ID,
+    )
+    assert "Итого" not in text
+
+
+@pytest.mark.asyncio
+async def test_summary_of_no_active_loans() -> None:
+    closed = ClientLoans(loans=[replace(loan, closed=True) for loan in LOANS])
+    assert await _generate_loans_summary_message(LombardisFake(), closed, CHAT_ID) == [
+        NO_ACTIVE_LOANS
+    ]
+
+
+@pytest.mark.asyncio
+async def test_long_summary_is_split_and_fan_out_capped() -> None:
+    lombardis = LombardisFake()
+    client_loans = many_loans(300)
+
+    parts = await _generate_loans_summary_message(lombardis, client_loans, CHAT_ID)
+
+    assert len(parts) > 1
+    assert all(len(part) <= MESSAGE_LIMIT for part in parts)
+    text = "\n".join(parts)
+    assert all(loan.pawn_bill_number in text for loan in client_loans.loans)
+    assert LOANS_SUMMARY_TOTAL.format(total=30000.0) in parts[-1]
+    assert (
+        LOANS_SUMMARY_CAPPED.format(shown=SUMMARY_MAX_FETCH, count=300) in (parts[-1])
+    )
+    assert lombardis.calls["getLoanDetails"] == SUMMARY_MAX_FETCH
+
+
+@pytest.mark.asyncio
+async def test_summary_within_the_cap_has_no_capped_line() -> None:
+    parts = await _generate_loans_summary_message(
+        LombardisFake(), many_loans(SUMMARY_MAX_FETCH), CHAT_ID
+    )
+
+    assert "показаны для" not in "\n".join(parts)
+
+
+class ManyLoans(LombardisFake):
+    async def get_client_loans(self, client_id: str) -> ClientLoans:
+        await self._call("getClientLoans")
+        return many_loans(300)
+
+
+async def summarize(
+    lombardis: LombardisFake, tokens: CallbackTokens, epoch: int
+) -> tuple[List[Any], List[Priority]]:
+    answers: List[Any] = []
+    priorities: List[Priority] = []
+
+    async def answer(text: str = "") -> None:
+        answers.append(text)
+        priorities.append(send_priority.get())
+
+    async def get_user(query: Any) -> Any:
+        return SimpleNamespace(client_id="client")
+
+    callback: Any = SimpleNamespace(
+        message=SimpleNamespace(chat=SimpleNamespace(id=CHAT_ID), answer=answer),
+        answer=answer,
+    )
+    users: Any = SimpleNamespace(get_user=get_user)
+
+    await loans_summary_handler(
+        callback, LoansSummaryCallback(epoch=epoch), users, lombardis, tokens
+    )
+    return answers, priorities
+
+
+@pytest.mark.asyncio
+async def test_summary_handler_sends_every_part() -> None:
+    lombardis = ManyLoans()
+    answers, priorities = await summarize(lombardis, CallbackTokens(), epoch=0)
+
+    assert answers[-1] == ""
+    assert len(answers) > 2
+    assert answers[0].startswith(LOANS_SUMMARY_HEADER)
+    # Only the first part is an interactive reply; the callback answer too.
+    assert priorities[0] == priorities[-1] == Priority.INTERACTIVE
+    assert set(priorities[1:-1]) == {Priority.BACKGROUND}
+    # No listing was kept for the chat, so it is asked for.
+    assert lombardis.calls["getClientLoans"] == 1
+
+
+@pytest.mark.asyncio
+async def test_summary_handler_reuses_the_kept_listing() -> None:
+    lombardis = ManyLoans()
+    tokens = CallbackTokens()
+    tokens.keep_listing(CHAT_ID, ClientLoans(loans=LOANS))
+
+    answers, _ = await summarize(lombardis, tokens, tokens.epoch(CHAT_ID))
+
+    assert lombardis.calls["getClientLoans"] == 0
+    assert all(loan.pawn_bill_number in answers[0] for loan in LOANS)
@@ -1,35 +1,18 @@
 from contextlib import asynccontextmanager
 
 import pytest
-
-from polyfactory.factories import DataclassFactory
+from pydantic_core import to_json
 
 from lombardis.api import LombardisAsyncHTTP
 from lombardis.dto import ClientDetails, ClientID, ClientLoans, Loan, LoanDetails
-from lombardis.schemas import (
-    ClientDetailsResponse,
-    ClientIDResponse,
-    ClientLoansResponse,
-    LoanDetailsResponse,
+from tests.fakes.lombardis_payloads import (
+    ClientDetailsResponseFactory,
+    ClientIDResponseFactory,
+    ClientLoansResponseFactory,
+    LoanDetailsResponseFactory,
 )
 
 
-class ClientIDResponseFactory(DataclassFactory[ClientIDResponse]):
-    __model__ = ClientIDResponse
-
-
-class ClientDetailsResponseFactory(DataclassFactory[ClientDetailsResponse]):
-    __model__ = ClientDetailsResponse
-
-
-class ClientLoansResponseFactory(DataclassFactory[ClientLoansResponse]):
-    __model__ = ClientLoansResponse
-
-
-class LoanDetailsResponseFactory(DataclassFactory[LoanDetailsResponse]):
-    __model__ = LoanDetailsResponse
-
-
 def generate_api_response(factory):
     """Generate mock API response data using the provided factory."""
     return factory.build().__dict__
@@ -39,6 +22,7 @@ class ClientSessionMock:
     def __init__(self):
         self._responses = {}
         self._called_with = []
+        self.closed = False
 
     def configure(self, method: str, url: str, response_data: dict, status: int = 200):
         self._responses[(method, url)] = (response_data, status)
@@ -79,6 +63,9 @@ class MockResponse:
     async def json(self):
         return self._json_data
 
+    async def read(self):
+        return to_json(self._json_data)
+
     def raise_for_status(self):
         if self._status >= 400:
             raise RuntimeError(f"HTTP Error: {self._status}")
@@ -143,7 +130,14 @@ async def test_get_client_loans(
     result = await lombardis_client.get_client_loans("12345")
     assert result == ClientLoans(
         loans=[
-            Loan(loan_id=loan.LoanID, pawn_bill_number=loan.pawnBillNumber)
+            Loan(
+                loan_id=loan.LoanID,
+                pawn_bill_number=loan.pawnBillNumber,
+                payment_date=loan.PaymentDate,
+                full_debt=loan.fullDebt,
+                prolongation_sum=loan.prolongationSum,
+                closed=loan.Closed,
+            )
             for loan in mock_data["Loans"]
         ]
     )
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from lombardis.batch import DEADLINE_EXCEEDED, BatchLimits, fan_out
+from lombardis.cache import LombardisCached
+from tests.fakes.lombardis import LOAN_DETAILS, LOANS, LombardisFake
+
+LOAN_IDS = [str(loan.loan_id) for loan in LOANS]
+
+
+@pytest.mark.asyncio
+async def test_one_bad_loan_does_not_fail_the_batch() -> None:
+    lombardis = LombardisFake()
+
+    batch = await lombardis.get_loan_details_many(LOAN_IDS + ["missing"])
+
+    assert batch.results == {loan_id: LOAN_DETAILS[loan_id] for loan_id in LOAN_IDS}
+    assert list(batch.errors) == ["missing"]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_and_duplicate_ids() -> None:
+    active = peak = 0
+
+    async def fetch(item_id: str) -> str:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return item_id
+
+    ids = [str(i) for i in range(10)] * 2
+    results, errors = await fan_out(ids, fetch, BatchLimits(concurrency=3))
+
+    assert peak == 3
+    assert results == {str(i): str(i) for i in range(10)}
+    assert errors == {}
+
+
+@pytest.mark.asyncio
+async def test_deadline_keeps_finished_results() -> None:
+    async def fetch(item_id: str) -> str:
+        await asyncio.sleep(0 if item_id == "fast" else 10)
+        return item_id
+
+    results, errors = await fan_out(
+        ["fast", "slow"], fetch, BatchLimits(), deadline=0.05
+    )
+
+    assert results == {"fast": "fast"}
+    assert errors == {"slow": DEADLINE_EXCEEDED}
+
+
+@pytest.mark.asyncio
+async def test_client_loans_many_through_cache() -> None:
+    backend = LombardisFake()
+    cached = LombardisCached(backend)
+
+    await cached.get_client_loans("a")
+    batch = await cached.get_client_loans_many(["a", "b", "c"])
+
+    assert set(batch.results) == {"a", "b", "c"}
+    assert backend.calls["getClientLoans"] == 3
+    assert cached.stats.hits == 1
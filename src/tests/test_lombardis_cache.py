@@ -0,0 +1,113 @@
+import pytest
+
+from lombardis.cache import CacheTTL, LombardisCached, approximate_size
+from lombardis.dto import ClientLoans
+from tests.fakes.clock import FakeClock
+from tests.fakes.lombardis import LOAN_DETAILS, LOANS, LombardisFake
+
+LOAN_ID = str(LOANS[0].loan_id)
+OTHER_LOAN_ID = str(LOANS[1].loan_id)
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def backend() -> LombardisFake:
+    return LombardisFake()
+
+
+@pytest.fixture
+def cached(backend: LombardisFake, clock: FakeClock) -> LombardisCached:
+    return LombardisCached(
+        backend,
+        ttl=CacheTTL(client_details=100, client_loans=10, loan_details=10),
+        clock=clock,
+    )
+
+
+@pytest.mark.asyncio
+async def test_repeated_calls_hit_cache(
+    cached: LombardisCached, backend: LombardisFake
+) -> None:
+    first = await cached.get_loan_details(LOAN_ID)
+    second = await cached.get_loan_details(LOAN_ID)
+
+    assert first == second == LOAN_DETAILS[LOAN_ID]
+    assert backend.calls["getLoanDetails"] == 1
+    assert (cached.stats.hits, cached.stats.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_ttl_is_per_method(
+    cached: LombardisCached, backend: LombardisFake, clock: FakeClock
+) -> None:
+    await cached.get_client_details("client")
+    await cached.get_client_loans("client")
+    clock.now = 50
+
+    await cached.get_client_details("client")
+    await cached.get_client_loans("client")
+
+    assert backend.calls["getClientDetails"] == 1
+    assert backend.calls["getClientLoans"] == 2
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_by_entries(
+    backend: LombardisFake, clock: FakeClock
+) -> None:
+    cached = LombardisCached(backend, max_entries=1, clock=clock)
+
+    await cached.get_loan_details(LOAN_ID)
+    await cached.get_loan_details(OTHER_LOAN_ID)
+    await cached.get_loan_details(LOAN_ID)
+
+    assert backend.calls["getLoanDetails"] == 3
+    assert cached.stats.evictions == 2
+    assert cached.stats.entries == 1
+
+
+@pytest.mark.asyncio
+async def test_eviction_by_bytes(backend: LombardisFake, clock: FakeClock) -> None:
+    size = approximate_size(LOAN_DETAILS[LOAN_ID])
+    cached = LombardisCached(backend, max_bytes=size + 1, clock=clock)
+
+    await cached.get_loan_details(LOAN_ID)
+    await cached.get_loan_details(OTHER_LOAN_ID)
+
+    assert cached.stats.evictions == 1
+    assert cached.stats.bytes <= size + 1
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached(
+    cached: LombardisCached, backend: LombardisFake
+) -> None:
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await cached.get_loan_details("missing")
+
+    assert backend.calls["getLoanDetails"] == 2
+    assert cached.stats.entries == 0
+
+
+@pytest.mark.asyncio
+async def test_stale_results_are_not_cached(
+    cached: LombardisCached, backend: LombardisFake
+) -> None:
+    stale = True
+
+    async def get_client_loans(client_id: str) -> ClientLoans:
+        await backend._call("getClientLoans")
+        return ClientLoans(loans=LOANS, stale=stale)
+
+    backend.get_client_loans = get_client_loans  # type: ignore[method-assign]
+
+    assert (await cached.get_client_loans("1")).stale
+    stale = False
+    assert not (await cached.get_client_loans("1")).stale
+    assert not (await cached.get_client_loans("1")).stale
+    assert backend.calls["getClientLoans"] == 2
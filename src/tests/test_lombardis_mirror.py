@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from lombardis.dto import LoanDetails
+from lombardis.mirror import LombardisMirror
+from lombardis.snapshots import LombardisSnapshotsSQLite
+from tests.fakes.clock import FakeClock
+from tests.fakes.lombardis import LOAN_DETAILS, LOANS, LombardisFake
+
+LOAN_ID = str(LOANS[0].loan_id)
+
+
+class FlakyLombardis(LombardisFake):
+    def __init__(self) -> None:
+        super().__init__()
+        self.down = False
+
+    async def get_loan_details(self, loan_id: str) -> LoanDetails:
+        if self.down:
+            self.calls["getLoanDetails"] += 1
+            raise RuntimeError("Lombardis is down")
+        return await super().get_loan_details(loan_id)
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock(1_000.0)
+
+
+@pytest.fixture
+def backend() -> FlakyLombardis:
+    return FlakyLombardis()
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def mirror(backend: FlakyLombardis, clock: FakeClock):
+    mirror = LombardisMirror(
+        backend,
+        LombardisSnapshotsSQLite(db_name=":memory:"),
+        refresh_after=10,
+        stale_after=100,
+        clock=clock,
+    )
+    await mirror.connect()
+    yield mirror
+    await mirror.close()
+
+
+async def _drain(mirror: LombardisMirror) -> None:
+    await asyncio.gather(*mirror._background)
+
+
+@pytest.mark.asyncio
+async def test_first_read_fetches_and_stores_snapshot(
+    mirror: LombardisMirror, backend: FlakyLombardis, clock: FakeClock
+) -> None:
+    assert await mirror.get_loan_details(LOAN_ID) == LOAN_DETAILS[LOAN_ID]
+    assert await mirror.snapshots.get_loan_details(LOAN_ID) == (
+        LOAN_DETAILS[LOAN_ID],
+        clock.now,
+    )
+
+    assert await mirror.get_loan_details(LOAN_ID) == LOAN_DETAILS[LOAN_ID]
+    assert backend.calls["getLoanDetails"] == 1
+
+
+@pytest.mark.asyncio
+async def test_old_snapshot_is_served_and_refreshed_in_background(
+    mirror: LombardisMirror, backend: FlakyLombardis, clock: FakeClock
+) -> None:
+    await mirror.get_client_loans("client")
+    clock.advance(20)
+
+    client_loans = await mirror.get_client_loans("client")
+    await _drain(mirror)
+
+    assert not client_loans.stale
+    assert backend.calls["getClientLoans"] == 2
+    snapshot = await mirror.snapshots.get_client_loans("client")
+    assert snapshot is not None and snapshot[1] == clock.now
+
+
+@pytest.mark.asyncio
+async def test_snapshot_marked_stale_when_upstream_down(
+    mirror: LombardisMirror, backend: FlakyLombardis, clock: FakeClock
+) -> None:
+    await mirror.get_loan_details(LOAN_ID)
+    backend.down = True
+    clock.advance(20)
+
+    first = await mirror.get_loan_details(LOAN_ID)
+    await _drain(mirror)
+    second = await mirror.get_loan_details(LOAN_ID)
+    await _drain(mirror)
+
+    assert not first.stale
+    assert second.stale
+    assert second.loan_number == LOAN_DETAILS[LOAN_ID].loan_number
+
+    backend.down = False
+    await mirror.get_loan_details(LOAN_ID)
+    await _drain(mirror)
+    assert not (await mirror.get_loan_details(LOAN_ID)).stale
+
+
+@pytest.mark.asyncio
+async def test_snapshot_marked_stale_by_age(
+    mirror: LombardisMirror, clock: FakeClock
+) -> None:
+    await mirror.get_loan_details(LOAN_ID)
+    clock.advance(200)
+
+    assert (await mirror.get_loan_details(LOAN_ID)).stale
+
+
+@pytest.mark.asyncio
+async def test_no_snapshot_and_upstream_down_raises(
+    mirror: LombardisMirror, backend: FlakyLombardis
+) -> None:
+    backend.down = True
+    with pytest.raises(RuntimeError):
+        await mirror.get_loan_details(LOAN_ID)
+
+
+@pytest.mark.asyncio
+async def test_snapshots_survive_reconnect(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    db_name = str(tmp_path / "lombardis.db")
+    first = LombardisMirror(LombardisFake(), LombardisSnapshotsSQLite(db_name))
+    await first.connect()
+    await first.get_loan_details(LOAN_ID)
+    await first.close()
+
+    backend = FlakyLombardis()
+    backend.down = True
+    second = LombardisMirror(backend, LombardisSnapshotsSQLite(db_name))
+    await second.connect()
+    try:
+        assert (await second.get_loan_details(LOAN_ID)).loan_number == (
+            LOAN_DETAILS[LOAN_ID].loan_number
+        )
+    finally:
+        await second.close()
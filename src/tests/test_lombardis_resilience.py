@@ -0,0 +1,190 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from aiohttp import BasicAuth
+
+from lombardis.api import ERRORS, LombardisAsyncHTTP
+from lombardis.resilience import (
+    CallPolicy,
+    CircuitBreaker,
+    CircuitState,
+    LombardisUnavailable,
+    RetryPolicy,
+)
+from tests.fakes.clock import FakeClock
+from tests.fakes.lombardis_payloads import LoanDetailsResponseFactory, build_payload
+from tests.fakes.lombardis_server import LombardisServerFake
+
+FAST_RETRY = RetryPolicy(attempts=3, base_delay=0.001, max_delay=0.001)
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def server():
+    async with LombardisServerFake() as server:
+        server.configure("getLoanDetails", build_payload(LoanDetailsResponseFactory))
+        yield server
+
+
+def make_client(
+    server: LombardisServerFake,
+    policy: CallPolicy,
+    breaker: CircuitBreaker | None = None,
+) -> LombardisAsyncHTTP:
+    return LombardisAsyncHTTP(
+        base_url=server.base_url,
+        auth=BasicAuth("user", "password"),
+        policies={"getLoanDetails": policy},
+        breaker=breaker,
+    )
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_errors(server: LombardisServerFake) -> None:
+    client = make_client(server, CallPolicy(retry=FAST_RETRY))
+    server.script.extend([(503, 0), (502, 0)])
+    try:
+        await client.get_loan_details("1")
+    finally:
+        await client.close()
+
+    assert server.requests == 3
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(server: LombardisServerFake) -> None:
+    client = make_client(server, CallPolicy(retry=FAST_RETRY))
+    server.script.append((404, 0))
+    try:
+        with pytest.raises(RuntimeError):
+            await client.get_loan_details("1")
+    finally:
+        await client.close()
+
+    assert server.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_deadline_bounds_each_attempt(server: LombardisServerFake) -> None:
+    client = make_client(server, CallPolicy(deadline=0.05, retry=FAST_RETRY))
+    server.script.extend([(200, 1.0)] * 3)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    try:
+        with pytest.raises(RuntimeError, match="after 3 attempts"):
+            await client.get_loan_details("1")
+    finally:
+        await client.close()
+
+    assert loop.time() - started < 0.5
+
+
+@pytest.mark.asyncio
+async def test_non_idempotent_calls_are_not_retried(
+    server: LombardisServerFake,
+) -> None:
+    client = make_client(server, CallPolicy(idempotent=False, retry=FAST_RETRY))
+    server.script.append((503, 0))
+    try:
+        with pytest.raises(RuntimeError):
+            await client.get_loan_details("1")
+    finally:
+        await client.close()
+
+    assert server.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_breaker_fails_fast_while_open(server: LombardisServerFake) -> None:
+    breaker = CircuitBreaker(window=4, min_calls=4, failure_rate=0.5, open_for=60)
+    client = make_client(server, CallPolicy(retry=RetryPolicy(attempts=1)), breaker)
+    server.script.extend([(503, 0)] * 4)
+    try:
+        for loan_id in range(4):
+            with pytest.raises(RuntimeError):
+                await client.get_loan_details(str(loan_id))
+        with pytest.raises(LombardisUnavailable):
+            await client.get_loan_details("5")
+    finally:
+        await client.close()
+
+    assert breaker.state is CircuitState.OPEN
+    assert server.requests == 4
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_does_not_lock_the_breaker(
+    server: LombardisServerFake,
+) -> None:
+    breaker = CircuitBreaker(window=2, min_calls=2, open_for=0.01)
+    client = make_client(server, CallPolicy(retry=RetryPolicy(attempts=1)), breaker)
+    breaker.record_failure()
+    breaker.record_failure()
+    await asyncio.sleep(0.02)
+    server.script.append((200, 10))
+    try:
+        probe = asyncio.create_task(client.get_loan_details("1"))
+        await asyncio.sleep(0.05)
+        assert breaker.state is CircuitState.HALF_OPEN
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        await client.get_loan_details("2")
+    finally:
+        await client.close()
+
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_breaker_half_open_probe() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker(window=2, min_calls=2, open_for=10, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    clock.now = 11
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_beats_slow_first_attempt(
+    server: LombardisServerFake,
+) -> None:
+    client = make_client(server, CallPolicy(hedge_quantile=0.5, retry=FAST_RETRY))
+    for _ in range(client.latencies.min_samples):
+        client.latencies.record("getLoanDetails", 0.01)
+    server.script.append((200, 2.0))
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    try:
+        await client.get_loan_details("1")
+    finally:
+        await client.close()
+
+    assert loop.time() - started < 1.0
+    assert server.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_shared_failure_is_one_error(server: LombardisServerFake) -> None:
+    client = make_client(server, CallPolicy(retry=RetryPolicy(attempts=1)))
+    server.script.append((404, 0.05))
+    errors = ERRORS.labels("getLoanDetails")
+    before = errors.value
+    try:
+        results = await asyncio.gather(
+            *(client.get_loan_details("1") for _ in range(3)), return_exceptions=True
+        )
+    finally:
+        await client.close()
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert server.requests == 1
+    assert errors.value == before + 1
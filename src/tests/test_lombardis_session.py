@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from aiohttp import BasicAuth
+
+from lombardis.api import ConnectionPool, LombardisAsyncHTTP
+from tests.fakes.lombardis_payloads import LoanDetailsResponseFactory, build_payload
+from tests.fakes.lombardis_server import LombardisServerFake
+
+CALLS = 20
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def server():
+    async with LombardisServerFake() as server:
+        server.configure(
+            "getLoanDetails",
+            build_payload(LoanDetailsResponseFactory),
+        )
+        yield server
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def lombardis_client(server: LombardisServerFake):
+    client = LombardisAsyncHTTP(
+        base_url=server.base_url,
+        auth=BasicAuth("user", "password"),
+        pool=ConnectionPool(limit=4, limit_per_host=4),
+    )
+    await client.connect()
+    yield client
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_sequential_calls_reuse_one_connection(
+    server: LombardisServerFake, lombardis_client: LombardisAsyncHTTP
+) -> None:
+    for _ in range(CALLS):
+        await lombardis_client.get_loan_details("1")
+
+    assert server.requests == CALLS
+    assert server.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_are_bounded_by_pool(
+    server: LombardisServerFake, lombardis_client: LombardisAsyncHTTP
+) -> None:
+    server.latency = 0.01
+    await asyncio.gather(
+        *(lombardis_client.get_loan_details(str(i)) for i in range(CALLS))
+    )
+
+    assert server.requests == CALLS
+    assert server.connections <= 4
+
+
+@pytest.mark.asyncio
+async def test_session_survives_calls_and_closes_once(
+    lombardis_client: LombardisAsyncHTTP,
+) -> None:
+    await lombardis_client.get_loan_details("1")
+    session = lombardis_client.session
+    await lombardis_client.get_loan_details("1")
+
+    assert session is lombardis_client.session
+    assert session is not None and not session.closed
+
+    await lombardis_client.close()
+    assert session.closed
+    assert lombardis_client.session is None
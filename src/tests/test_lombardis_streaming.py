@@ -0,0 +1,120 @@
+import json
+from typing import AsyncIterator
+
+import pytest
+import pytest_asyncio
+from aiohttp import BasicAuth
+from pydantic_core import to_json
+
+from lombardis.api import LombardisAsyncHTTP
+from lombardis.projections import CLIENT_LOANS, CLIENT_LOANS_STREAM
+from lombardis.streaming import ITEM, ObjectStreamParser
+from tests.fakes.lombardis_payloads import (
+    ClientLoansResponseFactory,
+    LoanDetailsResponseFactory,
+    LoanResponseFactory,
+    StuffItemResponseFactory,
+    build_payload,
+)
+from tests.fakes.lombardis_server import LombardisServerFake
+
+DOCUMENT = {
+    "taskID": "a,b}]",
+    "Loans": [{"nested": [1, {"text": 'quote " and ] \\\\'}]}, 2, None],
+    "errorMessage": "Залог",
+    "tail": {"x": []},
+}
+
+
+async def chunked(body: bytes, size: int) -> AsyncIterator[bytes]:
+    for start in range(0, len(body), size):
+        yield body[start : start + size]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 10_000])
+def test_parser_splits_fields_and_items_across_chunks(chunk_size: int) -> None:
+    body = json.dumps(DOCUMENT, ensure_ascii=False, indent=1).encode()
+    parser = ObjectStreamParser("Loans")
+    fields, items = {}, []
+    for start in range(0, len(body), chunk_size):
+        for key, value in parser.feed(body[start : start + chunk_size]):
+            if key is ITEM:
+                items.append(value)
+            else:
+                fields[key] = value
+
+    assert parser.done
+    assert items == DOCUMENT["Loans"]
+    assert fields == {k: v for k, v in DOCUMENT.items() if k != "Loans"}
+
+
+@pytest.mark.asyncio
+async def test_streaming_matches_buffered_decode() -> None:
+    body = to_json(
+        build_payload(ClientLoansResponseFactory, Loans=LoanResponseFactory.batch(50))
+    )
+
+    streamed = await CLIENT_LOANS_STREAM.decode(chunked(body, 333))
+
+    assert streamed == CLIENT_LOANS.validate_json(body)
+
+
+@pytest.mark.asyncio
+async def test_streaming_stops_after_limit() -> None:
+    body = to_json(
+        build_payload(ClientLoansResponseFactory, Loans=LoanResponseFactory.batch(50))
+    )
+    consumed = 0
+
+    async def counting() -> AsyncIterator[bytes]:
+        nonlocal consumed
+        async for chunk in chunked(body, 256):
+            consumed += len(chunk)
+            yield chunk
+
+    streamed = await CLIENT_LOANS_STREAM.with_limit(5).decode(counting())
+
+    assert len(streamed["Loans"]) == 5
+    assert consumed < len(body) / 2
+
+
+@pytest.mark.asyncio
+async def test_truncated_body_is_rejected() -> None:
+    body = to_json(build_payload(ClientLoansResponseFactory))
+    with pytest.raises(ValueError):
+        await CLIENT_LOANS_STREAM.decode(chunked(body[:-3], 64))
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def server():
+    async with LombardisServerFake() as server:
+        server.configure(
+            "getClientLoans",
+            build_payload(
+                ClientLoansResponseFactory, Loans=LoanResponseFactory.batch(200)
+            ),
+        )
+        server.configure(
+            "getLoanDetails",
+            build_payload(
+                LoanDetailsResponseFactory, Stuff=StuffItemResponseFactory.batch(200)
+            ),
+        )
+        yield server
+
+
+@pytest.mark.asyncio
+async def test_streaming_client_returns_same_dtos(server: LombardisServerFake) -> None:
+    auth = BasicAuth("user", "password")
+    buffered = LombardisAsyncHTTP(base_url=server.base_url, auth=auth)
+    streaming = LombardisAsyncHTTP(base_url=server.base_url, auth=auth, streaming=True)
+    try:
+        assert await streaming.get_client_loans("1") == (
+            await buffered.get_client_loans("1")
+        )
+        assert await streaming.get_loan_details("1") == (
+            await buffered.get_loan_details("1")
+        )
+    finally:
+        await buffered.close()
+        await streaming.close()
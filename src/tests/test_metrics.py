@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from aiogram import Bot, Dispatcher
+from aiogram.types import Message, Update
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from metrics.loop import LOOP_LAG, LoopLagMonitor
+from metrics.registry import Registry, timed
+from telegram.metrics import (
+    HANDLER_SECONDS,
+    METRICS_PATH,
+    instrument_dispatcher,
+    metrics_view,
+)
+
+
+def test_render_counter_histogram_and_gauge() -> None:
+    registry = Registry()
+    calls = registry.counter("calls_total", "Calls.", ("method",))
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    registry.gauge("queue", "Queue.", lambda: {(): 3})
+
+    calls.labels('get"x').inc()
+    calls.labels('get"x').inc(2)
+    for value in (0.05, 0.1, 0.5, 5.0):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE calls_total counter" in lines
+    assert 'calls_total{method="get\\"x"} 3' in lines
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{le="1"} 3' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert "latency_seconds_sum 5.65" in lines
+    assert "latency_seconds_count 4" in lines
+    assert "queue 3" in lines
+
+    with pytest.raises(RuntimeError):
+        registry.counter("calls_total", "Again.")
+
+
+@pytest.mark.asyncio
+async def test_timed_observes_failures_too() -> None:
+    registry = Registry()
+    latency = registry.histogram("query_seconds", "Queries.", ("method",))
+
+    @timed(latency, "fails")
+    async def fails() -> None:
+        raise ValueError()
+
+    with pytest.raises(ValueError):
+        await fails()
+    assert sum(latency.labels("fails").counts) == 1
+
+
+def message_update(update_id: int) -> Update:
+    return Update.model_validate(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 0,
+                "chat": {"id": 1, "type": "private"},
+                "text": "hi",
+            },
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_handlers_are_timed_and_served() -> None:
+    dp = Dispatcher()
+
+    @dp.message()
+    async def metrics_probe_handler(message: Message) -> None:
+        pass
+
+    instrument_dispatcher(dp)
+    bot = Bot("123:abc")
+    await dp.feed_update(bot, message_update(1))
+    await bot.session.close()
+    assert sum(HANDLER_SECONDS.labels("metrics_probe_handler").counts) == 1
+
+    app = web.Application()
+    app.router.add_get(METRICS_PATH, metrics_view)
+    async with TestClient(TestServer(app)) as client:
+        response = await client.get(METRICS_PATH)
+        body = await response.text()
+    assert response.status == 200
+    assert 'bot_handler_seconds_count{handler="metrics_probe_handler"} 1' in body
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_is_measured() -> None:
+    before = sum(LOOP_LAG.labels().counts)
+    monitor = LoopLagMonitor(interval=0.01)
+    await monitor.start()
+    await asyncio.sleep(0.005)
+    # Block the loop past the monitor's wake-up time.
+    sum(i for i in range(2_000_000))
+    await asyncio.sleep(0.02)
+    await monitor.close()
+
+    assert sum(LOOP_LAG.labels().counts) > before
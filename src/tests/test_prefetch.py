@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from telegram.prefetch import LoanPrefetcher
+from tests.fakes.clock import FakeClock
+from tests.fakes.lombardis import LOAN_DETAILS, LOANS, LombardisFake
+
+CHAT_ID = 1
+LOAN_IDS = [str(loan.loan_id) for loan in LOANS]
+
+
+class ConcurrencyProbe(LombardisFake):
+    def __init__(self) -> None:
+        super().__init__(latency=0.01)
+        self.active = 0
+        self.peak = 0
+
+    async def get_loan_details(self, loan_id: str):  # type: ignore[no-untyped-def]
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            return await super().get_loan_details(loan_id)
+        finally:
+            self.active -= 1
+
+
+@pytest.mark.asyncio
+async def test_prefetch_warms_all_listed_loans() -> None:
+    lombardis = LombardisFake()
+    prefetcher = LoanPrefetcher(lombardis)
+
+    prefetcher.start(CHAT_ID, LOAN_IDS + ["missing"])
+    await prefetcher._tasks[CHAT_ID]
+
+    for loan_id in LOAN_IDS:
+        assert prefetcher.get(CHAT_ID, loan_id) == LOAN_DETAILS[loan_id]
+    assert prefetcher.get(CHAT_ID, "missing") is None
+    assert prefetcher.get(CHAT_ID + 1, LOAN_IDS[0]) is None
+
+
+@pytest.mark.asyncio
+async def test_prefetch_concurrency_is_bounded() -> None:
+    lombardis = ConcurrencyProbe()
+    prefetcher = LoanPrefetcher(lombardis, concurrency=1)
+
+    prefetcher.start(CHAT_ID, LOAN_IDS + [f"missing-{i}" for i in range(4)])
+    await prefetcher._tasks[CHAT_ID]
+
+    assert lombardis.peak == 1
+    assert lombardis.calls["getLoanDetails"] == 6
+
+
+@pytest.mark.asyncio
+async def test_cancel_stops_prefetch_and_drops_warm_data() -> None:
+    lombardis = LombardisFake(latency=10)
+    prefetcher = LoanPrefetcher(lombardis)
+
+    prefetcher.start(CHAT_ID, LOAN_IDS)
+    task = prefetcher._tasks[CHAT_ID]
+    await asyncio.sleep(0)
+    prefetcher.cancel(CHAT_ID)
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert prefetcher.get(CHAT_ID, LOAN_IDS[0]) is None
+
+
+@pytest.mark.asyncio
+async def test_warm_data_expires() -> None:
+    clock = FakeClock()
+    prefetcher = LoanPrefetcher(LombardisFake(), ttl=5, clock=clock)
+
+    prefetcher.start(CHAT_ID, LOAN_IDS)
+    await prefetcher._tasks[CHAT_ID]
+    clock.now = 6
+
+    assert prefetcher.get(CHAT_ID, LOAN_IDS[0]) is None
+
+
+class SlowLoan(LombardisFake):
+    def __init__(self, slow_loan_id: str) -> None:
+        super().__init__()
+        self.slow_loan_id = slow_loan_id
+        self.release = asyncio.Event()
+
+    async def get_loan_details(self, loan_id: str):  # type: ignore[no-untyped-def]
+        if loan_id == self.slow_loan_id:
+            await self.release.wait()
+        return await super().get_loan_details(loan_id)
+
+
+@pytest.mark.asyncio
+async def test_each_loan_is_warm_as_soon_as_it_arrives() -> None:
+    lombardis = SlowLoan(LOAN_IDS[0])
+    prefetcher = LoanPrefetcher(lombardis)
+
+    prefetcher.start(CHAT_ID, LOAN_IDS)
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    assert prefetcher.get(CHAT_ID, LOAN_IDS[0]) is None
+    assert prefetcher.get(CHAT_ID, LOAN_IDS[1]) == LOAN_DETAILS[LOAN_IDS[1]]
+    lombardis.release.set()
+    await prefetcher._tasks[CHAT_ID]
+    assert prefetcher.get(CHAT_ID, LOAN_IDS[0]) == LOAN_DETAILS[LOAN_IDS[0]]
+
+
+@pytest.mark.asyncio
+async def test_warm_data_is_bounded_and_pruned() -> None:
+    clock = FakeClock()
+    prefetcher = LoanPrefetcher(LombardisFake(), ttl=5, max_chats=2, clock=clock)
+
+    for chat_id in range(3):
+        prefetcher.start(chat_id, LOAN_IDS)
+        await prefetcher._tasks[chat_id]
+    assert len(prefetcher) == 2
+    assert prefetcher.get(0, LOAN_IDS[0]) is None
+    assert prefetcher.get(2, LOAN_IDS[0]) == LOAN_DETAILS[LOAN_IDS[0]]
+
+    clock.now = 6
+    prefetcher.start(3, [])
+    await prefetcher._tasks[3]
+    assert len(prefetcher) == 1
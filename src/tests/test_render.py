@@ -0,0 +1,125 @@
+from dataclasses import replace
+from types import SimpleNamespace
+from typing import Any, List
+
+import pytest
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from telegram.handlers.loans import (
+    LoansCallback,
+    _render_loan_details,
+    view_loans_as_editing,
+)
+from telegram.render import RenderCache
+from telegram.tokens import CallbackTokens, LoanToken
+from tests.fakes.clock import FakeClock
+from tests.fakes.lombardis import LOAN_DETAILS, LOANS, LombardisFake
+
+CHAT_ID = 2
+MESSAGE_ID = 10
+LOAN_IDS = [str(loan.loan_id) for loan in LOANS]
+TOKEN = LoanToken(0, 0)
+
+
+class FakeBot:
+    def __init__(self) -> None:
+        self.edits: List[dict[str, Any]] = []
+
+    async def edit_message_text(self, **kwargs: Any) -> bool:
+        self.edits.append(kwargs)
+        return True
+
+
+def make_callback(bot: FakeBot) -> Any:
+    async def answer() -> None:
+        pass
+
+    message = SimpleNamespace(chat=SimpleNamespace(id=CHAT_ID))
+    return SimpleNamespace(bot=bot, message=message, answer=answer)
+
+
+def test_render_is_reused_until_the_content_changes() -> None:
+    renders = RenderCache()
+    loan_id = LOAN_IDS[0]
+    details = LOAN_DETAILS[loan_id]
+
+    first = renders.render(loan_id, TOKEN, details, _render_loan_details)
+    assert renders.render(loan_id, TOKEN, details, _render_loan_details) is first
+
+    changed = renders.render(
+        loan_id, TOKEN, replace(details, interests_sum=1.0), _render_loan_details
+    )
+    assert changed is not first
+    assert changed.text != first.text
+    assert (renders.stats.hits, renders.stats.misses) == (1, 2)
+
+
+def test_render_cache_is_bounded() -> None:
+    renders = RenderCache(max_entries=1)
+    for index, loan_id in enumerate(LOAN_IDS):
+        token = LoanToken(0, index)
+        renders.render(loan_id, token, LOAN_DETAILS[loan_id], _render_loan_details)
+    assert len(renders._rendered) == 1
+
+
+@pytest.mark.asyncio
+async def test_retapping_the_displayed_loan_does_not_edit() -> None:
+    bot = FakeBot()
+    callback = make_callback(bot)
+    renders = RenderCache()
+    state = FSMContext(
+        MemoryStorage(), StorageKey(bot_id=1, chat_id=CHAT_ID, user_id=CHAT_ID)
+    )
+    await state.set_data({"loan_details_message_id": MESSAGE_ID})
+    lombardis = LombardisFake()
+    tokens = CallbackTokens()
+
+    async def tap(loan_id: str) -> None:
+        token = tokens.issue(CHAT_ID, loan_id)
+        await view_loans_as_editing(
+            callback,
+            LoansCallback(epoch=token.epoch, loan=token.number),
+            state,
+            lombardis,
+            tokens,
+            renders=renders,
+        )
+
+    await tap(LOAN_IDS[0])
+    await tap(LOAN_IDS[0])
+    await tap(LOAN_IDS[1])
+    await tap(LOAN_IDS[0])
+
+    assert len(bot.edits) == 3
+    assert renders.stats.skipped_edits == 1
+    assert renders.stats.misses == 2
+    # The re-tap was answered from the display, without a fetch.
+    assert lombardis.calls["getLoanDetails"] == 3
+
+
+@pytest.mark.asyncio
+async def test_retap_after_the_display_ages_refetches_without_editing() -> None:
+    bot = FakeBot()
+    callback = make_callback(bot)
+    clock = FakeClock()
+    renders = RenderCache(fresh_for=60, clock=clock)
+    state = FSMContext(
+        MemoryStorage(), StorageKey(bot_id=1, chat_id=CHAT_ID, user_id=CHAT_ID)
+    )
+    await state.set_data({"loan_details_message_id": MESSAGE_ID})
+    lombardis = LombardisFake()
+    tokens = CallbackTokens()
+    token = tokens.issue(CHAT_ID, LOAN_IDS[0])
+    callback_data = LoansCallback(epoch=token.epoch, loan=token.number)
+
+    for at in (0, 30, 90):
+        clock.now = at
+        await view_loans_as_editing(
+            callback, callback_data, state, lombardis, tokens, renders=renders
+        )
+
+    assert lombardis.calls["getLoanDetails"] == 2
+    assert len(bot.edits) == 1
+    assert renders.stats.skipped_edits == 2
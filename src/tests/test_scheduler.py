@@ -0,0 +1,205 @@
+import asyncio
+from typing import List, Tuple
+
+import pytest
+from aiogram import Bot, Dispatcher
+from aiogram.types import Message
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from telegram.dedup import SeenUpdates
+from telegram.scheduler import ChatScheduler, ScheduledRequestHandler
+
+
+@pytest.mark.asyncio
+async def test_jobs_keep_order_per_chat_and_respect_concurrency() -> None:
+    scheduler = ChatScheduler(concurrency=2)
+    log: List[Tuple[str, int, int]] = []
+    running = 0
+    peak = 0
+
+    def job(chat: int, n: int):
+        async def run() -> None:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            log.append(("start", chat, n))
+            await asyncio.sleep(0.01 * (3 - n))
+            log.append(("end", chat, n))
+            running -= 1
+
+        return run
+
+    for n in range(3):
+        for chat in range(4):
+            assert scheduler.submit(chat, job(chat, n))
+    assert scheduler.stats().queued == 12
+    await scheduler.close()
+
+    assert peak == 2
+    for chat in range(4):
+        events = [(kind, n) for kind, c, n in log if c == chat]
+        assert events == [(k, n) for n in range(3) for k in ("start", "end")]
+    stats = scheduler.stats()
+    assert (stats.queued, stats.running, stats.chats, stats.processed) == (0, 0, 0, 12)
+    assert stats.wait_max >= stats.wait_p95 > 0
+
+
+@pytest.mark.asyncio
+async def test_submit_rejects_above_max_queued() -> None:
+    scheduler = ChatScheduler(max_queued=2)
+
+    async def noop() -> None:
+        pass
+
+    assert scheduler.submit(1, noop)
+    assert scheduler.submit(2, noop)
+    assert not scheduler.submit(3, noop)
+    assert scheduler.stats().rejected == 1
+    await scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_failing_job_does_not_stop_chat_queue() -> None:
+    scheduler = ChatScheduler()
+    done = []
+
+    async def fail() -> None:
+        raise RuntimeError("boom")
+
+    async def succeed() -> None:
+        done.append(True)
+
+    scheduler.submit(1, fail)
+    scheduler.submit(1, succeed)
+    await scheduler.close()
+
+    assert done == [True]
+
+
+@pytest.mark.asyncio
+async def test_webhook_is_acknowledged_before_handler_finishes() -> None:
+    release = asyncio.Event()
+    handled = asyncio.Event()
+    dp = Dispatcher()
+
+    @dp.message()
+    async def slow_handler(message: Message) -> None:
+        await release.wait()
+        handled.set()
+
+    scheduler = ChatScheduler()
+    app = web.Application()
+    ScheduledRequestHandler(dp, Bot("123:abc"), scheduler, secret_token="s").register(
+        app, path="/webhook"
+    )
+    update = {
+        "update_id": 1,
+        "message": {
+            "message_id": 1,
+            "date": 0,
+            "chat": {"id": 42, "type": "private"},
+            "text": "hi",
+        },
+    }
+
+    async with TestClient(TestServer(app)) as client:
+        response = await client.post(
+            "/webhook", json=update, headers={"X-Telegram-Bot-Api-Secret-Token": "s"}
+        )
+        assert response.status == 200
+        assert not handled.is_set()
+        assert scheduler.stats().running == 1
+
+        release.set()
+        await asyncio.wait_for(handled.wait(), 1)
+
+
+@pytest.mark.asyncio
+async def test_redelivered_update_is_not_enqueued() -> None:
+    dp = Dispatcher()
+    handled = []
+
+    @dp.message()
+    async def handler(message: Message) -> None:
+        handled.append(message.message_id)
+
+    scheduler = ChatScheduler()
+    seen = SeenUpdates()
+    app = web.Application()
+    ScheduledRequestHandler(
+        dp, Bot("123:abc"), scheduler, seen=seen, secret_token="s"
+    ).register(app, path="/webhook")
+    update = {
+        "update_id": 7,
+        "message": {
+            "message_id": 1,
+            "date": 0,
+            "chat": {"id": 42, "type": "private"},
+            "text": "hi",
+        },
+    }
+
+    async with TestClient(TestServer(app)) as client:
+        for _ in range(3):
+            response = await client.post(
+                "/webhook",
+                json=update,
+                headers={"X-Telegram-Bot-Api-Secret-Token": "s"},
+            )
+            assert response.status == 200
+        await scheduler.close()
+
+    assert handled == [1]
+    assert seen.duplicates == 2
+
+
+@pytest.mark.asyncio
+async def test_refused_update_is_processed_on_redelivery() -> None:
+    dp = Dispatcher()
+    handled = []
+    release = asyncio.Event()
+
+    @dp.message()
+    async def handler(message: Message) -> None:
+        await release.wait()
+        handled.append(message.message_id)
+
+    scheduler = ChatScheduler(concurrency=1, max_queued=1)
+    seen = SeenUpdates()
+    app = web.Application()
+    ScheduledRequestHandler(
+        dp, Bot("123:abc"), scheduler, seen=seen, secret_token="s"
+    ).register(app, path="/webhook")
+
+    def update(update_id: int) -> dict:
+        return {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 0,
+                "chat": {"id": update_id, "type": "private"},
+                "text": "hi",
+            },
+        }
+
+    headers = {"X-Telegram-Bot-Api-Secret-Token": "s"}
+    async with TestClient(TestServer(app)) as client:
+        statuses = []
+        for update_id in (1, 2, 3):
+            response = await client.post(
+                "/webhook", json=update(update_id), headers=headers
+            )
+            statuses.append(response.status)
+            await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.sleep(0.05)
+        response = await client.post("/webhook", json=update(3), headers=headers)
+        statuses.append(response.status)
+
+        response = await client.post("/webhook", data=b"{not json", headers=headers)
+        assert response.status == 400
+        await scheduler.close()
+
+    assert statuses == [200, 200, 503, 200]
+    assert handled == [1, 2, 3]
@@ -0,0 +1,146 @@
+import asyncio
+import time
+from typing import Any, List, Tuple
+
+import pytest
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import EditMessageText, Response, SendMessage, TelegramMethod
+
+from telegram.sender import (
+    COLLAPSED_EDITS,
+    SendScheduler,
+    TokenBucket,
+    background_sends,
+)
+from tests.fakes.clock import FakeClock
+
+BOT = Bot("123:abc")
+
+
+class FakeApi:
+    def __init__(self, failures: int = 0, retry_after: int = 0) -> None:
+        self.failures = failures
+        self.retry_after = retry_after
+        self.started = time.monotonic()
+        self.sent: List[Tuple[float, Any]] = []
+
+    async def __call__(self, bot: Bot, method: TelegramMethod[Any]) -> Response[Any]:
+        if self.failures:
+            self.failures -= 1
+            raise TelegramRetryAfter(
+                method=method, message="", retry_after=self.retry_after
+            )
+        self.sent.append((time.monotonic() - self.started, method))
+        return Response[Any](ok=True, result=True)
+
+    @property
+    def texts(self) -> List[str]:
+        return [method.text for _, method in self.sent]
+
+
+def test_token_bucket_refills_and_pauses() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+    bucket.take()
+    bucket.take()
+    assert bucket.delay() == pytest.approx(0.5)
+
+    clock.now = 0.5
+    assert bucket.delay() == 0
+    bucket.pause(5)
+    assert bucket.delay() == pytest.approx(5)
+
+
+@pytest.mark.asyncio
+async def test_chat_bucket_paces_bursts() -> None:
+    api = FakeApi()
+    scheduler = SendScheduler(chat_rate=20, chat_burst=3)
+
+    await asyncio.gather(
+        *(scheduler(api, BOT, SendMessage(chat_id=1, text=str(i))) for i in range(6))
+    )
+
+    times = sorted(sent_at for sent_at, _ in api.sent)
+    for i, sent_at in enumerate(times):
+        assert sent_at >= (i - 2) / 20 - 0.01
+    assert scheduler.stats.delayed == 3
+
+
+@pytest.mark.asyncio
+async def test_global_bucket_spans_chats() -> None:
+    api = FakeApi()
+    scheduler = SendScheduler(global_rate=50)
+
+    await asyncio.gather(
+        *(scheduler(api, BOT, SendMessage(chat_id=i, text="x")) for i in range(60))
+    )
+
+    assert max(sent_at for sent_at, _ in api.sent) >= 0.19
+
+
+@pytest.mark.asyncio
+async def test_interactive_sends_go_first() -> None:
+    api = FakeApi()
+    scheduler = SendScheduler(global_rate=20)
+    for chat_id in range(20):
+        await scheduler(api, BOT, SendMessage(chat_id=chat_id, text="warmup"))
+
+    async def background() -> None:
+        with background_sends():
+            await scheduler(api, BOT, SendMessage(chat_id=100, text="bulk"))
+
+    bulk = asyncio.create_task(background())
+    await asyncio.sleep(0)
+    await scheduler(api, BOT, SendMessage(chat_id=101, text="reply"))
+    await bulk
+
+    assert api.texts[-2:] == ["reply", "bulk"]
+
+
+@pytest.mark.asyncio
+async def test_superseded_edits_collapse() -> None:
+    api = FakeApi()
+    scheduler = SendScheduler(chat_rate=20, chat_burst=1)
+    await scheduler(api, BOT, SendMessage(chat_id=1, text="menu"))
+
+    results = await asyncio.gather(
+        *(
+            scheduler(api, BOT, EditMessageText(chat_id=1, message_id=7, text=str(i)))
+            for i in range(3)
+        )
+    )
+
+    assert api.texts == ["menu", "2"]
+    assert all(result.result is True for result in results)
+    assert scheduler.stats.collapsed == 2
+    assert COLLAPSED_EDITS.labels("editMessageText").value >= 2
+
+
+@pytest.mark.asyncio
+async def test_retry_after_retries_then_gives_up() -> None:
+    api = FakeApi(failures=1)
+    scheduler = SendScheduler(max_retries=2, chat_burst=10)
+    await scheduler(api, BOT, SendMessage(chat_id=1, text="x"))
+    assert api.texts == ["x"]
+    assert scheduler.stats.retried == 1
+
+    api.failures = 10
+    with pytest.raises(TelegramRetryAfter):
+        await scheduler(api, BOT, SendMessage(chat_id=1, text="y"))
+    assert scheduler.stats.retried == 3
+
+
+@pytest.mark.asyncio
+async def test_pacing_is_inline() -> None:
+    # The caller's await covers the bucket wait and the RetryAfter pause.
+    api = FakeApi(failures=1, retry_after=1)
+    scheduler = SendScheduler(chat_rate=5, chat_burst=1)
+    await scheduler(FakeApi(), BOT, SendMessage(chat_id=1, text="first"))
+
+    started = time.monotonic()
+    await scheduler(api, BOT, SendMessage(chat_id=1, text="second"))
+
+    assert time.monotonic() - started >= 1.0
+    assert api.texts == ["second"]
+    assert scheduler.stats.retried == 1
@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from aiohttp import BasicAuth
+
+from lombardis.api import LombardisAsyncHTTP
+from lombardis.singleflight import SingleFlight
+from tests.fakes.lombardis_payloads import LoanDetailsResponseFactory, build_payload
+from tests.fakes.lombardis_server import LombardisServerFake
+
+
+class Upstream:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.cancelled = False
+
+    async def __call__(self) -> int:
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self.calls
+
+
+async def _settle() -> None:
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution() -> None:
+    flights = SingleFlight()
+    upstream = Upstream()
+
+    waiters = [asyncio.create_task(flights.do("key", upstream)) for _ in range(5)]
+    await _settle()
+    upstream.release.set()
+
+    assert await asyncio.gather(*waiters) == [1] * 5
+    assert upstream.calls == 1
+    assert flights.stats.executions == 1
+    assert flights.stats.coalesced == 4
+    assert len(flights) == 0
+
+
+@pytest.mark.asyncio
+async def test_exception_reaches_every_waiter() -> None:
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def failing() -> None:
+        await release.wait()
+        raise RuntimeError("upstream down")
+
+    waiters = [asyncio.create_task(flights.do("key", failing)) for _ in range(3)]
+    await _settle()
+    release.set()
+
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_first_waiter_cancelled_others_get_result() -> None:
+    flights = SingleFlight()
+    upstream = Upstream()
+
+    first = asyncio.create_task(flights.do("key", upstream))
+    await _settle()
+    others = [asyncio.create_task(flights.do("key", upstream)) for _ in range(2)]
+    await _settle()
+
+    first.cancel()
+    await _settle()
+    upstream.release.set()
+
+    assert await asyncio.gather(*others) == [1, 1]
+    assert first.cancelled()
+    assert not upstream.cancelled
+    assert upstream.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_call_cancelled_when_all_waiters_leave() -> None:
+    flights = SingleFlight()
+    upstream = Upstream()
+
+    waiters = [asyncio.create_task(flights.do("key", upstream)) for _ in range(2)]
+    await _settle()
+    for waiter in waiters:
+        waiter.cancel()
+    await _settle()
+
+    assert upstream.cancelled
+    assert len(flights) == 0
+
+    upstream.release.set()
+    assert await flights.do("key", upstream) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_call_is_not_joined_while_it_unwinds() -> None:
+    flights = SingleFlight()
+    unwinding = asyncio.Event()
+    calls = 0
+
+    async def slow_to_cancel() -> int:
+        nonlocal calls
+        calls += 1
+        call = calls
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            await unwinding.wait()
+            raise
+        return call
+
+    waiter = asyncio.create_task(flights.do("key", slow_to_cancel))
+    await _settle()
+    waiter.cancel()
+    await _settle()
+    assert len(flights) == 0
+
+    fresh = asyncio.create_task(flights.do("key", slow_to_cancel))
+    await _settle()
+    assert calls == 2
+    # The old flight finishing must not forget the new one.
+    unwinding.set()
+    await _settle()
+    assert len(flights) == 1
+    fresh.cancel()
+    await asyncio.gather(waiter, fresh, return_exceptions=True)
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def server():
+    async with LombardisServerFake(latency=0.02) as server:
+        server.configure("getLoanDetails", build_payload(LoanDetailsResponseFactory))
+        yield server
+
+
+@pytest.mark.asyncio
+async def test_client_coalesces_identical_requests(
+    server: LombardisServerFake,
+) -> None:
+    client = LombardisAsyncHTTP(
+        base_url=server.base_url, auth=BasicAuth("user", "password")
+    )
+    try:
+        same = await asyncio.gather(*(client.get_loan_details("1") for _ in range(10)))
+        await asyncio.gather(client.get_loan_details("2"), client.get_loan_details("3"))
+    finally:
+        await client.close()
+
+    assert len(same) == 10
+    assert server.requests == 3
+    assert client.flights.stats.coalesced == 9
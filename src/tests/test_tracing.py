@@ -0,0 +1,140 @@
+import asyncio
+import json
+import logging
+from typing import Any
+
+import pytest
+from aiogram import Bot, Dispatcher
+from aiogram.methods import SendMessage
+from aiogram.types import Message, Update
+
+from metrics.registry import Registry, timed
+from metrics.tracing import Trace, current_trace, span
+from telegram.bot import get_dispatcher
+from telegram.dedup import DeduplicateUpdatesMiddleware, SeenUpdates
+from telegram.tracing import Tracer, TracingMiddleware, TracingRequestMiddleware
+
+registry = Registry()
+QUERY_SECONDS = registry.histogram("query_seconds", "Queries.", ("method",))
+
+
+@timed(QUERY_SECONDS, "get_user", kind="repository")
+async def get_user() -> None:
+    await asyncio.sleep(0.01)
+
+
+def message_update(update_id: int, text: str) -> Update:
+    return Update.model_validate(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 0,
+                "chat": {"id": 5, "type": "private"},
+                "text": text,
+            },
+        }
+    )
+
+
+async def feed(tracer: Tracer, *updates: Update) -> None:
+    dp = Dispatcher()
+    dp.update.outer_middleware(TracingMiddleware(tracer))
+
+    @dp.message()
+    async def handle(message: Message) -> None:
+        if message.text == "slow":
+            await get_user()
+            with span("lombardis", "getClientLoans"):
+                await asyncio.sleep(0.03)
+
+    bot = Bot("123:abc")
+    for update in updates:
+        await dp.feed_update(bot, update)
+    await bot.session.close()
+
+
+@pytest.mark.asyncio
+async def test_slow_updates_are_logged_and_written(tmp_path, caplog) -> None:
+    sink = tmp_path / "traces.jsonl"
+    tracer = Tracer(slow_threshold=0.03, sink=str(sink))
+
+    with caplog.at_level(logging.WARNING, logger="telegram.tracing"):
+        await feed(tracer, message_update(1, "fast"), message_update(2, "slow"))
+    await tracer.close()
+
+    [record] = caplog.records
+    assert "update 2 (chat 5)" in record.message
+    assert "lombardis:getClientLoans=" in record.message
+    assert "repository:get_user=" in record.message
+
+    [line] = sink.read_text().splitlines()
+    trace = json.loads(line)
+    assert trace["update_id"] == 2
+    assert trace["update_type"] == "message"
+    assert [s["kind"] for s in trace["spans"]] == ["repository", "lombardis"]
+    assert trace["totals"]["lombardis"] >= 0.03
+
+
+@pytest.mark.asyncio
+async def test_fast_updates_are_sampled(tmp_path) -> None:
+    sink = tmp_path / "traces.jsonl"
+    tracer = Tracer(slow_threshold=10, sample_rate=0.5, sink=str(sink))
+    samples = iter([0.9, 0.1])
+    tracer.sample = lambda: next(samples)
+
+    await feed(tracer, message_update(1, "fast"), message_update(2, "fast"))
+    await tracer.close()
+
+    assert [
+        json.loads(line)["update_id"] for line in sink.read_text().splitlines()
+    ] == [2]
+
+
+@pytest.mark.asyncio
+async def test_bot_api_calls_are_spans() -> None:
+    async def make_request(bot: Any, method: Any) -> Any:
+        return True
+
+    trace = Trace(update_id=1, update_type="message")
+    token = current_trace.set(trace)
+    try:
+        await TracingRequestMiddleware()(
+            make_request,
+            None,
+            SendMessage(chat_id=1, text="hi"),  # type: ignore[arg-type]
+        )
+    finally:
+        current_trace.reset(token)
+    # Outside a trace nothing is recorded.
+    await TracingRequestMiddleware()(
+        make_request,
+        None,
+        SendMessage(chat_id=1, text="hi"),  # type: ignore[arg-type]
+    )
+
+    assert [(s.kind, s.name) for s in trace.spans] == [("bot_api", "sendMessage")]
+
+
+@pytest.mark.asyncio
+async def test_traces_over_the_queue_limit_are_dropped(tmp_path) -> None:
+    sink = tmp_path / "traces.jsonl"
+    tracer = Tracer(slow_threshold=0, sink=str(sink), max_pending=2)
+
+    for update_id in range(5):
+        tracer.finish(Trace(update_id=update_id, update_type="message"))
+    await tracer.close()
+
+    assert tracer.dropped == 3
+    assert len(sink.read_text().splitlines()) == 2
+
+
+@pytest.mark.asyncio
+async def test_duplicates_are_dropped_before_tracing() -> None:
+    dp, bot = get_dispatcher(seen=SeenUpdates())
+    await bot.session.close()
+
+    # Outer middlewares run in registration order.
+    kinds = [type(m) for m in dp.update.outer_middleware]
+    dedup = kinds.index(DeduplicateUpdatesMiddleware)
+    assert dedup < kinds.index(TracingMiddleware)
@@ -0,0 +1,114 @@
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+import pytest
+import pytest_asyncio
+
+from repository.cached import UsersRepoCached
+from repository.dto import User
+from repository.users import UsersRepoSQLite
+from tests.fakes.clock import FakeClock
+
+USER = User(chat_id=1, full_name="Иванов Иван", client_id="c1", phone_number="+1")
+
+
+class CountingUsersRepo(UsersRepoSQLite):
+    def __init__(self) -> None:
+        super().__init__(db_name=":memory:")
+        self.calls: Counter[str] = Counter()
+
+    async def user_exists(self, chat_id: int) -> bool:
+        self.calls["user_exists"] += 1
+        return await super().user_exists(chat_id)
+
+    async def get_user_by_chat_id(self, chat_id: int) -> Optional[User]:
+        self.calls["get_user"] += 1
+        return await super().get_user_by_chat_id(chat_id)
+
+    async def get_users(self, chat_ids: Iterable[int]) -> Dict[int, User]:
+        self.calls["get_users"] += 1
+        return await super().get_users(chat_ids)
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def backend():
+    backend = CountingUsersRepo()
+    await backend.bootstrap()
+    yield backend
+    await backend.close()
+
+
+@pytest.fixture
+def users(backend: CountingUsersRepo, clock: FakeClock) -> UsersRepoCached:
+    return UsersRepoCached(backend, max_entries=2, negative_ttl=10, clock=clock)
+
+
+@pytest.mark.asyncio
+async def test_authorized_user_hot_path_skips_database(
+    users: UsersRepoCached, backend: CountingUsersRepo
+) -> None:
+    await users.add_user(USER)
+
+    assert await users.user_exists(USER.chat_id)
+    assert await users.get_user({"chat_id": USER.chat_id}) == USER
+    assert sum(backend.calls.values()) == 0
+    assert users.stats.hits == 2
+
+
+@pytest.mark.asyncio
+async def test_negative_entries_expire(
+    users: UsersRepoCached, backend: CountingUsersRepo, clock: FakeClock
+) -> None:
+    assert not await users.user_exists(USER.chat_id)
+    assert not await users.user_exists(USER.chat_id)
+    assert backend.calls["get_user"] == 1
+
+    await backend.add_user(USER)
+    clock.now = 11
+
+    assert await users.user_exists(USER.chat_id)
+    assert backend.calls["get_user"] == 2
+
+
+@pytest.mark.asyncio
+async def test_add_user_replaces_negative_entry(users: UsersRepoCached) -> None:
+    assert not await users.user_exists(USER.chat_id)
+    await users.add_user(USER)
+
+    assert await users.user_exists(USER.chat_id)
+
+
+@pytest.mark.asyncio
+async def test_failed_insert_is_not_cached(users: UsersRepoCached) -> None:
+    await users.add_user(USER)
+    duplicate_phone = User(2, "Петров Пётр", "c2", USER.phone_number)
+
+    with pytest.raises(RuntimeError):
+        await users.add_user(duplicate_phone)
+    assert not await users.user_exists(2)
+
+
+@pytest.mark.asyncio
+async def test_lru_bound(users: UsersRepoCached, backend: CountingUsersRepo) -> None:
+    for chat_id in range(3):
+        await users.user_exists(chat_id)
+    await users.user_exists(0)
+
+    assert users.stats.evictions == 2
+    assert backend.calls["get_user"] == 4
+
+
+@pytest.mark.asyncio
+async def test_get_users_fetches_only_misses(
+    users: UsersRepoCached, backend: CountingUsersRepo
+) -> None:
+    await users.add_user(USER)
+
+    assert await users.get_users([USER.chat_id, 2]) == {USER.chat_id: USER}
+    assert await users.get_users([2]) == {}
+    assert backend.calls["get_users"] == 1
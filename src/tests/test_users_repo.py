@@ -0,0 +1,86 @@
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+from repository import sqlite
+from repository.dto import User
+from repository.users import SQLitePerformance, UsersRepoSQLite
+
+USERS = [
+    User(chat_id=i, full_name=f"User {i}", client_id=f"c{i}", phone_number=f"+{i}")
+    for i in range(1, 4)
+]
+
+
+@pytest_asyncio.fixture(loop_scope="function", params=["default", "performance"])
+async def users(request: pytest.FixtureRequest, tmp_path: Path):
+    performance = (
+        SQLitePerformance(readers=2) if request.param == "performance" else None
+    )
+    users = UsersRepoSQLite(db_name=str(tmp_path / "users.db"), performance=performance)
+    await users.bootstrap()
+    for user in USERS:
+        await users.add_user(user)
+    yield users
+    await users.close()
+
+
+@pytest.mark.asyncio
+async def test_typed_lookups(users: UsersRepoSQLite) -> None:
+    user = USERS[1]
+
+    assert await users.get_user_by_chat_id(user.chat_id) == user
+    assert await users.get_user_by_client_id(user.client_id) == user
+    assert await users.get_user_by_phone(user.phone_number) == user
+    assert await users.get_user({"client_id": user.client_id}) == user
+    assert await users.get_user({"chat_id": 2, "client_id": "c2"}) == user
+    assert await users.get_user_by_chat_id(404) is None
+
+
+@pytest.mark.asyncio
+async def test_get_users(users: UsersRepoSQLite) -> None:
+    found = await users.get_users([1, 3, 3, 404])
+
+    assert found == {1: USERS[0], 3: USERS[2]}
+    assert await users.get_users([]) == {}
+
+
+@pytest.mark.asyncio
+async def test_performance_mode_uses_wal_and_readers(tmp_path: Path) -> None:
+    users = UsersRepoSQLite(
+        db_name=str(tmp_path / "users.db"), performance=SQLitePerformance(readers=2)
+    )
+    await users.bootstrap()
+    assert users.connection is not None
+    async with users.connection.execute("PRAGMA journal_mode") as cursor:
+        assert await cursor.fetchone() == ("wal",)
+    assert len(users.readers) == 2
+
+    await users.add_user(USERS[0])
+    assert await users.user_exists(USERS[0].chat_id)
+    await users.close()
+    assert users.readers == []
+
+
+@pytest.mark.asyncio
+async def test_performance_mode_in_memory_has_no_readers() -> None:
+    users = UsersRepoSQLite(db_name=":memory:", performance=SQLitePerformance())
+    await users.bootstrap()
+    await users.add_user(USERS[0])
+
+    assert users.readers == []
+    assert await users.get_user_by_chat_id(USERS[0].chat_id) == USERS[0]
+    await users.close()
+
+
+@pytest.mark.asyncio
+async def test_shared_connections_use_wal_and_wait_for_locks(tmp_path: Path) -> None:
+    connection = await sqlite.connect(str(tmp_path / "shared.db"))
+    try:
+        async with connection.execute("PRAGMA journal_mode") as cursor:
+            assert await cursor.fetchone() == ("wal",)
+        async with connection.execute("PRAGMA busy_timeout") as cursor:
+            assert await cursor.fetchone() == (sqlite.BUSY_TIMEOUT_MS,)
+    finally:
+        await connection.close()
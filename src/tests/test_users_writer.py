@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from repository.dto import User
+from repository.users import UsersRepoSQLite
+from repository.writer import GroupCommit
+
+
+def make_user(i: int, phone_number: str = "") -> User:
+    return User(i, f"User {i}", f"c{i}", phone_number or f"+{i}")
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def users():
+    users = UsersRepoSQLite(
+        db_name=":memory:", group_commit=GroupCommit(max_delay=0.01, max_rows=64)
+    )
+    await users.bootstrap()
+    yield users
+    await users.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_registrations_share_one_commit(
+    users: UsersRepoSQLite,
+) -> None:
+    await asyncio.gather(*(users.add_user(make_user(i)) for i in range(50)))
+
+    assert users.writer is not None
+    assert users.writer.stats.batches == 1
+    assert len(await users.get_users(range(50))) == 50
+
+
+@pytest.mark.asyncio
+async def test_constraint_errors_reach_only_their_callers(
+    users: UsersRepoSQLite,
+) -> None:
+    await users.add_user(make_user(1))
+
+    results = await asyncio.gather(
+        users.add_user(make_user(2)),
+        users.add_user(make_user(3, phone_number="+1")),
+        users.add_user(make_user(2)),
+        users.add_user(make_user(4)),
+        return_exceptions=True,
+    )
+
+    assert results[0] is None and results[3] is None
+    assert isinstance(results[1], RuntimeError)
+    assert isinstance(results[2], RuntimeError)
+    assert set(await users.get_users(range(5))) == {1, 2, 4}
+    assert users.writer is not None and users.writer.stats.fallbacks == 1
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_pending_rows(tmp_path) -> None:
+    db_name = str(tmp_path / "users.db")
+    users = UsersRepoSQLite(db_name=db_name, group_commit=GroupCommit(max_delay=1))
+    await users.bootstrap()
+    registration = asyncio.create_task(users.add_user(make_user(1)))
+    await asyncio.sleep(0)
+
+    await users.close()
+    await registration
+
+    reopened = UsersRepoSQLite(db_name=db_name)
+    assert await reopened.user_exists(1)
+    await reopened.close()
@@ -0,0 +1,179 @@
+import asyncio
+import time
+from typing import Any, Dict, List
+
+import pytest
+import pytest_asyncio
+from aiogram import Bot
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from telegram.admin import ADMIN_HEADER
+from telegram.webhook import SECRET_HEADER, WEBHOOK_PATH, WEBHOOK_SECRET
+from telegram.routing import chat_id_of
+from telegram.workers import WorkerPool, get_front_app, merge_metrics, worker_for
+
+MESSAGE = {"update_id": 1, "message": {"message_id": 5, "chat": {"id": 42}}}
+CALLBACK = {
+    "update_id": 2,
+    "callback_query": {"id": "x", "from": {"id": 7}, "message": {"chat": {"id": 43}}},
+}
+
+
+def test_chat_id_of_common_updates() -> None:
+    assert chat_id_of(MESSAGE) == 42
+    assert chat_id_of(CALLBACK) == 43
+    assert chat_id_of({"update_id": 3, "inline_query": {"from": {"id": 8}}}) == 8
+    assert chat_id_of({"update_id": 4, "poll": {"id": "p"}}) is None
+
+
+def test_worker_for_pins_chats() -> None:
+    assert worker_for(MESSAGE, 4) == 42 % 4
+    assert worker_for({"update_id": 4, "poll": {"id": "p"}}, 3) == 1
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def front():
+    received: List[List[Dict[str, Any]]] = [[], []]
+    workers = []
+    for index in range(2):
+
+        async def handle(request: web.Request, index: int = index) -> web.Response:
+            assert request.headers[SECRET_HEADER] == WEBHOOK_SECRET
+            received[index].append(await request.json())
+            return web.json_response({})
+
+        async def metrics(request: web.Request, index: int = index) -> web.Response:
+            return web.Response(
+                text=(
+                    "# HELP updates_total Updates.\n"
+                    "# TYPE updates_total counter\n"
+                    f'updates_total{{type="message"}} {index + 1}\n'
+                )
+            )
+
+        async def tasks(request: web.Request, index: int = index) -> web.Response:
+            return web.json_response(
+                {"worker": index, "secret": request.headers.get(ADMIN_HEADER)}
+            )
+
+        app = web.Application()
+        app.router.add_post(WEBHOOK_PATH, handle)
+        app.router.add_get("/metrics", metrics)
+        app.router.add_get("/admin/tasks", tasks)
+        server = TestServer(app)
+        await server.start_server()
+        workers.append(server)
+
+    urls = [str(server.make_url(WEBHOOK_PATH)) for server in workers]
+    app = get_front_app(Bot("123:abc"), urls, register_webhook=False)
+    async with TestClient(TestServer(app)) as client:
+        yield client, received, workers
+    for server in workers:
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_front_routes_by_chat(front) -> None:
+    client, received, _ = front
+    for chat_id in (10, 11, 12):
+        update = {"update_id": chat_id, "message": {"chat": {"id": chat_id}}}
+        response = await client.post(
+            WEBHOOK_PATH, json=update, headers={SECRET_HEADER: WEBHOOK_SECRET}
+        )
+        assert response.status == 200
+
+    assert [u["update_id"] for u in received[0]] == [10, 12]
+    assert [u["update_id"] for u in received[1]] == [11]
+
+
+@pytest.mark.asyncio
+async def test_front_rejects_wrong_secret(front) -> None:
+    client, received, _ = front
+    response = await client.post(
+        WEBHOOK_PATH, json=MESSAGE, headers={SECRET_HEADER: "nope"}
+    )
+
+    assert response.status == 401
+    assert received == [[], []]
+
+
+@pytest.mark.asyncio
+async def test_front_answers_503_when_worker_is_down(front) -> None:
+    client, _, workers = front
+    await workers[0].close()
+
+    response = await client.post(
+        WEBHOOK_PATH, json=MESSAGE, headers={SECRET_HEADER: WEBHOOK_SECRET}
+    )
+    assert response.status == 503
+
+
+@pytest.mark.asyncio
+async def test_front_merges_worker_metrics(front) -> None:
+    client, _, workers = front
+    await workers[1].close()
+
+    response = await client.get("/metrics")
+    text = await response.text()
+
+    assert text.count("# TYPE updates_total counter") == 1
+    assert 'updates_total{worker="0",type="message"} 1' in text
+    assert 'front_worker_up{worker="0"} 1' in text
+    assert 'front_worker_up{worker="1"} 0' in text
+
+
+def test_merge_metrics_groups_families() -> None:
+    output = "# TYPE a counter\na 1\n# TYPE b gauge\nb 2\n"
+
+    merged = merge_metrics([output, output]).splitlines()
+
+    assert merged[-6:] == [
+        "# TYPE a counter",
+        'a{worker="0"} 1',
+        'a{worker="1"} 1',
+        "# TYPE b gauge",
+        'b{worker="0"} 2',
+        'b{worker="1"} 2',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_front_reaches_one_workers_admin_routes(front) -> None:
+    client, _, _ = front
+
+    response = await client.get("/workers/1/admin/tasks", headers={ADMIN_HEADER: "s"})
+    assert await response.json() == {"worker": 1, "secret": "s"}
+    assert (await client.get("/workers/2/metrics")).status == 404
+    assert (await client.get("/workers/0/other")).status == 404
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_restarts_exited_workers() -> None:
+    # time.sleep(0) stands in for a worker that exits right away.
+    pool = WorkerPool(time.sleep, [0], check_interval=0.01, max_backoff=0.05)
+    pool.start()
+    try:
+        deadline = time.monotonic() + 30
+        while pool.restarts < 2 and time.monotonic() < deadline:
+            pool.check()
+            await asyncio.sleep(0.01)
+    finally:
+        pool.stop()
+
+    assert pool.restarts >= 2
+    pool.check()
+    assert not pool.processes[0].is_alive()
+
+
+@pytest.mark.asyncio
+async def test_front_rejects_malformed_updates(front) -> None:
+    client, received, _ = front
+    for body in ("not json", "[1, 2]", "42", '"update"', '{"message": {}}'):
+        response = await client.post(
+            WEBHOOK_PATH,
+            data=body,
+            headers={SECRET_HEADER: WEBHOOK_SECRET, "Content-Type": "application/json"},
+        )
+        assert response.status == 400, body
+    assert received == [[], []]